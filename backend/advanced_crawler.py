@@ -7,7 +7,7 @@ import asyncio
 import os
 import re
 import logging
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
@@ -16,11 +16,20 @@ import aiohttp
 import aiofiles
 import json
 
+from browser_pool import BrowserPool
+from crawl_frontier import SITEMAP_PRIORITY, CrawlFrontier, FrontierEntry
+from html_extraction import extract_static_payload_async, needs_rendering
+from http_cache import HttpCache, body_hash
+from incremental import PreviousCrawl, compute_delta, issue_key
+from rate_limiter import RateLimiter
+from report_store import MemoryReportSink, ReportCounters
+from site_discovery import discover_site
+
 # Set Playwright browsers path
 os.environ['PLAYWRIGHT_BROWSERS_PATH'] = '/pw-browsers'
 
 # Playwright
-from playwright.async_api import async_playwright, Browser, Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright, Browser, Page, Route, TimeoutError as PlaywrightTimeoutError
 
 # yt-dlp
 import yt_dlp
@@ -28,7 +37,38 @@ import yt_dlp
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-VIDEO_EXTRACTION_SCRIPT = Path(__file__).with_name("video_extraction.js").read_text(encoding="utf-8")
+# Her tarama context'i (kendi tarayıcısında veya havuzda) bu ayarlarla açılır
+BROWSER_CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'ignore_https_errors': True,
+}
+
+# Tek geçişte görsel/video/metin/link çıkaran DOM script'i
+PAGE_EXTRACTION_SCRIPT = Path(__file__).with_name("page_extraction.js").read_text(encoding="utf-8")
+
+# Sonsuz kaydırma toplayıcısı: çıkarım script'ini sayfa içinde her turda çağırır
+SCROLL_HARVEST_SCRIPT = Path(__file__).with_name("scroll_harvest.js").read_text(encoding="utf-8").replace(
+    "__PAGE_EXTRACTION__", PAGE_EXTRACTION_SCRIPT.strip()
+)
+# Sayfa altında yeni içerik bekleme penceresi initialIdleMs ile başlar, gözlenen yükleme gecikmelerine göre
+# minIdleMs-maxIdleMs arasında ayarlanır
+SCROLL_HARVEST_OPTIONS = {
+    'maxRounds': 200,
+    'maxDurationMs': 20000,
+    'initialIdleMs': 2000,
+    'minIdleMs': 400,
+    'maxIdleMs': 3000,
+}
+
+# Hızlı mod: sadece DOM özniteliklerini okuduğumuz için bu kaynakların byte'larına gerek yok
+DEFAULT_BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+DEFAULT_BLOCKED_DOMAINS = {
+    'google-analytics.com', 'googletagmanager.com', 'googlesyndication.com',
+    'doubleclick.net', 'googleadservices.com', 'facebook.net', 'connect.facebook.net',
+    'hotjar.com', 'clarity.ms', 'mc.yandex.ru', 'yandex.ru/metrika', 'criteo.com',
+    'adnxs.com', 'taboola.com', 'outbrain.com', 'scorecardresearch.com', 'quantserve.com',
+}
 
 
 @dataclass
@@ -54,12 +94,25 @@ class CrawlReport:
     youtube_videos: List[Dict] = field(default_factory=list)
     texts: List[Dict] = field(default_factory=list)
     issues: List[Dict] = field(default_factory=list)
+    pages: List[Dict] = field(default_factory=list)  # url, content_hash, depth, links
+    counts: Dict[str, int] = field(default_factory=dict)  # tür -> öğe sayısı
+    breakdown: Dict[str, Dict[str, int]] = field(default_factory=dict)  # örn. issues_by_severity
+    delta: Dict = field(default_factory=dict)  # Artımlı taramada önceki rapora göre farklar
+    discovery: Dict = field(default_factory=dict)  # robots.txt/sitemap keşfi özeti
 
 
 class AdvancedCrawler:
     """Playwright tabanlı gelişmiş tarayıcı"""
     
-    def __init__(self, target_url: str, max_pages: int = 50, download_dir: str = "./downloads"):
+    def __init__(self, target_url: str, max_pages: int = 50, download_dir: str = "./downloads",
+                 workers: int = 4, contexts: int = 1, max_per_host: int = 4,
+                 max_depth: Optional[int] = None, path_priorities: Optional[Dict[str, int]] = None,
+                 block_resources: bool = False, blocked_resource_types: Optional[Set[str]] = None,
+                 block_domains: Optional[Set[str]] = None, allow_domains: Optional[Set[str]] = None,
+                 engine: str = "browser", http_cache: Optional[HttpCache] = None,
+                 previous_crawl: Optional[PreviousCrawl] = None, report_sink=None,
+                 browser_pool: Optional[BrowserPool] = None, discover: bool = False,
+                 crawl_delay: Optional[float] = None, rate_limiter: Optional[RateLimiter] = None):
         self.target_url = target_url.rstrip('/')
         parsed = urlparse(target_url)
         self.base_domain = parsed.netloc
@@ -67,14 +120,66 @@ class AdvancedCrawler:
         self.restrict_to_start_page = 'vk.com' in self.base_domain or 'vkvideo.ru' in self.base_domain
         self.max_pages = max_pages
         self.download_dir = download_dir
+
+        # Sayfa havuzu: her worker kendi Playwright sayfasını kullanır
+        self.workers = max(1, workers)
+        self.contexts = max(1, min(contexts, self.workers))
+        self.max_per_host = max(1, max_per_host)
+        # Host başına uyarlanabilir sınır (sunucuda indirmelerle paylaşılır); max_per_host üst sınırdır.
+        # Crawl-delay (verilen veya robots.txt'den) aynı sınırlayıcıda uygulanır; bu sınırlar
+        # run_crawl süresince bu tarama adına konur ve tarama bitince kaldırılır
+        self.rate_limiter = rate_limiter or RateLimiter(max_concurrency=self.max_per_host)
+        self.crawl_delay = crawl_delay
+
+        # Hızlı mod: page.route ile gereksiz kaynakları iptal et
+        self.block_resources = block_resources
+        self.blocked_resource_types = set(blocked_resource_types or DEFAULT_BLOCKED_RESOURCE_TYPES)
+        self.block_domains = DEFAULT_BLOCKED_DOMAINS | set(block_domains or ())
+        self.allow_domains = set(allow_domains or ())
+        self._requested_images: Dict[int, List[str]] = {}  # id(page) -> görsel istekleri
+
+        # Motor: 'browser' her sayfayı Chromium ile açar, 'hybrid' önce aiohttp ile dener
+        # ve sadece JS render'ı gereken sayfaları tarayıcıya gönderir
+        self.engine = engine if engine in ('browser', 'hybrid') else 'browser'
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.static_pages = 0
+        self.rendered_pages = 0
+        self._playwright = None
+        self._browser_contexts: List = []
+        self._browser_lock = asyncio.Lock()
+        # Havuz verilirse Chromium başlatılmaz; context'ler havuzdan alınıp geri verilir
+        self.browser_pool = browser_pool
+        self._page_contexts: Dict[int, object] = {}  # id(page) -> context
+
+        # Tekrar taramalarda koşullu istek önbelleği (None = kapalı)
+        self.http_cache = http_cache
+        self.not_modified_pages = 0
+        self.reused_extractions = 0
+        # id(page) -> (belge URL'si, gövde, 304 mü): son ana belge isteği (çıkarım önbelleği için)
+        self._documents: Dict[int, Tuple[str, str, bool]] = {}
+
+        # Artımlı tarama: HTML hash'i önceki rapordakiyle aynı olan sayfalar yeniden işlenmez
+        self.previous_crawl = previous_crawl
+        self.unchanged_pages = 0
+
+        # Keşif: robots.txt + sitemap URL'leri taramadan önce frontier'a eklenir
+        self.discover = discover
+        self.discovery: Dict = {}
+
+        # Öncelikli kuyruk; görülmüş-küme discovered_urls olarak paylaşılır
+        self.frontier = CrawlFrontier(max_depth=max_depth, path_priorities=path_priorities)
         
         self.visited_urls: Set[str] = set()
-        self.discovered_urls: Set[str] = set()
-        self.images: List[MediaItem] = []
-        self.videos: List[MediaItem] = []
-        self.youtube_videos: List[MediaItem] = []
-        self.texts: List[Dict] = []
-        self.issues: List[Dict] = []
+        self.discovered_urls: Set[str] = self.frontier.seen
+
+        # Öğeler bulundukça sink'e yazılır (varsayılan: bellek; sunucuda MongoDB partileri).
+        # Bellekte sadece tekilleştirme/delta anahtarları ve sayaçlar tutulur
+        self.sink = report_sink or MemoryReportSink()
+        self.counters = ReportCounters()
+        self.item_counts: Dict[str, int] = self.counters.counts
+        self._item_keys: Dict[str, Set] = {'images': set(), 'videos': set(), 'youtube_videos': set(), 'issues': set()}
+        self.page_hashes: Dict[str, str] = {}
+        self._open_pages: Dict[str, Dict] = {}
         
         self.browser: Optional[Browser] = None
         self.is_running = False
@@ -126,12 +231,101 @@ class AdvancedCrawler:
 
         return vk_url
 
+    def enqueue_url(self, url: str, depth: int = 0, priority: Optional[int] = None) -> bool:
+        """Yeni keşfedilen URL'yi ortak kuyruğa ekle"""
+        return self.frontier.add(url, depth=depth, priority=priority)
+
+    def _domain_matches(self, url: str, domains: Set[str]) -> bool:
+        parsed = urlparse(url)
+        host_path = f"{parsed.netloc}{parsed.path}"
+        return any(
+            parsed.netloc == domain or parsed.netloc.endswith(f".{domain}") or host_path.startswith(domain)
+            for domain in domains
+        )
+
+    def should_block_request(self, resource_type: str, url: str) -> bool:
+        """Hızlı modda istek iptal edilmeli mi?"""
+        if self._domain_matches(url, self.allow_domains):
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        return self._domain_matches(url, self.block_domains)
+
+    async def install_request_routing(self, page: Page) -> None:
+        """Sayfaya istek yakalayıcı kur: hızlı modda kaynak engelleme (engellenen görsel
+        URL'leri yine de kaydedilir), önbellek varsa belgeler için koşullu istek"""
+        requested_images = self._requested_images.setdefault(id(page), [])
+
+        async def handle_route(route: Route) -> None:
+            request = route.request
+            if self.block_resources and request.resource_type == 'image' and not request.url.startswith('data:'):
+                requested_images.append(request.url)
+            try:
+                if self.block_resources and self.should_block_request(request.resource_type, request.url):
+                    await route.abort()
+                elif self.http_cache and request.resource_type == 'document' and request.method == 'GET':
+                    main_frame = request.is_navigation_request() and request.frame.parent_frame is None
+                    await self.fulfill_from_cache(route, id(page) if main_frame else None)
+                else:
+                    await route.continue_()
+            except Exception:
+                # Sayfa kapanırken/yeniden yönlenirken route zaten işlenmiş olabilir
+                pass
+
+        await page.route('**/*', handle_route)
+
+    async def fulfill_from_cache(self, route: Route, page_key: Optional[int] = None) -> None:
+        """Belge isteğini koşullu gönder; 304 gelirse gövdeyi önbellekten ver
+
+        `page_key` verilirse (ana belge) gövde ve 304 bilgisi sayfanın çıkarım önbelleği için saklanır.
+        """
+        url = route.request.url
+        conditional = self.http_cache.conditional_headers(url)
+        response = await route.fetch(headers={**route.request.headers, **conditional})
+        if response.status == 304 and conditional:
+            cached = await self.http_cache.load_body(url)
+            if cached:
+                self.not_modified_pages += 1
+                if page_key is not None:
+                    self._documents[page_key] = (url, cached[0], True)
+                entry = self.http_cache.get(url)
+                await route.fulfill(
+                    status=200,
+                    content_type=entry.content_type or 'text/html; charset=utf-8',
+                    body=cached[0]
+                )
+                return
+            # Gövde diskte yok: koşulsuz tekrar iste
+            self.http_cache.forget(url)
+            response = await route.fetch()
+        if response.status == 200 and 'html' in response.headers.get('content-type', '').lower():
+            body = await response.text()
+            await self.http_cache.store(url, response.headers, body, response.url)
+            if page_key is not None:
+                self._documents[page_key] = (url, body, False)
+        await route.fulfill(response=response)
+
+    def _extraction_variant(self, url: str) -> Optional[str]:
+        """Tarayıcı çıkarımının önbellek varyantı; kaydırmalı (VK) sayfalar önbelleğe alınmaz"""
+        if not self.http_cache or "vk.com" in url or "vkvideo.ru" in url:
+            return None
+        return 'browser:fast' if self.block_resources else 'browser'
+
     async def safe_goto(self, page: Page, url: str) -> Optional[str]:
-        """Ağ hatalarına karşı sayfa geçişini birkaç kez dene."""
+        """Ağ hatalarına karşı sayfa geçişini birkaç kez dene; 429/503'te sınırlayıcı bekletir."""
         last_error = None
         for attempt in range(3):
             try:
-                await page.goto(url, wait_until='domcontentloaded', timeout=45000)
+                async with self.rate_limiter.slot(url) as slot:
+                    try:
+                        response = await page.goto(url, wait_until='domcontentloaded', timeout=45000)
+                    except PlaywrightTimeoutError:
+                        slot.record_timeout()
+                        raise
+                    if response is not None:
+                        slot.record(response.status, response.headers)
+                if response is not None and self.rate_limiter.should_retry(slot, attempt):
+                    continue
                 return None
             except PlaywrightTimeoutError as exc:
                 last_error = str(exc)
@@ -141,300 +335,504 @@ class AdvancedCrawler:
             await page.wait_for_timeout(1000)
         return last_error
 
-    async def crawl_page(self, page: Page, url: str) -> None:
-        """Tek bir sayfayı Playwright ile tara"""
+    def _reserve_url(self, url: str) -> bool:
+        """URL'yi ziyaret edildi olarak işaretle; taranmaması gerekiyorsa False"""
+        # Kontrol ve ekleme arasında await yok: eşzamanlı worker'lar aynı URL'yi iki kez alamaz
         if self.should_stop or url in self.visited_urls:
-            return
+            return False
 
         if len(self.visited_urls) >= self.max_pages:
-            return
+            return False
 
         self.visited_urls.add(url)
         logger.info(f"Crawling: {url}")
+        return True
+
+    async def crawl_page(self, page: Page, url: str, depth: int = 0) -> None:
+        """Tek bir sayfayı Playwright ile tara"""
+        if not self._reserve_url(url):
+            return
+
+        self._open_page(url, depth)
+        try:
+            await self._crawl_page(page, url, depth)
+        finally:
+            self._close_page(url)
+
+    async def crawl_url(self, url: str, depth: int, get_page) -> None:
+        """Hibrit motor: önce HTTP ile dene, gerekirse tarayıcı sayfasına gönder.
+        Artımlı modda HTML değişmemişse önceki sonuçlar kullanılır"""
+        if not self._reserve_url(url):
+            return
+
+        page_record = self._open_page(url, depth)
+        try:
+            fetched = None
+            if (self.engine == 'hybrid' or self.previous_crawl) and not self.requires_browser(url):
+                fetched = await self.fetch_static(url)
+                if fetched[0] == 200 and fetched[1]:
+                    page_record['content_hash'] = body_hash(fetched[1])
+
+            if self.previous_crawl and self.previous_crawl.is_unchanged(url, page_record['content_hash']):
+                await self.reuse_previous_page(url, depth)
+                self.unchanged_pages += 1
+                return
+
+            if self.engine == 'hybrid' and fetched:
+                if await self._crawl_static(url, depth, fetched):
+                    self.static_pages += 1
+                    return
+            self.rendered_pages += 1
+            try:
+                page = await get_page()
+            except Exception as e:
+                # Tarayıcı açılamadı: render gereken sayfa sessizce düşmesin
+                logger.error(f"Browser unavailable for {url}: {e}")
+                self.emit('issues', {
+                    'source_url': url,
+                    'issue_type': 'render_error',
+                    'severity': 'High',
+                    'fix_suggestion': f"Sayfa tarayıcıda açılamadı: {e}"
+                })
+                return
+            await self._crawl_page(page, url, depth)
+        finally:
+            self._close_page(url)
+
+    def _open_page(self, url: str, depth: int) -> Dict:
+        record = self._open_pages[url] = {'url': url, 'content_hash': '', 'depth': depth, 'links': []}
+        return record
+
+    def _close_page(self, url: str) -> None:
+        """Sayfa kaydını (hash + linkler) sink'e yaz"""
+        record = self._open_pages.pop(url)
+        self.page_hashes[url] = record['content_hash']
+        self.emit('pages', record)
+
+    def emit(self, kind: str, item) -> None:
+        """Bulunan öğeyi sink'e yaz; görsel/video URL'leri tarama boyunca tekilleştirilir"""
+        doc = asdict(item) if isinstance(item, MediaItem) else item
+        keys = self._item_keys.get(kind)
+        if keys is not None:
+            key = issue_key(doc) if kind == 'issues' else doc['url']
+            if kind != 'issues' and key in keys:
+                return
+            keys.add(key)
+        self.counters.add(kind, doc)
+        self.sink.add(kind, doc)
+
+    async def reuse_previous_page(self, url: str, depth: int) -> None:
+        """Değişmeyen sayfanın önceki rapordaki öğelerini ekle ve linklerini kuyruğa al"""
+        items = await self.previous_crawl.page_items(url)
+        for kind in ('images', 'videos', 'youtube_videos', 'texts', 'issues'):
+            for item in items.get(kind, []):
+                self.emit(kind, {key: value for key, value in item.items() if key not in ('_id', 'report_id')})
+        links = await self.previous_crawl.links_for(url)
+        self._open_pages[url]['links'] = links
+        for link in links:
+            self.enqueue_url(link, depth + 1)
+
+    def requires_browser(self, url: str) -> bool:
+        """Bu URL her zaman tarayıcı ile mi açılmalı?"""
+        return "vk.com" in url or "vkvideo.ru" in url
+
+    async def fetch_static(self, url: str) -> Tuple[int, str, str]:
+        """Sayfayı aiohttp ile al; HTML değilse içerik boş döner. Önbellek varsa
+        koşullu istek gönderilir ve 304'te gövde diskten okunur. 429/503 yanıtları
+        sınırlayıcının beklemesinden sonra tekrar denenir"""
+        headers = self.http_cache.conditional_headers(url) if self.http_cache else {}
+        attempt = 0
+        try:
+            while True:
+                async with self.rate_limiter.slot(url) as slot:
+                    async with self.session.get(
+                        url,
+                        headers=headers,
+                        allow_redirects=True,
+                        timeout=aiohttp.ClientTimeout(total=30),
+                        ssl=False
+                    ) as response:
+                        slot.record(response.status, response.headers)
+                        final_url = str(response.url)
+                        content_type = response.headers.get('content-type', '')
+                        if self.rate_limiter.should_retry(slot, attempt):
+                            attempt += 1
+                            continue
+                        if response.status == 304 and self.http_cache:
+                            cached = await self.http_cache.load_body(url)
+                            if cached:
+                                self.not_modified_pages += 1
+                                return 200, cached[0], cached[1]
+                            break
+                        elif response.status == 200 and 'html' in content_type.lower():
+                            content = await response.text(errors='replace')
+                            if self.http_cache:
+                                await self.http_cache.store(url, response.headers, content, final_url)
+                            return response.status, content, final_url
+                        else:
+                            return response.status, "", final_url
+        except Exception as e:
+            logger.warning(f"Static fetch failed for {url}: {e}")
+            return 0, "", url
+        # 304 geldi ama gövde diskte yok: koşulsuz tekrar iste
+        self.http_cache.forget(url)
+        return await self.fetch_static(url)
+
+    async def _crawl_static(self, url: str, depth: int, fetched: Optional[Tuple[int, str, str]] = None) -> bool:
+        """Statik HTML yeterliyse sayfayı tarayıcısız işle; render gerekiyorsa False"""
+        status, content, final_url = fetched or await self.fetch_static(url)
+        if status != 200 or not content:
+            return False
+        # Gövde önceki taramadakiyle aynıysa önbellekteki çıkarım sonucu kullanılır
+        payload = self.http_cache.get_extraction(url, content, 'static:50') if self.http_cache else None
+        if payload is None:
+            payload = await extract_static_payload_async(content, final_url)
+            if self.http_cache:
+                await self.http_cache.put_extraction(url, content, 'static:50', payload)
+        if needs_rendering(content, payload):
+            logger.info(f"Rendering required: {url}")
+            return False
+        self.ingest_payload(url, payload, depth)
+        return True
+
+    async def _crawl_page(self, page: Page, url: str, depth: int) -> None:
+        """Sayfayı aç ve içerikleri topla"""
+        requested_images = self._requested_images.get(id(page))
+        if requested_images is not None:
+            requested_images.clear()
+        self._documents.pop(id(page), None)
+        if self.browser_pool:
+            self.browser_pool.note_page(self._page_contexts.get(id(page)))
 
         try:
             # Sayfaya git
             goto_error = await self.safe_goto(page, url)
             if goto_error:
-                self.issues.append({
+                self.emit('issues', {
                     'source_url': url,
                     'issue_type': 'network_error',
                     'severity': 'High',
                     'fix_suggestion': goto_error
                 })
                 return
+            # Belge 304 ile önbellekten geldiyse ve bu varyantın çıkarımı varsa render/çıkarım atlanır
+            document = self._documents.pop(id(page), None)
+            variant = self._extraction_variant(url)
+            if document and variant:
+                document_url, body, not_modified = document
+                payload = self.http_cache.get_extraction(document_url, body, variant) if not_modified else None
+                if payload is not None:
+                    self.reused_extractions += 1
+                    self.ingest_payload(url, payload, depth, payload.get('requested_images'))
+                    return
             await page.wait_for_timeout(500)  # JS'in yüklenmesini bekle
             if "vk.com" in url or "vkvideo.ru" in url:
-                await page.wait_for_timeout(1000)
                 try:
-                    await page.wait_for_selector('a[href*="video"], .VideoCard', timeout=1500)
+                    await page.wait_for_selector('a[href*="video"], .VideoCard', timeout=2500)
                 except Exception:
                     pass
 
-            # Görselleri topla
-            images = await page.evaluate(r'''() => {
-                const imgs = [];
-                document.querySelectorAll('img').forEach(img => {
-                    const src = img.src || img.dataset.src || img.dataset.lazy;
-                    if (src && !src.startsWith('data:')) {
-                        imgs.push({
-                            url: src,
-                            alt: img.alt || '',
-                            width: img.naturalWidth || img.width || 0,
-                            height: img.naturalHeight || img.height || 0
-                        });
-                    }
-                });
-                // Background images
-                document.querySelectorAll('*').forEach(el => {
-                    const bg = getComputedStyle(el).backgroundImage;
-                    if (bg && bg !== 'none') {
-                        const match = bg.match(/url\\(["']?([^"')]+)["']?\\)/);
-                        if (match && !match[1].startsWith('data:')) {
-                            imgs.push({ url: match[1], alt: 'Background', width: 0, height: 0 });
-                        }
-                    }
-                });
-                return imgs;
-            }''')
-
+            # Tek geçişte görsel, video, metin ve linkleri topla
+            payload = await page.evaluate(PAGE_EXTRACTION_SCRIPT)
+            if "vk.com" in url or "vkvideo.ru" in url:
+                payload['videos'] = await self.harvest_scrolled_videos(page, payload.get('videos', []))
+            if document and variant:
+                await self.http_cache.put_extraction(document[0], document[1], variant,
+                                                     {**payload, 'requested_images': list(requested_images or [])})
+            self.ingest_payload(url, payload, depth, requested_images)
             
-            for img in images:
-                if img['width'] >= 50 or img['height'] >= 50 or img['width'] == 0:
-                    self.images.append(MediaItem(
-                        url=img['url'],
+        except Exception as e:
+            logger.error(f"Error crawling {url}: {e}")
+            self.emit('issues', {
+                'source_url': url,
+                'issue_type': 'crawl_error',
+                'severity': 'High',
+                'fix_suggestion': str(e)
+            })
+
+    async def harvest_scrolled_videos(self, page: Page, videos: List[Dict]) -> List[Dict]:
+        """VK sayfalarında kaydırarak yeni yüklenen video kartlarını topla
+
+        Kaydırma döngüsü tek evaluate ile sayfa içinde çalışır; sabit beklemeler yerine
+        DOM değişikliği/ağ etkinliği beklenir ve büyüme durunca biter.
+        """
+        seen_video_urls = {item.get('url') for item in videos}
+        result = await page.evaluate(SCROLL_HARVEST_SCRIPT, SCROLL_HARVEST_OPTIONS)
+        for item in result.get('videos', []):
+            item_url = item.get('url')
+            if item_url and item_url not in seen_video_urls:
+                seen_video_urls.add(item_url)
+                videos.append(item)
+        logger.debug(
+            f"Scroll harvest: {len(videos)} videos, {result.get('rounds')} rounds, "
+            f"{result.get('elapsedMs')} ms ({result.get('stopReason')})"
+        )
+        return videos
+
+    def ingest_payload(self, url: str, payload: Dict, depth: int = 0,
+                       requested_images: Optional[List[str]] = None) -> None:
+        """Çıkarım sonucunu (görsel/video/metin/link) tarayıcı durumuna ekle"""
+        images = payload.get('images', [])
+        for img in images:
+            if img['width'] >= 50 or img['height'] >= 50 or img['width'] == 0:
+                self.emit('images', MediaItem(
+                    url=img['url'],
+                    type='image',
+                    title=img['alt'],
+                    page_url=url
+                ))
+
+        # Hızlı modda iptal edilen görsel istekleri (srcset, CSS arka planları vb.)
+        if requested_images:
+            dom_urls = {img['url'] for img in images}
+            for image_url in dict.fromkeys(requested_images):
+                if image_url not in dom_urls:
+                    self.emit('images', MediaItem(
+                        url=image_url,
                         type='image',
-                        title=img['alt'],
                         page_url=url
                     ))
-            
-            # Videoları topla - Önce sayfa URL'lerini bul (VK, YouTube, vb.)
-            async def collect_videos():
-                return await page.evaluate(VIDEO_EXTRACTION_SCRIPT)
-
-            videos = []
-            seen_video_urls = set()
-            is_vk_page = "vk.com" in url or "vkvideo.ru" in url
-            scroll_steps = 30 if is_vk_page else 1
-            stable_rounds = 0
-            for _ in range(scroll_steps):
-                before_count = len(seen_video_urls)
-                batch = await collect_videos()
-                for item in batch:
-                    item_url = item.get('url')
-                    if item_url and item_url not in seen_video_urls:
-                        seen_video_urls.add(item_url)
-                        videos.append(item)
-                if not is_vk_page:
-                    break
-                if len(seen_video_urls) == before_count:
-                    stable_rounds += 1
-                else:
-                    stable_rounds = 0
-                if stable_rounds >= 2:
-                    break
-                await page.evaluate("window.scrollBy(0, Math.floor(window.innerHeight * 0.9));")
-                await page.wait_for_timeout(800)
-            await page.evaluate("window.scrollTo(0, 0);")
-
-            is_vk_page = "vk.com" in url or "vkvideo.ru" in url
-            scroll_steps = 30 if is_vk_page else 1
-            stable_rounds = 0
-            for _ in range(scroll_steps):
-                before_count = len(seen_video_urls)
-                batch = await collect_videos()
-                for item in batch:
-                    item_url = item.get('url')
-                    if item_url and item_url not in seen_video_urls:
-                        seen_video_urls.add(item_url)
-                        videos.append(item)
-                if not is_vk_page:
-                    break
-                if len(seen_video_urls) == before_count:
-                    stable_rounds += 1
-                else:
-                    stable_rounds = 0
-                if stable_rounds >= 2:
-                    break
-                await page.evaluate("window.scrollBy(0, Math.floor(window.innerHeight * 0.9));")
-                await page.wait_for_timeout(800)
-            await page.evaluate("window.scrollTo(0, 0);")
-            
-            for vid in videos:
-                # Blob URL'leri atla
-                if vid['url'].startswith('blob:'):
-                    continue
 
-                    
-                if vid['type'] == 'youtube':
-                    yt_id = self.extract_youtube_id(vid['url'])
-                    if yt_id:
-                        self.youtube_videos.append(MediaItem(
-                            url=f"https://www.youtube.com/watch?v={yt_id}",
-                            type='youtube',
-                            title=f"YouTube Video: {yt_id}",
-                            thumbnail=f"https://img.youtube.com/vi/{yt_id}/maxresdefault.jpg",
-                            page_url=url,
-                            downloadable=True
-                        ))
-                elif vid['type'] == 'vk':
-                    vk_url = self.normalize_vk_url(vid['url'])
-                    if not vk_url:
-                        continue
-
-                    # Thumbnail varsa ekle
-                    thumbnail = vid.get('thumbnail', '')
-                    self.videos.append(MediaItem(
-                        url=vk_url,
-                        type='vk',
-                        thumbnail=thumbnail,
+        for vid in payload.get('videos', []):
+            # Blob URL'leri atla
+            if vid['url'].startswith('blob:'):
+                continue
+
+            if vid['type'] == 'youtube':
+                yt_id = self.extract_youtube_id(vid['url'])
+                if yt_id:
+                    self.emit('youtube_videos', MediaItem(
+                        url=f"https://www.youtube.com/watch?v={yt_id}",
+                        type='youtube',
+                        title=f"YouTube Video: {yt_id}",
+                        thumbnail=f"https://img.youtube.com/vi/{yt_id}/maxresdefault.jpg",
                         page_url=url,
                         downloadable=True
                     ))
-                else:
-                    self.videos.append(MediaItem(
-                        url=vid['url'],
-                        type=vid.get('type', 'video'),
-                        page_url=url,
-                        downloadable=True
-                    ))
-           
-            # Metinleri topla
-            texts = await page.evaluate(r'''() => {
-                const txts = [];
-                document.querySelectorAll('h1, h2, h3, p').forEach(el => {
-                    const text = el.innerText.trim();
-                    if (text.length > 50) {
-                        txts.push({
-                            content: text.substring(0, 500),
-                            type: el.tagName.toLowerCase(),
-                            wordCount: text.split(/\\s+/).length
-                        });
-                    }
-                });
-                return txts;
-            }''')
-            
-            for txt in texts:
-                self.texts.append({
-                    'content': txt['content'],
-                    'type': txt['type'],
-                    'word_count': txt['wordCount'],
-                    'page_url': url
-                })
-            
-            # Internal linkleri topla
-            links = await page.evaluate(r'''() => {
-                const hrefs = [];
-                document.querySelectorAll('a[href]').forEach(a => {
-                    if (a.href && !a.href.startsWith('javascript:') && !a.href.startsWith('#')) {
-                        hrefs.push(a.href);
-                    }
-                });
-                return hrefs;
-            }''')
-            
-            for link in links:
-                if self.is_internal_url(link):
-                    self.discovered_urls.add(link.split('#')[0].rstrip('/'))
-            
-        except Exception as e:
-            logger.error(f"Error crawling {url}: {e}")
-            self.issues.append({
-                'source_url': url,
-                'issue_type': 'crawl_error',
-                'severity': 'High',
-                'fix_suggestion': str(e)
+            elif vid['type'] == 'vk':
+                vk_url = self.normalize_vk_url(vid['url'])
+                if not vk_url:
+                    continue
+
+                # Thumbnail varsa ekle
+                thumbnail = vid.get('thumbnail', '')
+                self.emit('videos', MediaItem(
+                    url=vk_url,
+                    type='vk',
+                    thumbnail=thumbnail,
+                    page_url=url,
+                    downloadable=True
+                ))
+            else:
+                self.emit('videos', MediaItem(
+                    url=vid['url'],
+                    type=vid.get('type', 'video'),
+                    page_url=url,
+                    downloadable=True
+                ))
+
+        for txt in payload.get('texts', []):
+            self.emit('texts', {
+                'content': txt['content'],
+                'type': txt['type'],
+                'word_count': txt['wordCount'],
+                'page_url': url
             })
 
+        # Internal linkleri kuyruğa ekle
+        internal_links = list(dict.fromkeys(
+            link.split('#')[0].rstrip('/') for link in payload.get('links', []) if self.is_internal_url(link)
+        ))
+        if url in self._open_pages:
+            self._open_pages[url]['links'] = internal_links
+        for link in internal_links:
+            self.enqueue_url(link, depth + 1)
+
+    async def _ensure_browser(self) -> None:
+        """Chromium'u ve context'leri ilk ihtiyaçta başlat"""
+        async with self._browser_lock:
+            if self._browser_contexts:
+                return
+            if self.browser_pool:
+                self._browser_contexts = [
+                    await self.browser_pool.acquire_context(**BROWSER_CONTEXT_OPTIONS) for _ in range(self.contexts)
+                ]
+                return
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            try:
+                self.browser = await self._playwright.chromium.launch(headless=True)
+                self._browser_contexts = [
+                    await self.browser.new_context(**BROWSER_CONTEXT_OPTIONS) for _ in range(self.contexts)
+                ]
+            except Exception:
+                # Yarım kalan başlatmayı geri al: sonraki deneme yeni bir sürücü süreci sızdırmasın
+                if self.browser:
+                    try:
+                        await self.browser.close()
+                    except Exception:
+                        pass
+                    self.browser = None
+                await self._playwright.stop()
+                self._playwright = None
+                self._browser_contexts = []
+                raise
+
+    async def _new_page(self, index: int) -> Page:
+        """Worker için havuzdaki context'lerden birinde sayfa aç"""
+        await self._ensure_browser()
+        context = self._browser_contexts[index % self.contexts]
+        page = await context.new_page()
+        self._page_contexts[id(page)] = context
+        if self.block_resources or self.http_cache:
+            await self.install_request_routing(page)
+        return page
+
+    async def _close_browser(self) -> None:
+        if self.browser_pool:
+            contexts, self._browser_contexts = self._browser_contexts, []
+            for context in contexts:
+                await self.browser_pool.release_context(context)
+            self._page_contexts.clear()
+            return
+        if self.browser:
+            await self.browser.close()
+        if self._playwright:
+            await self._playwright.stop()
+        self._browser_contexts = []
+        self._playwright = None
+
+    async def _worker(self, index: int) -> None:
+        """Frontier'dan URL alıp tarayan worker; sayfasını sadece gerektiğinde açar"""
+        page: Optional[Page] = None
+
+        async def get_page() -> Page:
+            nonlocal page
+            if page is None:
+                page = await self._new_page(index)
+            return page
+
+        while True:
+            entry: Optional[FrontierEntry] = await self.frontier.get()
+            if entry is None:
+                return
+            try:
+                await self.crawl_url(entry.url, entry.depth, get_page)
+                await self.sink.maybe_flush()
+                if len(self.visited_urls) >= self.max_pages:
+                    self.frontier.close()
+                if self.progress_callback and not self.should_stop:
+                    await self.progress_callback({
+                        'crawled': len(self.visited_urls),
+                        'discovered': len(self.discovered_urls),
+                        'images': self.item_counts['images'],
+                        'videos': self.item_counts['videos'] + self.item_counts['youtube_videos'],
+                        'issues': self.item_counts['issues']
+                    })
+            except Exception as e:
+                logger.error(f"Worker error on {entry.url}: {e}")
+            finally:
+                self.frontier.task_done()
+
     async def run_crawl(self, progress_callback=None) -> CrawlReport:
         """Ana tarama işlemi"""
         self.is_running = True
         self.should_stop = False
         self.progress_callback = progress_callback
         start_time = datetime.now().isoformat()
+        self.rate_limiter.set_host_limits(self.base_domain, max_concurrency=self.max_per_host,
+                                          crawl_delay=self.crawl_delay, owner=self)
         
-        async with async_playwright() as p:
-            self.browser = await p.chromium.launch(headless=True)
-            context = await self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                ignore_https_errors=True
+        if self.engine == 'hybrid' or self.previous_crawl or self.discover:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.workers * 2, ssl=False),
+                headers={
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                    'Accept-Language': 'tr,en;q=0.9',
+                }
             )
-            page = await context.new_page()
+        
+        try:
+            if self.engine == 'browser':
+                await self._ensure_browser()
             
-            # İlk URL'yi ekle
-            self.discovered_urls.add(self.target_url)
+            # İlk URL'yi ekle (keşifte sitemap URL'lerinden önce taranır)
+            self.enqueue_url(self.target_url, priority=SITEMAP_PRIORITY - 1 if self.discover else None)
+            if self.discover:
+                await self.discover_urls()
             
-            try:
-                iteration = 0
-                while iteration < 20 and not self.should_stop:
-                    urls_to_crawl = list(self.discovered_urls - self.visited_urls)
-                    
-                    if not urls_to_crawl or len(self.visited_urls) >= self.max_pages:
-                        break
-                    
-                    for url in urls_to_crawl[:10]:  # Batch of 10
-                        if self.should_stop:
-                            break
-                        await self.crawl_page(page, url)
-                        
-                        if progress_callback:
-                            await progress_callback({
-                                'crawled': len(self.visited_urls),
-                                'discovered': len(self.discovered_urls),
-                                'images': len(self.images),
-                                'videos': len(self.videos) + len(self.youtube_videos),
-                                'issues': len(self.issues)
-                            })
-                    
-                    iteration += 1
-                    
-            finally:
-                await self.browser.close()
-        
-        # Duplicate'leri kaldır
-        seen_urls = set()
-        unique_images = []
-        for img in self.images:
-            if img.url not in seen_urls:
-                seen_urls.add(img.url)
-                unique_images.append(img)
-        self.images = unique_images
+            # Frontier boşalıp tüm worker'lar işini bitirince (veya durdurulunca) tarama biter
+            await asyncio.gather(*(self._worker(i) for i in range(self.workers)))
+        finally:
+            self.rate_limiter.clear_host_limits(self)
+            await self.sink.flush()
+            if self.session:
+                await self.session.close()
+                self.session = None
+            await self._close_browser()
         
-        seen_yt = set()
-        unique_yt = []
-        for yt in self.youtube_videos:
-            if yt.url not in seen_yt:
-                seen_yt.add(yt.url)
-                unique_yt.append(yt)
-        self.youtube_videos = unique_yt
-
-        seen_videos = set()
-        unique_videos = []
-        for vid in self.videos:
-            if vid.url not in seen_videos:
-                seen_videos.add(vid.url)
-                unique_videos.append(vid)
-        self.videos = unique_videos
+        if self.engine == 'hybrid':
+            logger.info(f"Hybrid crawl: {self.static_pages} static, {self.rendered_pages} rendered pages")
+        if self.http_cache:
+            logger.info(f"HTTP cache: {self.not_modified_pages} of {len(self.visited_urls)} pages not modified, "
+                        f"{self.reused_extractions} browser extractions reused")
+        if self.previous_crawl:
+            logger.info(f"Incremental crawl: {self.unchanged_pages} of {len(self.visited_urls)} pages unchanged")
         
         self.is_running = False
         
-        return CrawlReport(
+        report = CrawlReport(
             domain=self.base_domain,
             target_url=self.target_url,
             start_time=start_time,
             end_time=datetime.now().isoformat(),
             total_urls=len(self.visited_urls),
-            images=[asdict(img) for img in self.images],
-            videos=[asdict(vid) for vid in self.videos],
-            youtube_videos=[asdict(yt) for yt in self.youtube_videos],
-            texts=self.texts[:100],
-            issues=self.issues
+            counts=dict(self.item_counts),
+            breakdown=self.counters.breakdown,
+            discovery=self.discovery
         )
+        if isinstance(self.sink, MemoryReportSink):
+            items = self.sink.items
+            report.images = items['images']
+            report.videos = items['videos']
+            report.youtube_videos = items['youtube_videos']
+            report.texts = items['texts'][:100]
+            report.issues = items['issues']
+            report.pages = items['pages']
+        if self.previous_crawl:
+            current_keys = {
+                'images': self._item_keys['images'],
+                'videos': self._item_keys['videos'] | self._item_keys['youtube_videos'],
+                'issues': self._item_keys['issues'],
+            }
+            report.delta = compute_delta(
+                self.previous_crawl, await self.previous_crawl.item_keys(), current_keys, self.page_hashes
+            )
+        return report
+
+    async def discover_urls(self) -> int:
+        """robots.txt ve sitemap URL'lerini frontier'a toplu ekle; eklenen sayıyı döndür"""
+        result = await discover_site(self.session, self.target_url, max_urls=self.max_pages * 2,
+                                     accept=self.is_internal_url)
+        if result.crawl_delay and not self.crawl_delay:
+            self.rate_limiter.set_host_limits(self.base_domain, crawl_delay=result.crawl_delay, owner=self)
+        added = 0
+        for item in result.urls:
+            added += self.enqueue_url(item.url.split('#')[0].rstrip('/'), depth=1, priority=item.priority)
+        self.discovery = {
+            'robots_found': result.robots_found,
+            'crawl_delay': self.rate_limiter.crawl_delay(self.target_url, owner=self),
+            'sitemaps': len(result.sitemaps),
+            'sitemap_urls': result.scanned,
+            'seeded': added,
+            'errors': result.errors[:20],
+        }
+        return added
 
     def stop_crawl(self):
         self.should_stop = True
+        self.frontier.close()
 
 
 class YouTubeDownloader:
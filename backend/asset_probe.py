@@ -0,0 +1,133 @@
+"""
+Varlık (görsel) HEAD Kontrol Önbelleği
+Tarama boyunca her farklı URL için tek bir istek: sonuç önbelleği, uçuştaki isteklerin
+birleştirilmesi ve asyncio.gather ile toplu eşzamanlı kontrol
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import aiohttp
+
+from rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProbeResult:
+    url: str
+    status: int = 0  # 0 = ağ hatası / zaman aşımı
+    content_length: int = 0
+    content_type: str = ""
+    checked_at: float = 0.0
+
+    @property
+    def size_kb(self) -> float:
+        return self.content_length / 1024
+
+    @property
+    def is_broken(self) -> bool:
+        return self.status >= 400
+
+
+class AssetProbeCache:
+    """Tarama genelinde URL -> ProbeResult önbelleği
+
+    İstekler host başına `rate_limiter`'dan geçer (verilmezse yalnızca `semaphore` ile sınırlanır).
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, semaphore: Optional[asyncio.Semaphore] = None,
+                 timeout: float = 10, rate_limiter: Optional[RateLimiter] = None):
+        self.session = session
+        self.semaphore = semaphore or asyncio.Semaphore(10)
+        self.rate_limiter = rate_limiter
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.results: Dict[str, ProbeResult] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.requests_sent = 0
+
+    def get(self, url: str) -> Optional[ProbeResult]:
+        return self.results.get(url)
+
+    async def probe(self, url: str) -> ProbeResult:
+        """URL'yi kontrol et; önbellekte varsa veya zaten kontrol ediliyorsa bekle"""
+        cached = self.results.get(url)
+        if cached is not None:
+            return cached
+        pending = self._in_flight.get(url)
+        if pending is not None:
+            # wait() bekleyeni iptal etmez ve iptal edilen future için hata fırlatmaz
+            await asyncio.wait({pending})
+            if pending.cancelled():
+                return await self.probe(url)  # İsteğin sahibi iptal edildi: yeniden dene
+            return pending.result()
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[url] = future
+        try:
+            try:
+                result = await self._request(url)
+            except Exception as e:
+                logger.debug(f"Probe failed for {url}: {e}")
+                result = ProbeResult(url=url, checked_at=time.time())
+            self.results[url] = result
+            future.set_result(result)
+            return result
+        finally:
+            self._in_flight.pop(url, None)
+            if not future.done():
+                future.cancel()  # CancelledError: bekleyenler sonsuza kadar beklemesin
+
+    async def probe_many(self, urls: Iterable[str]) -> Dict[str, ProbeResult]:
+        """Birden çok URL'yi eşzamanlı kontrol et (her farklı URL bir kez)"""
+        unique_urls = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.probe(url) for url in unique_urls))
+        return dict(zip(unique_urls, results))
+
+    async def _request(self, url: str) -> ProbeResult:
+        async with self.semaphore:
+            if self.rate_limiter is None:
+                return await self._send(url)
+            attempt = 0
+            while True:
+                async with self.rate_limiter.slot(url) as slot:
+                    result = await self._send(url, slot)
+                if not self.rate_limiter.should_retry(slot, attempt):
+                    return result
+                attempt += 1
+
+    async def _send(self, url: str, slot=None) -> ProbeResult:
+        self.requests_sent += 1
+        async with self.session.head(url, allow_redirects=True, timeout=self.timeout, ssl=False) as response:
+            if response.status not in (405, 501):
+                if slot:
+                    slot.record(response.status, response.headers)
+                return self._result(url, response.status, response.headers)
+        # HEAD desteklemeyen sunucular: tek byte'lık GET
+        async with self.session.get(url, headers={'Range': 'bytes=0-0'}, allow_redirects=True,
+                                    timeout=self.timeout, ssl=False) as response:
+            if slot:
+                slot.record(response.status, response.headers)
+            return self._result(url, response.status, response.headers)
+
+    def _result(self, url: str, status: int, headers) -> ProbeResult:
+        content_length = 0
+        content_range = headers.get('content-range', '')
+        if '/' in content_range:
+            total = content_range.rsplit('/', 1)[1]
+            content_length = int(total) if total.isdigit() else 0
+        elif headers.get('content-length', '').isdigit():
+            content_length = int(headers['content-length'])
+        if status == 206:
+            status = 200
+        return ProbeResult(
+            url=url,
+            status=status,
+            content_length=content_length,
+            content_type=headers.get('content-type', ''),
+            checked_at=time.time()
+        )
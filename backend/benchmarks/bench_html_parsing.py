@@ -0,0 +1,85 @@
+"""
+HTML parse benchmark'ı
+Kaydedilmiş HTML fixture'ları üzerinde eski BeautifulSoup taraması ile tek geçişli lxml
+çıkarımının MB başına parse süresini karşılaştırır.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_html_parsing
+    python -m benchmarks.bench_html_parsing --fixtures /kayitli/sayfalar --rounds 20
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from html_extraction import extract_static_payload
+
+FIXTURES_DIR = Path(__file__).with_name("fixtures")
+
+
+def legacy_parse(content: str, url: str) -> int:
+    """Eski WebsiteCrawler.parse_page ağaç kurma + çoklu find_all taraması (HEAD istekleri hariç)"""
+    soup = BeautifulSoup(content, 'html.parser')
+    for tag in soup.find_all(['script', 'style', 'noscript']):
+        tag.decompose()
+    found = 0
+    for img in soup.find_all('img'):
+        if img.get('src') or img.get('data-src') or img.get('data-lazy'):
+            found += 1
+    for tag in soup.find_all(style=True):
+        if re.search(r'background(?:-image)?:\s*url\(["\']?([^"\')]+)["\']?\)', tag.get('style', '')):
+            found += 1
+    found += len(soup.find_all('iframe'))
+    found += len(soup.find_all('video'))
+    for heading in soup.find_all(['h1', 'h2', 'h3']):
+        found += len(heading.get_text(strip=True)) > 10
+    for p in soup.find_all('p'):
+        found += len(p.get_text(strip=True)) > 100
+    for link in soup.find_all('a', href=True):
+        urljoin(url, link.get('href', ''))
+        found += 1
+    for img in soup.find_all('img'):
+        found += bool(img.get('src') or img.get('data-src'))
+    return found
+
+
+def lxml_parse(content: str, url: str) -> int:
+    payload = extract_static_payload(content, url, min_text_length=10)
+    return sum(len(payload[key]) for key in ('images', 'videos', 'texts', 'links'))
+
+
+def measure(func, content: str, rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        func(content, 'https://www.example.com/tr/')
+    return (time.perf_counter() - started) / rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR)
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    files = sorted(args.fixtures.glob('*.html'))
+    if not files:
+        raise SystemExit(f"Fixture bulunamadı: {args.fixtures}")
+
+    print(f"{'fixture':<28}{'KB':>8}{'bs4 ms':>10}{'lxml ms':>10}{'bs4 ms/MB':>12}{'lxml ms/MB':>12}{'hız':>7}")
+    for path in files:
+        content = path.read_text(encoding='utf-8', errors='replace')
+        size_mb = len(content.encode('utf-8')) / (1024 * 1024)
+        legacy = measure(legacy_parse, content, args.rounds)
+        current = measure(lxml_parse, content, args.rounds)
+        print(
+            f"{path.name:<28}{size_mb * 1024:>8.0f}{legacy * 1000:>10.1f}{current * 1000:>10.1f}"
+            f"{legacy * 1000 / size_mb:>12.0f}{current * 1000 / size_mb:>12.0f}{legacy / current:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
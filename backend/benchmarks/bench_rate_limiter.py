@@ -0,0 +1,124 @@
+"""
+Hız sınırlayıcı benchmark'ı
+İki yerel host: "toleranslı" (her eşzamanlılıkta sabit gecikme) ve "katı" (eşzamanlı istek
+sınırını aşınca 429 + Retry-After). Eski sabit host semaforu ile uyarlanabilir RateLimiter'ın
+istek/sn ve 429 sayılarını karşılaştırır.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_rate_limiter
+    python -m benchmarks.bench_rate_limiter --requests 400 --fixed 4 --strict-limit 3
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict
+
+import aiohttp
+from aiohttp import web
+
+from rate_limiter import RateLimiter
+
+
+def make_host(latency: float, max_concurrent: int = 0, retry_after: int = 1) -> web.Application:
+    state = {'active': 0}
+
+    async def handler(request: web.Request) -> web.Response:
+        if max_concurrent and state['active'] >= max_concurrent:
+            return web.Response(status=429, headers={'Retry-After': str(retry_after)})
+        state['active'] += 1
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            state['active'] -= 1
+        return web.Response(text='ok')
+
+    app = web.Application()
+    app.router.add_get('/{path:.*}', handler)
+    return app
+
+
+async def run_fixed(session: aiohttp.ClientSession, base: str, requests: int, fixed: int) -> Dict:
+    """Eski davranış: host başına sabit semafor, 429'da tekrar yok"""
+    semaphore = asyncio.Semaphore(fixed)
+    counts = {'ok': 0, 'throttled': 0}
+
+    async def one(index: int) -> None:
+        async with semaphore:
+            async with session.get(f'{base}/item/{index}') as response:
+                await response.read()
+                counts['ok' if response.status == 200 else 'throttled'] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    return {**counts, 'seconds': time.perf_counter() - started}
+
+
+async def run_adaptive(session: aiohttp.ClientSession, base: str, requests: int, max_per_host: int,
+                       workers: int) -> Dict:
+    """RateLimiter: 429'da Retry-After kadar bekler ve tekrar dener"""
+    limiter = RateLimiter(max_concurrency=max_per_host, max_rate=1000)
+    counts = {'ok': 0, 'throttled': 0}
+    queue = list(range(requests))
+
+    async def worker() -> None:
+        while queue:
+            index = queue.pop()
+            attempt = 0
+            while True:
+                async with limiter.slot(f'{base}/item/{index}') as slot:
+                    async with session.get(f'{base}/item/{index}') as response:
+                        slot.record(response.status, response.headers)
+                        await response.read()
+                if slot.throttled:
+                    counts['throttled'] += 1
+                if not limiter.should_retry(slot, attempt):
+                    counts['ok'] += response.status == 200
+                    break
+                attempt += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    host_stats = limiter.stats()['busiest'][0]
+    return {**counts, 'seconds': time.perf_counter() - started, 'window': host_stats['window']}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--fixed', type=int, default=4, help='Eski max_per_host')
+    parser.add_argument('--max-per-host', type=int, default=16, help='Sınırlayıcının üst sınırı')
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--strict-limit', type=int, default=3, help='Katı host eşzamanlılık sınırı')
+    parser.add_argument('--port', type=int, default=8790)
+    args = parser.parse_args()
+
+    hosts = {
+        'toleranslı': make_host(args.latency),
+        'katı': make_host(args.latency, max_concurrent=args.strict_limit),
+    }
+    runners = []
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        try:
+            for offset, (name, app) in enumerate(hosts.items()):
+                runner = web.AppRunner(app)
+                await runner.setup()
+                await web.TCPSite(runner, '127.0.0.1', args.port + offset).start()
+                runners.append(runner)
+                base = f'http://127.0.0.1:{args.port + offset}'
+
+                fixed = await run_fixed(session, base, args.requests, args.fixed)
+                adaptive = await run_adaptive(session, base, args.requests, args.max_per_host, args.max_per_host)
+                for label, result in (('sabit', fixed), ('uyarlanabilir', adaptive)):
+                    print(
+                        f"{name:11} {label:14} {result['ok']:4} başarılı, {result['throttled']:4} x 429, "
+                        f"{result['seconds']:6.2f} sn, {result['ok'] / result['seconds']:7.1f} başarılı istek/sn"
+                        + (f", son pencere {result['window']}" if 'window' in result else '')
+                    )
+        finally:
+            for runner in runners:
+                await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
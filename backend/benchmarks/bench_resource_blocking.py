@@ -0,0 +1,64 @@
+"""
+Hızlı mod (kaynak engelleme) benchmark'ı
+Yerel fixture site üzerinde engellemeli ve engellemesiz sayfa/sn karşılaştırması
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_resource_blocking --pages 40 --workers 4
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from urllib.parse import urlparse
+
+from advanced_crawler import AdvancedCrawler
+from benchmarks.fixture_site import start_fixture_site
+
+
+async def run_once(base_url: str, pages: int, workers: int, block_resources: bool) -> dict:
+    crawler = AdvancedCrawler(
+        base_url,
+        max_pages=pages,
+        download_dir=tempfile.mkdtemp(prefix='bench_'),
+        workers=workers,
+        block_resources=block_resources,
+    )
+    # Fixture'daki "analitik" script'i yerel host'ta; alan adı listesi yerine yol ile engelle
+    if block_resources:
+        crawler.block_domains.add(f"{urlparse(base_url).netloc}/static/analytics.js")
+
+    started = time.perf_counter()
+    report = await crawler.run_crawl()
+    elapsed = time.perf_counter() - started
+    return {
+        'mode': 'blocking' if block_resources else 'full',
+        'pages': report.total_urls,
+        'images': len(report.images),
+        'seconds': round(elapsed, 2),
+        'pages_per_sec': round(report.total_urls / elapsed, 2) if elapsed else 0,
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=40)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    runner = await start_fixture_site(port=args.port, total_pages=args.pages * 2)
+    base_url = f'http://127.0.0.1:{args.port}'
+    try:
+        for block_resources in (False, True):
+            result = await run_once(base_url, args.pages, args.workers, block_resources)
+            print(
+                f"{result['mode']:>9}: {result['pages']} sayfa, {result['images']} görsel, "
+                f"{result['seconds']} sn, {result['pages_per_sec']} sayfa/sn"
+            )
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
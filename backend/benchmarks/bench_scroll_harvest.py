@@ -0,0 +1,74 @@
+"""
+Sonsuz kaydırma toplama benchmark'ı
+Fixture'daki /scroll sayfasında eski sabit beklemeli kaydırma döngüsü (30 x 800 ms) ile
+MutationObserver tabanlı uyarlanabilir toplayıcının süresini ve bulunan kart oranını karşılaştırır.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.bench_scroll_harvest --total 200 --latency 150-700 --rounds 3
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+
+from playwright.async_api import async_playwright
+
+from advanced_crawler import AdvancedCrawler, PAGE_EXTRACTION_SCRIPT
+from benchmarks.fixture_site import start_fixture_site
+
+
+async def legacy_harvest(page) -> int:
+    """Eski harvest_scrolled_videos: her turda kaydır, 800 ms bekle, 2 tur büyüme yoksa dur"""
+    seen = {item['url'] for item in (await page.evaluate(PAGE_EXTRACTION_SCRIPT, {'videosOnly': True}))['videos']}
+    stable_rounds = 0
+    for _ in range(30):
+        await page.evaluate("window.scrollBy(0, Math.floor(window.innerHeight * 0.9));")
+        await page.wait_for_timeout(800)
+        before_count = len(seen)
+        batch = await page.evaluate(PAGE_EXTRACTION_SCRIPT, {'videosOnly': True})
+        seen.update(item['url'] for item in batch['videos'])
+        stable_rounds = stable_rounds + 1 if len(seen) == before_count else 0
+        if stable_rounds >= 2:
+            break
+    return len(seen)
+
+
+async def adaptive_harvest(page) -> int:
+    crawler = AdvancedCrawler('http://127.0.0.1', download_dir=tempfile.mkdtemp(prefix='bench_'))
+    return len(await crawler.harvest_scrolled_videos(page, []))
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--total', type=int, default=200)
+    parser.add_argument('--batch', type=int, default=12)
+    parser.add_argument('--latency', default='150-700', help='Parti başına sunucu gecikmesi aralığı (ms)')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    runner = await start_fixture_site(port=args.port)
+    url = f'http://127.0.0.1:{args.port}/scroll?total={args.total}&batch={args.batch}&latency={args.latency}'
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(headless=True)
+        page = await browser.new_page(viewport={'width': 1920, 'height': 1080})
+        try:
+            for name, harvest in (('sabit bekleme', legacy_harvest), ('uyarlanabilir', adaptive_harvest)):
+                timings, found = [], []
+                for _ in range(args.rounds):
+                    await page.goto(url, wait_until='domcontentloaded')
+                    started = time.perf_counter()
+                    found.append(await harvest(page))
+                    timings.append(time.perf_counter() - started)
+                print(
+                    f"{name:>13}: ort. {sum(timings) / len(timings):.2f} sn, "
+                    f"bulunan {min(found)}-{max(found)} / {args.total} kart"
+                )
+        finally:
+            await browser.close()
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
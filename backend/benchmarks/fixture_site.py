@@ -0,0 +1,100 @@
+"""
+Benchmark'lar için yerel fixture site
+Bağlantılı sayfalar + yavaş servis edilen görsel, font, medya ve "analitik" kaynakları
++ kartları gecikmeli parti parti ekleyen sonsuz kaydırma sayfası (/scroll)
+"""
+
+import asyncio
+import random
+from pathlib import Path
+
+from aiohttp import web
+
+ASSET_DELAY = 0.05  # Her statik kaynak için yapay gecikme (sn)
+IMAGE_BYTES = 200 * 1024
+FONT_BYTES = 100 * 1024
+MEDIA_BYTES = 1024 * 1024
+INFINITE_SCROLL_PAGE = Path(__file__).with_name("fixtures") / "infinite_scroll.html"
+
+
+def render_page(index: int, total_pages: int, fanout: int = 3, images: int = 8) -> str:
+    links = ''.join(
+        f'<a href="/page/{child}">Sayfa {child}</a>'
+        for child in range(index * fanout + 1, index * fanout + fanout + 1)
+        if child < total_pages
+    )
+    imgs = ''.join(
+        f'<img src="/static/img/{index}_{n}.jpg" alt="Görsel {n}" width="300" height="200">'
+        for n in range(images)
+    )
+    return f'''<!DOCTYPE html>
+<html lang="tr">
+<head>
+<meta charset="utf-8">
+<title>Fixture {index}</title>
+<style>
+@font-face {{ font-family: Fixture; src: url(/static/font/fixture.woff2) format("woff2"); }}
+body {{ font-family: Fixture, sans-serif; }}
+.hero {{ background-image: url(/static/img/hero_{index}.jpg); height: 300px; }}
+</style>
+<script async src="/static/analytics.js?host=google-analytics.com"></script>
+</head>
+<body>
+<div class="hero"></div>
+<h1>Fixture sayfası {index} - yerel benchmark içeriği</h1>
+<p>{"Bu paragraf benchmark için yeterince uzun bir metin içerir. " * 5}</p>
+{imgs}
+<video src="/static/media/clip_{index}.mp4" preload="auto" autoplay muted></video>
+<nav>{links}</nav>
+</body>
+</html>'''
+
+
+def make_app(total_pages: int = 100, asset_delay: float = ASSET_DELAY) -> web.Application:
+    async def page(request: web.Request) -> web.Response:
+        index = int(request.match_info.get('index', 0))
+        if index >= total_pages:
+            raise web.HTTPNotFound()
+        return web.Response(text=render_page(index, total_pages), content_type='text/html')
+
+    def static(size: int, content_type: str):
+        async def handler(request: web.Request) -> web.Response:
+            await asyncio.sleep(asset_delay)
+            return web.Response(body=b'\0' * size, content_type=content_type)
+        return handler
+
+    async def analytics(request: web.Request) -> web.Response:
+        await asyncio.sleep(asset_delay * 4)
+        return web.Response(text='window.__fixtureAnalytics = true;', content_type='application/javascript')
+
+    async def scroll_page(request: web.Request) -> web.FileResponse:
+        return web.FileResponse(INFINITE_SCROLL_PAGE)
+
+    async def scroll_cards(request: web.Request) -> web.Response:
+        """Sonsuz kaydırma partisi: ?latency=150-700 aralığında rastgele gecikme"""
+        low, _, high = request.query.get('latency', '150-700').partition('-')
+        await asyncio.sleep(random.uniform(float(low), float(high or low)) / 1000)
+        return web.json_response({'offset': int(request.query.get('offset', 0))})
+
+    app = web.Application()
+    app.router.add_get('/', page)
+    app.router.add_get('/scroll', scroll_page)
+    app.router.add_get('/scroll/cards', scroll_cards)
+    app.router.add_get('/page/{index}', page)
+    app.router.add_get('/static/img/{name}', static(IMAGE_BYTES, 'image/jpeg'))
+    app.router.add_get('/static/font/{name}', static(FONT_BYTES, 'font/woff2'))
+    app.router.add_get('/static/media/{name}', static(MEDIA_BYTES, 'video/mp4'))
+    app.router.add_get('/static/analytics.js', analytics)
+    return app
+
+
+async def start_fixture_site(port: int = 8765, **kwargs) -> web.AppRunner:
+    """Fixture siteyi başlat; işiniz bitince runner.cleanup() çağırın"""
+    runner = web.AppRunner(make_app(**kwargs))
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', port).start()
+    return runner
+
+
+if __name__ == "__main__":
+    web.run_app(make_app(), host='127.0.0.1', port=8765)
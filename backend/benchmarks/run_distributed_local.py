@@ -0,0 +1,76 @@
+"""
+Dağıtık tarama yerel denemesi
+Fixture siteyi başlatır, bir dağıtık tarama oluşturur ve birden fazla `crawl_worker.py run`
+sürecini aynı MongoDB'ye karşı çalıştırır; sonunda tekrar eden sayfa/görsel olup olmadığını kontrol eder.
+
+Yerel MongoDB gerekir (örn. `docker run -d -p 27017:27017 mongo:7`); MONGO_URL / DB_NAME ortamdan okunur.
+
+Kullanım (backend klasöründen):
+    python -m benchmarks.run_distributed_local --processes 3 --pages 150
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from benchmarks.fixture_site import start_fixture_site
+from crawl_worker import create_crawl, crawl_status
+from report_store import REPORT_COLLECTIONS
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=2, help='Süreç başına paralel sayfa')
+    parser.add_argument('--pages', type=int, default=150)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--engine', default='hybrid', choices=('hybrid', 'browser'))
+    args = parser.parse_args()
+
+    db_name = os.environ.get('DB_NAME', 'website_scanner_distributed_test')
+    client = AsyncIOMotorClient(os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
+    db = client[db_name]
+    runner = await start_fixture_site(port=args.port, total_pages=args.pages * 2)
+    try:
+        crawl = await create_crawl(db, f'http://127.0.0.1:{args.port}', {
+            'max_pages': args.pages, 'engine': args.engine, 'fast_mode': True
+        })
+        crawl_id, report_id = crawl['_id'], crawl['report_id']
+        print(f"crawl_id={crawl_id} report_id={report_id}")
+
+        started = time.perf_counter()
+        env = {**os.environ, 'DB_NAME': db_name, 'CRAWL_HEARTBEAT_INTERVAL': '2'}
+        processes = [
+            await asyncio.create_subprocess_exec(
+                sys.executable, 'crawl_worker.py', 'run', crawl_id, '--workers', str(args.workers),
+                cwd=str(BACKEND_DIR), env=env, stdout=asyncio.subprocess.PIPE
+            )
+            for _ in range(args.processes)
+        ]
+        outputs = await asyncio.gather(*(process.communicate() for process in processes))
+        elapsed = time.perf_counter() - started
+
+        for stdout, _ in outputs:
+            print(stdout.decode().strip().splitlines()[-1] if stdout else '(çıktı yok)')
+        status = await crawl_status(db, crawl_id)
+        print(f"durum={status['status']} frontier={status['frontier']} {elapsed:.2f} sn")
+
+        for kind in ('pages', 'images'):
+            collection = db[REPORT_COLLECTIONS[kind]]
+            total = await collection.count_documents({'report_id': report_id})
+            unique = len(await collection.distinct('url', {'report_id': report_id}))
+            print(f"{kind}: {total} kayıt, {unique} tekil")
+    finally:
+        await runner.cleanup()
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,238 @@
+"""
+Tarayıcı Havuzu - Uygulama boyunca açık kalan Chromium süreçleri
+Taramalar Chromium başlatmak yerine havuzdan yalıtılmış (ayrı çerez/önbellek) context alır.
+Belirli sayıda sayfadan veya bellek eşiğinden sonra tarayıcı emekliye ayrılır; yeni context'ler
+taze tarayıcıya gider, eskisi son context'i bırakıldığında kapatılır.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from playwright.async_api import async_playwright, Browser, BrowserContext
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+    logger.warning("psutil not found, browser RSS limits are disabled")
+
+
+@dataclass
+class PooledBrowser:
+    browser_id: int
+    browser: Browser
+    launched_at: float = field(default_factory=time.monotonic)
+    pages: int = 0  # Bu tarayıcıda açılan (render edilen) sayfa sayısı
+    contexts: Set[BrowserContext] = field(default_factory=set)
+    pids: Set[int] = field(default_factory=set)  # Chromium kök süreçleri (psutil varsa)
+    retiring: bool = False
+
+    def rss_mb(self) -> Optional[float]:
+        """Tarayıcı ve alt süreçlerinin toplam RSS'i (psutil yoksa None)"""
+        if not HAS_PSUTIL or not self.pids:
+            return None
+        total = 0
+        for pid in self.pids:
+            try:
+                process = psutil.Process(pid)
+                total += process.memory_info().rss
+                total += sum(child.memory_info().rss for child in process.children(recursive=True))
+            except psutil.Error:
+                continue
+        return round(total / (1024 * 1024), 1)
+
+
+def _child_pids() -> Set[int]:
+    if not HAS_PSUTIL:
+        return set()
+    try:
+        return {child.pid for child in psutil.Process(os.getpid()).children(recursive=True)}
+    except psutil.Error:
+        return set()
+
+
+class BrowserPool:
+    """FastAPI yaşam döngüsüne bağlı Chromium havuzu
+
+    `acquire_context()` en az yüklü sağlıklı tarayıcıda yeni bir context açar (milisaniyeler),
+    `release_context()` kapatır. `max_pages_per_browser` veya `max_rss_mb` aşılınca tarayıcı
+    emekliye ayrılır ve yerine yenisi başlatılır.
+    """
+
+    def __init__(self, size: int = 1, max_pages_per_browser: int = 2000, max_rss_mb: Optional[float] = 2048,
+                 launch_options: Optional[Dict] = None):
+        self.size = max(1, size)
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_rss_mb = max_rss_mb
+        self.launch_options = {'headless': True, **(launch_options or {})}
+        self._playwright = None
+        self._browsers: List[PooledBrowser] = []
+        self._context_owner: Dict[BrowserContext, PooledBrowser] = {}
+        self._lock = asyncio.Lock()
+        self._ids = itertools.count(1)
+        self._replenish_task: Optional[asyncio.Task] = None
+        self.launches = 0
+        self.recycled = 0
+        self.contexts_served = 0
+        self._acquire_ms: List[float] = []
+
+    @property
+    def started(self) -> bool:
+        return self._playwright is not None
+
+    async def start(self) -> None:
+        """Playwright'ı ve `size` tarayıcıyı önceden başlat (uygulama başlangıcında)"""
+        async with self._lock:
+            await self._ensure_playwright()
+            while len(self._healthy()) < self.size:
+                await self._launch()
+        logger.info(f"Browser pool started with {self.size} browsers")
+
+    async def shutdown(self) -> None:
+        if self._replenish_task:
+            self._replenish_task.cancel()
+        async with self._lock:
+            for pooled in self._browsers:
+                await self._close(pooled)
+            self._browsers = []
+            self._context_owner.clear()
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def acquire_context(self, **context_options) -> BrowserContext:
+        """Yeni yalıtılmış context; gerekirse tarayıcıyı (yeniden) başlatır"""
+        started = time.perf_counter()
+        async with self._lock:
+            await self._ensure_playwright()
+            for pooled in self._healthy():
+                self._check_recycle(pooled)
+            candidates = self._healthy()
+            if len(candidates) < self.size:
+                candidates.append(await self._launch())
+            pooled = min(candidates, key=lambda item: len(item.contexts))
+            context = await pooled.browser.new_context(**context_options)
+            pooled.contexts.add(context)
+            self._context_owner[context] = pooled
+            self.contexts_served += 1
+        self._acquire_ms.append((time.perf_counter() - started) * 1000)
+        del self._acquire_ms[:-100]
+        return context
+
+    async def release_context(self, context: BrowserContext) -> None:
+        """Context'i kapat; emekli tarayıcının son context'iyse tarayıcıyı da kapat"""
+        pooled = self._context_owner.pop(context, None)
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Context close failed: {e}")
+        if pooled is None:
+            return
+        pooled.contexts.discard(context)
+        async with self._lock:
+            self._check_recycle(pooled)
+            if pooled.retiring and not pooled.contexts and pooled in self._browsers:
+                self._browsers.remove(pooled)
+                await self._close(pooled)
+            if pooled.retiring and len(self._healthy()) < self.size:
+                # Yedek tarayıcı arka planda ısınır; sonraki tarama beklemez
+                if self._replenish_task is None or self._replenish_task.done():
+                    self._replenish_task = asyncio.create_task(self._replenish())
+
+    async def _replenish(self) -> None:
+        try:
+            async with self._lock:
+                while self._playwright and len(self._healthy()) < self.size:
+                    await self._launch()
+        except Exception as e:
+            logger.error(f"Browser pool replenish failed: {e}")
+
+    def note_page(self, context: Optional[BrowserContext]) -> None:
+        """Context'te bir sayfa render edildi (geri dönüşüm sayacı)"""
+        pooled = self._context_owner.get(context)
+        if pooled:
+            pooled.pages += 1
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        acquire_ms = sorted(self._acquire_ms)
+        return {
+            'size': self.size,
+            'started': self.started,
+            'launches': self.launches,
+            'recycled': self.recycled,
+            'contexts_served': self.contexts_served,
+            'active_contexts': len(self._context_owner),
+            'acquire_ms_p50': round(acquire_ms[len(acquire_ms) // 2], 2) if acquire_ms else None,
+            'max_pages_per_browser': self.max_pages_per_browser,
+            'max_rss_mb': self.max_rss_mb if HAS_PSUTIL else None,
+            'browsers': [
+                {
+                    'id': pooled.browser_id,
+                    'age_seconds': round(now - pooled.launched_at, 1),
+                    'pages': pooled.pages,
+                    'contexts': len(pooled.contexts),
+                    'rss_mb': pooled.rss_mb(),
+                    'retiring': pooled.retiring,
+                    'connected': pooled.browser.is_connected(),
+                }
+                for pooled in self._browsers
+            ]
+        }
+
+    def _healthy(self) -> List[PooledBrowser]:
+        return [pooled for pooled in self._browsers if not pooled.retiring and pooled.browser.is_connected()]
+
+    def _check_recycle(self, pooled: PooledBrowser) -> None:
+        if pooled.retiring:
+            return
+        reason = ''
+        if not pooled.browser.is_connected():
+            reason = 'disconnected'
+        elif self.max_pages_per_browser and pooled.pages >= self.max_pages_per_browser:
+            reason = f'{pooled.pages} pages'
+        elif self.max_rss_mb:
+            rss = pooled.rss_mb()
+            if rss is not None and rss >= self.max_rss_mb:
+                reason = f'{rss} MB RSS'
+        if reason:
+            pooled.retiring = True
+            self.recycled += 1
+            logger.info(f"Retiring browser {pooled.browser_id} ({reason})")
+
+    async def _ensure_playwright(self) -> None:
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+    async def _launch(self) -> PooledBrowser:
+        before = _child_pids()
+        browser = await self._playwright.chromium.launch(**self.launch_options)
+        new_pids = _child_pids() - before
+        pooled = PooledBrowser(browser_id=next(self._ids), browser=browser)
+        if HAS_PSUTIL and new_pids:
+            # Yeni süreçlerden ebeveyni yeni olmayanlar bu tarayıcının kökleri
+            for pid in new_pids:
+                try:
+                    if psutil.Process(pid).ppid() not in new_pids:
+                        pooled.pids.add(pid)
+                except psutil.Error:
+                    continue
+        self._browsers.append(pooled)
+        self.launches += 1
+        return pooled
+
+    async def _close(self, pooled: PooledBrowser) -> None:
+        for context in list(pooled.contexts):
+            self._context_owner.pop(context, None)
+        try:
+            await pooled.browser.close()
+        except Exception as e:
+            logger.debug(f"Browser close failed: {e}")
@@ -0,0 +1,483 @@
+"""
+Toplu Görsel İndirici - /api/download/images
+Görseller sınırlı eşzamanlılıkla (host başına hız sınırlayıcıdan geçerek) indirilir ve ZIP'e
+yazılır: ya diske (<id>.zip) ya da istemciye akan bir ZIP akışına. Gövdeler bellekte toplanmaz:
+- Disk işleri her dosyayı akışla .part dosyasına yazar (sha256 yazarken hesaplanır), sırayla
+  ZIP'e ekler; yeni indirilenler medya deposuna taşınır.
+- Akış modunda eşzamanlı worker'lar yanıtları açar, ZIP girdileri sırayla doğrudan yanıt
+  gövdesinden (veri tanımlayıcılı) yazılır; akış modu depoya yazmaz.
+Medya deposu verilmişse daha önce indirilen URL'ler depodaki dosyadan okunur.
+JPEG/PNG/WebP gibi zaten sıkıştırılmış biçimler STORED modda eklenir. Geçici hatalar üstel
+beklemeyle tekrar denenir; iş ilerlemesi callback ile (WebSocket) bildirilir.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import shutil
+import time
+import uuid
+import zipfile
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+import aiofiles
+import aiohttp
+
+from media_store import MediaStore
+from rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+FILE_CHUNK_SIZE = 1024 * 1024  # Diskteki dosyalar ZIP akışına bu parçalarla okunur
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+MAX_STORED_ERRORS = 100  # İş durumunda tutulan hata örneği
+MAX_FINISHED_JOBS = 50
+MAX_FILE_BYTES = 50 * 1024 * 1024  # Dosya başına üst sınır
+SOCK_READ_TIMEOUT = 30  # Sunucu bu kadar süre veri göndermezse istek zaman aşımına uğrar
+# Zaten sıkıştırılmış biçimler: deflate CPU harcar, boyutu küçültmez
+STORED_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif', '.heic', '.heif', '.jxl',
+    '.mp4', '.webm', '.mov', '.mp3', '.zip', '.gz', '.woff', '.woff2',
+}
+
+ProgressCallback = Callable[['BulkDownloadJob'], Awaitable[None]]
+
+
+@dataclass
+class _Entry:
+    """ZIP'e yazılacak dosya: diskte (`path`) ya da açık bir yanıt gövdesi (`body`, akış modu)"""
+    url: str
+    name: str
+    content_type: str
+    path: Optional[Path] = None
+    temporary: bool = False  # .part dosyası: yazıldıktan sonra depoya taşınır veya silinir
+    digest: str = ''
+    body: Optional[AsyncIterator[bytes]] = None
+    done: Optional[asyncio.Future] = None  # Akış modu: worker yanıtı bu tamamlanana kadar açık tutar
+
+    def release(self) -> None:
+        if self.done is not None and not self.done.done():
+            self.done.set_result(None)
+
+
+@dataclass
+class BulkDownloadJob:
+    job_id: str
+    urls: List[str]
+    status: str = 'queued'  # queued, running, completed, failed
+    completed: int = 0
+    failed: int = 0
+    bytes_downloaded: int = 0
+    cached: int = 0  # Ağa çıkmadan medya deposundan gelen
+    files: List[str] = field(default_factory=list)  # ZIP'e yazılan dosya adları
+    errors: List[Dict] = field(default_factory=list)
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    streamed: bool = False  # ZIP diske yazılmadı, doğrudan istemciye aktı
+    _names: Set[str] = field(default_factory=set, repr=False)
+
+    @property
+    def total(self) -> int:
+        return len(self.urls)
+
+    def to_status(self) -> Dict:
+        """WebSocket ve durum uç noktası için özet"""
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at if self.started_at else 0.0
+        status = {
+            'type': 'image_download',
+            'job_id': self.job_id,
+            'status': self.status,
+            'total': self.total,
+            'completed': self.completed,
+            'failed': self.failed,
+            'percent': round((self.completed + self.failed) * 100 / self.total, 1) if self.total else 100.0,
+            'bytes': self.bytes_downloaded,
+            'cached': self.cached,
+            'elapsed': round(elapsed, 2),
+            'created_at': self.created_at,
+        }
+        if self.status == 'completed' and not self.streamed:
+            status['download_url'] = f"/api/download/file/{self.job_id}"
+        return status
+
+    def result(self) -> Dict:
+        """Eski /download/images yanıt biçimi"""
+        if self.status == 'completed':
+            return {
+                "success": True,
+                "download_id": self.job_id,
+                "files_count": len(self.files),
+                "failed_count": self.failed,
+                "download_url": f"/api/download/file/{self.job_id}",
+                "errors": self.errors
+            }
+        return {"success": False, "message": "İndirilemedi", "download_id": self.job_id, "errors": self.errors}
+
+
+class BulkImageDownloader:
+    """İş kimliğiyle toplu görsel indirme ve ZIP'leme
+
+    `concurrency` toplam eşzamanlı indirme; host başına sınır `rate_limiter`'dadır.
+    """
+
+    def __init__(self, download_dir: str, rate_limiter: Optional[RateLimiter] = None, concurrency: int = 16,
+                 retries: int = 3, backoff: float = 0.5, timeout: float = 60, progress_interval: float = 0.25,
+                 media_store: Optional[MediaStore] = None):
+        self.download_dir = Path(download_dir)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.media_store = media_store
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_read=SOCK_READ_TIMEOUT)
+        # Akış modunda yanıtlar istemci ZIP'i okuyana kadar açık bekler: toplam süre sınırı yok,
+        # sadece bağlantı ve okuma boşluğu sınırlı (tampon dolunca okuma duraklar, süre işlemez)
+        self.stream_timeout = aiohttp.ClientTimeout(sock_connect=timeout, sock_read=SOCK_READ_TIMEOUT)
+        self.progress_interval = progress_interval
+        self.jobs: Dict[str, BulkDownloadJob] = {}
+
+    def create_job(self, urls: List[str]) -> BulkDownloadJob:
+        job = BulkDownloadJob(job_id=str(uuid.uuid4())[:8], urls=list(dict.fromkeys(url for url in urls if url)))
+        self.jobs[job.job_id] = job
+        finished = [job_id for job_id, item in self.jobs.items() if item.status in ('completed', 'failed')]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self.jobs[job_id]
+        return job
+
+    def get(self, job_id: str) -> Optional[BulkDownloadJob]:
+        return self.jobs.get(job_id)
+
+    async def run(self, job: BulkDownloadJob, progress_callback: Optional[ProgressCallback] = None) -> BulkDownloadJob:
+        """Tüm URL'leri .part dosyalarına indirip sırayla <id>.zip'e yaz (yarım ZIP .part adıyla durur)"""
+        zip_path = self.download_dir / f"{job.job_id}.zip"
+        part_path = self.download_dir / f"{job.job_id}.zip.part"
+        spool_dir = self.download_dir / f"{job.job_id}.files"
+        notify = self._notifier(job, progress_callback)
+        self._start(job)
+        try:
+            await notify(force=True)
+            spool_dir.mkdir(parents=True, exist_ok=True)
+            with zipfile.ZipFile(part_path, 'w') as zf:
+                async with aclosing(self._entries(job, spool_dir)) as entries:
+                    async for entry in entries:
+                        try:
+                            await asyncio.to_thread(_write_file, zf, _zip_info(entry.name, entry.content_type),
+                                                    entry.path)
+                            self._written(job, entry.name)
+                            if entry.temporary and self.media_store is not None:
+                                await self._store(entry)
+                        finally:
+                            if entry.temporary:
+                                entry.path.unlink(missing_ok=True)
+                        await notify()
+            if job.files:
+                os.replace(part_path, zip_path)
+                job.status = 'completed'
+            else:
+                job.status = 'failed'
+        except Exception as e:
+            logger.error(f"Bulk download {job.job_id} failed: {e}")
+            job.status = 'failed'
+            self._add_error(job, '', str(e))
+        finally:
+            if part_path.exists():
+                part_path.unlink()
+            shutil.rmtree(spool_dir, ignore_errors=True)
+            self._finish(job)
+            await notify(force=True)
+        return job
+
+    async def stream(self, job: BulkDownloadJob,
+                     progress_callback: Optional[ProgressCallback] = None) -> AsyncIterator[bytes]:
+        """ZIP'i parça parça üret (StreamingResponse); disk kullanılmaz
+
+        Çıktı aranabilir olmadığından zipfile her girdi için veri tanımlayıcısı yazar. Girdi
+        gövdesi okunurken koparsa girdi yarım kalır ve errors.txt'de belirtilir. Başarısız
+        URL'ler sonda errors.txt olarak eklenir.
+        """
+        buffer = _ZipStream()
+        notify = self._notifier(job, progress_callback)
+        job.streamed = True
+        self._start(job)
+        try:
+            await notify(force=True)
+            with zipfile.ZipFile(buffer, 'w') as zf:
+                async with aclosing(self._entries(job)) as entries:
+                    async for entry in entries:
+                        try:
+                            with zf.open(_zip_info(entry.name, entry.content_type), 'w') as dest:
+                                async for chunk in self._read(entry):
+                                    dest.write(chunk)
+                                    yield buffer.drain()
+                        except (aiohttp.ClientError, asyncio.TimeoutError, OSError, ValueError) as e:
+                            job.failed += 1
+                            self._add_error(job, entry.url, f"incomplete: {str(e) or e.__class__.__name__}")
+                        else:
+                            self._written(job, entry.name)
+                        finally:
+                            entry.release()
+                        yield buffer.drain()
+                        await notify()
+                if job.errors:
+                    zf.writestr('errors.txt', ''.join(f"{item['url']}\t{item['error']}\n" for item in job.errors))
+            yield buffer.drain()
+            job.status = 'completed'
+        except BaseException as e:
+            # İstemci bağlantıyı kesti (iptal) veya beklenmeyen hata
+            job.status = 'failed'
+            self._add_error(job, '', str(e) or e.__class__.__name__)
+            raise
+        finally:
+            self._finish(job)
+            await notify(force=True)
+
+    async def _entries(self, job: BulkDownloadJob, spool_dir: Optional[Path] = None) -> AsyncIterator[_Entry]:
+        """Hazır girdiler bitiş sırasıyla; en fazla ~2 x concurrency dosya bekler
+
+        `spool_dir` verilirse gövdeler oraya indirilir, yoksa girdiler açık yanıtlardır (akış).
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        pending = iter(job.urls)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ssl=False)
+        timeout = self.timeout if spool_dir else self.stream_timeout
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async def spool(url: str, response: aiohttp.ClientResponse) -> _Entry:
+                return await self._spool(job, url, response, spool_dir)
+
+            async def hand_over(url: str, response: aiohttp.ClientResponse) -> None:
+                # Yanıt, gövdesi ZIP'e yazılana kadar açık kalır
+                entry = _Entry(url=url, name=self._reserve_name(job, url, response.headers.get('content-type', '')),
+                               content_type=response.headers.get('content-type', ''),
+                               body=self._body(job, response), done=asyncio.get_running_loop().create_future())
+                await queue.put(entry)
+                await entry.done
+
+            async def worker() -> None:
+                for url in pending:
+                    entry = await self._cached(job, url)
+                    if entry is None:
+                        entry = await self._fetch(session, job, url, spool if spool_dir else hand_over)
+                    if entry is not None:
+                        await queue.put(entry)
+
+            async def producer() -> None:
+                try:
+                    await asyncio.gather(*(worker() for _ in range(min(self.concurrency, job.total or 1))))
+                finally:
+                    await queue.put(None)
+
+            task = asyncio.create_task(producer())
+            try:
+                while (entry := await queue.get()) is not None:
+                    yield entry
+                await task
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                # İşlenmeden kalan .part dosyaları
+                while not queue.empty():
+                    entry = queue.get_nowait()
+                    if entry is not None and entry.temporary:
+                        entry.path.unlink(missing_ok=True)
+
+    async def _cached(self, job: BulkDownloadJob, url: str) -> Optional[_Entry]:
+        """URL medya deposunda varsa depodaki dosya (ağa çıkmadan)"""
+        if self.media_store is None:
+            return None
+        try:
+            stored = await asyncio.to_thread(self.media_store.lookup, url, '', False)
+        except OSError:
+            return None
+        if stored is None or stored.size > MAX_FILE_BYTES:
+            return None
+        job.cached += 1
+        job.bytes_downloaded += stored.size
+        return _Entry(url=url, name=self._reserve_name(job, url, stored.content_type),
+                      content_type=stored.content_type, path=Path(stored.path))
+
+    async def _fetch(self, session: aiohttp.ClientSession, job: BulkDownloadJob, url: str,
+                     handle: Callable[[str, aiohttp.ClientResponse], Awaitable[Optional[_Entry]]]) -> Optional[_Entry]:
+        """Tek URL'yi iste, 200 yanıtını `handle` işler; geçici hatalarda tekrar dene. Başarısızsa None"""
+        error = ''
+        for attempt in range(self.retries + 1):
+            try:
+                async with self.rate_limiter.slot(url) as slot:
+                    async with session.get(url) as response:
+                        slot.record(response.status, response.headers)
+                        if response.status == 200:
+                            if (response.content_length or 0) > MAX_FILE_BYTES:
+                                raise ValueError(_too_large())
+                            return await handle(url, response)
+                        error = f"HTTP {response.status}"
+                        if response.status not in RETRY_STATUSES:
+                            break
+                        if slot.throttled:
+                            # Bekleme (Retry-After) sınırlayıcının bir sonraki slot'unda yapılır
+                            continue
+            except ValueError as e:
+                error = str(e)
+                break
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                error = str(e) or e.__class__.__name__
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+        job.failed += 1
+        self._add_error(job, url, error)
+        return None
+
+    async def _spool(self, job: BulkDownloadJob, url: str, response: aiohttp.ClientResponse,
+                     spool_dir: Path) -> _Entry:
+        """Gövdeyi akışla .part dosyasına yaz; sha256 yazarken hesaplanır"""
+        part_path = spool_dir / f"{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(part_path, 'wb') as f:
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_FILE_BYTES:
+                        raise ValueError(_too_large())
+                    digest.update(chunk)
+                    await f.write(chunk)
+        except BaseException:
+            part_path.unlink(missing_ok=True)
+            raise
+        job.bytes_downloaded += size
+        content_type = response.headers.get('content-type', '')
+        return _Entry(url=url, name=self._reserve_name(job, url, content_type), content_type=content_type,
+                      path=part_path, temporary=True, digest=digest.hexdigest())
+
+    @staticmethod
+    async def _body(job: BulkDownloadJob, response: aiohttp.ClientResponse) -> AsyncIterator[bytes]:
+        size = 0
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_FILE_BYTES:
+                raise ValueError(_too_large())
+            job.bytes_downloaded += len(chunk)
+            yield chunk
+
+    @staticmethod
+    async def _read(entry: _Entry) -> AsyncIterator[bytes]:
+        """Girdinin gövdesi parça parça: açık yanıt ya da diskteki dosya"""
+        if entry.body is not None:
+            async for chunk in entry.body:
+                yield chunk
+            return
+        with open(entry.path, 'rb') as f:
+            while chunk := await asyncio.to_thread(f.read, FILE_CHUNK_SIZE):
+                yield chunk
+
+    async def _store(self, entry: _Entry) -> None:
+        """İndirilen .part dosyasını medya deposuna taşı"""
+        try:
+            await asyncio.to_thread(self.media_store.put_file, str(entry.path), url=entry.url, name=entry.name,
+                                    content_type=entry.content_type, digest=entry.digest, link=False)
+        except Exception as e:
+            logger.debug(f"Media store write failed for {entry.url}: {e}")
+
+    def _notifier(self, job: BulkDownloadJob, progress_callback: Optional[ProgressCallback]):
+        last_notified = 0.0
+
+        async def notify(force: bool = False) -> None:
+            nonlocal last_notified
+            if progress_callback and (force or time.monotonic() - last_notified >= self.progress_interval):
+                last_notified = time.monotonic()
+                try:
+                    await progress_callback(job)
+                except Exception as e:
+                    logger.debug(f"Progress callback failed: {e}")
+
+        return notify
+
+    @staticmethod
+    def _start(job: BulkDownloadJob) -> None:
+        job.status = 'running'
+        job.started_at = time.monotonic()
+
+    @staticmethod
+    def _written(job: BulkDownloadJob, name: str) -> None:
+        job.files.append(name)
+        job.completed += 1
+
+    @staticmethod
+    def _finish(job: BulkDownloadJob) -> None:
+        job.finished_at = time.monotonic()
+        logger.info(
+            f"Bulk download {job.job_id}: {job.completed}/{job.total} files, "
+            f"{job.bytes_downloaded / 1024 / 1024:.1f} MB in {job.finished_at - job.started_at:.2f}s"
+        )
+
+    def _reserve_name(self, job: BulkDownloadJob, url: str, content_type: str) -> str:
+        """Eşzamanlı indirmeler arasında tekil dosya adı (await yok: yarış olmaz)"""
+        filename = os.path.basename(url.split('?')[0].split('#')[0]) or f"image_{len(job._names)}"
+        if '.' not in filename:
+            filename += _extension(content_type)
+        name, ext = os.path.splitext(filename)
+        counter = 1
+        while filename in job._names:
+            filename = f"{name}_{counter}{ext}"
+            counter += 1
+        job._names.add(filename)
+        return filename
+
+    @staticmethod
+    def _add_error(job: BulkDownloadJob, url: str, error: str) -> None:
+        if len(job.errors) < MAX_STORED_ERRORS:
+            job.errors.append({"url": url, "error": error})
+
+
+class _ZipStream:
+    """zipfile için yazılabilir, aranamaz çıktı; yazılanlar drain() ile alınır"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _write_file(zf: zipfile.ZipFile, info: zipfile.ZipInfo, path: Path) -> None:
+    """Dosyayı parça parça ZIP girdisine kopyala (thread'de)"""
+    with open(path, 'rb') as source, zf.open(info, 'w') as dest:
+        shutil.copyfileobj(source, dest, FILE_CHUNK_SIZE)
+
+
+def _too_large() -> str:
+    return f"larger than {MAX_FILE_BYTES // (1024 * 1024)} MB"
+
+
+def _zip_info(name: str, content_type: str) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, date_time=datetime.now().timetuple()[:6])
+    ext = os.path.splitext(name)[1].lower()
+    compressed = ext in STORED_EXTENSIONS or (
+        content_type.startswith(('image/', 'video/', 'audio/')) and 'svg' not in content_type and 'bmp' not in content_type
+    )
+    info.compress_type = zipfile.ZIP_STORED if compressed else zipfile.ZIP_DEFLATED
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def _extension(content_type: str) -> str:
+    content_type = content_type.lower()
+    for key, ext in (('png', '.png'), ('gif', '.gif'), ('webp', '.webp'), ('svg', '.svg'), ('avif', '.avif')):
+        if key in content_type:
+            return ext
+    return '.jpg'
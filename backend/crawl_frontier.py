@@ -0,0 +1,124 @@
+"""
+Tarama Sınırı (Frontier) - Öncelikli URL kuyruğu
+Derinlik, yol önceliği ve O(1) görülmüş-küme kontrolü ile sürekli boşaltılan kuyruk
+"""
+
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+# Küçük değer = önce taranır
+SITEMAP_PRIORITY = -10
+DEFAULT_PRIORITY = 0
+
+
+@dataclass(order=True)
+class FrontierEntry:
+    priority: int
+    seq: int
+    url: str = field(compare=False)
+    depth: int = field(default=0, compare=False)
+
+
+class CrawlFrontier:
+    """Worker'lar tarafından sürekli boşaltılan öncelikli URL kuyruğu
+
+    - Aynı öncelikte girişler BFS sırasıyla (derinlik, sonra ekleme sırası) çıkar.
+    - `path_priorities` ile belirli yol önekleri öne/arkaya alınabilir
+      (örn. {'/urunler': -5, '/blog': 5}).
+    - `get()` bekleyen URL kalmadığında ve hiçbir worker çalışmıyorsa None döner;
+      böylece worker'lar sabit iterasyon sayısı olmadan kendiliğinden durur.
+    """
+
+    def __init__(self, max_depth: Optional[int] = None,
+                 path_priorities: Optional[Dict[str, int]] = None):
+        self.max_depth = max_depth
+        self.path_priorities = sorted(
+            (path_priorities or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self.seen: Set[str] = set()
+        self._heap: List[FrontierEntry] = []
+        self._counter = itertools.count()
+        self._in_flight = 0
+        self._closed = False
+        self._waiters: List[asyncio.Future] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.seen
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def priority_for(self, url: str, depth: int) -> int:
+        """Derinlik + yol önceliği"""
+        path = urlparse(url).path or '/'
+        for prefix, priority in self.path_priorities:
+            if path.startswith(prefix):
+                return depth + priority
+        return depth + DEFAULT_PRIORITY
+
+    def add(self, url: str, depth: int = 0, priority: Optional[int] = None) -> bool:
+        """URL'yi kuyruğa ekle; daha önce görüldüyse veya derinlik aşıldıysa False"""
+        if self._closed or url in self.seen:
+            return False
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        self.seen.add(url)
+        if priority is None:
+            priority = self.priority_for(url, depth)
+        heapq.heappush(self._heap, FrontierEntry(priority, next(self._counter), url, depth))
+        self._wakeup(1)
+        return True
+
+    async def get(self) -> Optional[FrontierEntry]:
+        """Sıradaki URL'yi al; tarama bittiyse None"""
+        while True:
+            if self._closed:
+                return None
+            if self._heap:
+                self._in_flight += 1
+                return heapq.heappop(self._heap)
+            if self._in_flight == 0:
+                # Kuyruk boş ve kimse yeni URL üretemez: tarama bitti
+                self._wakeup_all()
+                return None
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    def task_done(self) -> None:
+        """get() ile alınan URL'nin işlenmesi bitti"""
+        self._in_flight -= 1
+        if self._in_flight == 0 and not self._heap:
+            self._wakeup_all()
+
+    def close(self) -> None:
+        """Yeni URL kabul etme, bekleyen worker'ları serbest bırak"""
+        self._closed = True
+        self._heap.clear()
+        self._wakeup_all()
+
+    def _wakeup(self, count: int) -> None:
+        while count and self._waiters:
+            waiter = self._waiters.pop(0)
+            if not waiter.done():
+                waiter.set_result(None)
+                count -= 1
+
+    def _wakeup_all(self) -> None:
+        self._wakeup(len(self._waiters))
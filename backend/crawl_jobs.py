@@ -0,0 +1,234 @@
+"""
+Tarama İş Zamanlayıcısı
+Her tarama bir iş (job id) olarak kuyruğa alınır; sınırlı sayıda worker işleri paralel çalıştırır.
+İş durumu/ilerlemesi `crawl_jobs` koleksiyonunda saklanır, yeniden başlatmada kalan işler devam eder.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('queued', 'running')
+FINAL_STATUSES = ('completed', 'error', 'stopped')
+# Yeniden başlatmada yarıda kalan iş en fazla bu kadar denenir (süreci çökerten iş döngüye girmesin)
+MAX_JOB_ATTEMPTS = 3
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class CrawlJob:
+    job_id: str
+    target_url: str
+    options: Dict[str, Any] = field(default_factory=dict)  # CrawlStartRequest alanları
+    status: str = 'queued'  # queued, running, completed, error, stopped
+    message: str = ''
+    report_id: str = ''
+    progress: Dict[str, int] = field(default_factory=dict)  # crawled, discovered, images, videos, issues
+    error: str = ''
+    attempts: int = 0
+    created_at: str = field(default_factory=_now)
+    started_at: str = ''
+    finished_at: str = ''
+    # Çalışma zamanı alanları (kaydedilmez)
+    crawler: Any = field(default=None, repr=False, compare=False)
+    stop_requested: bool = field(default=False, repr=False, compare=False)
+
+    def to_doc(self) -> Dict:
+        doc = asdict(self)
+        doc.pop('crawler')
+        doc.pop('stop_requested')
+        doc['_id'] = doc.pop('job_id')
+        return doc
+
+    @classmethod
+    def from_doc(cls, doc: Dict) -> 'CrawlJob':
+        doc = dict(doc)
+        doc['job_id'] = doc.pop('_id')
+        known = set(cls.__dataclass_fields__) - {'crawler', 'stop_requested'}
+        return cls(**{key: value for key, value in doc.items() if key in known})
+
+    def to_status(self) -> Dict:
+        """/crawl/status ile uyumlu durum"""
+        status = {
+            'crawled': 0, 'discovered': 0, 'images': 0, 'videos': 0, 'issues': 0,
+            **self.progress,
+            'status': self.status,
+            'message': self.message,
+            'job_id': self.job_id,
+            'report_id': self.report_id,
+            'target_url': self.target_url,
+        }
+        return status
+
+
+JobRunner = Callable[[CrawlJob], Awaitable[None]]
+
+
+class CrawlJobScheduler:
+    """Sınırlı worker havuzu ile tarama işlerini çalıştırır
+
+    `runner(job)` taramayı yapar ve `job` üzerindeki alanları günceller; zamanlayıcı
+    durum geçişlerini ve kaydı yönetir. İlerleme kaydı iş başına `progress_interval`
+    saniyede bir yapılır.
+    """
+
+    def __init__(self, db, runner: JobRunner, max_workers: int = 2, progress_interval: float = 2.0):
+        self.db = db
+        self.runner = runner
+        self.max_workers = max(1, max_workers)
+        self.progress_interval = progress_interval
+        self.jobs: Dict[str, CrawlJob] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._last_saved: Dict[str, float] = {}
+        self._latest_job_id: Optional[str] = None
+
+    async def start(self) -> None:
+        """Kaydedilmiş aktif işleri yükle ve worker'ları başlat"""
+        await self.db.crawl_jobs.create_index([('status', 1), ('created_at', 1)])
+        async for doc in self.db.crawl_jobs.find({'status': {'$in': list(ACTIVE_STATUSES)}}).sort('created_at', 1):
+            job = CrawlJob.from_doc(doc)
+            if job.status == 'running' and job.attempts >= MAX_JOB_ATTEMPTS:
+                logger.error(f"Crawl job {job.job_id} interrupted {job.attempts} times, giving up")
+                await self.finish(job, 'error', f"Hata: {job.attempts} denemede tamamlanamadı",
+                                  'interrupted too many times')
+                continue
+            if job.status == 'running':
+                # Yarıda kalan iş baştan çalışır (deneme sayısı başlarken artırılır)
+                job.status = 'queued'
+                job.message = 'Yeniden başlatma sonrası sıraya alındı'
+                await self.save(job)
+            self.jobs[job.job_id] = job
+            self._latest_job_id = job.job_id
+            self._queue.put_nowait(job.job_id)
+        self._workers = [asyncio.create_task(self._worker(index)) for index in range(self.max_workers)]
+        logger.info(f"Crawl scheduler started with {self.max_workers} workers, {self._queue.qsize()} queued jobs")
+
+    async def shutdown(self) -> None:
+        for job in self.jobs.values():
+            if job.status == 'running' and job.crawler:
+                job.crawler.stop_crawl()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, target_url: str, options: Optional[Dict] = None) -> CrawlJob:
+        job = CrawlJob(job_id=str(uuid.uuid4()), target_url=target_url, options=options or {},
+                       message='Sırada')
+        self.jobs[job.job_id] = job
+        self._latest_job_id = job.job_id
+        await self.db.crawl_jobs.insert_one(job.to_doc())
+        self._queue.put_nowait(job.job_id)
+        return job
+
+    async def get(self, job_id: str) -> Optional[CrawlJob]:
+        """Bellekte (aktif/son) ya da kayıtlı iş"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            doc = await self.db.crawl_jobs.find_one({'_id': job_id})
+            job = CrawlJob.from_doc(doc) if doc else None
+        return job
+
+    def latest(self) -> Optional[CrawlJob]:
+        return self.jobs.get(self._latest_job_id) if self._latest_job_id else None
+
+    async def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        query = {'status': status} if status else {}
+        cursor = self.db.crawl_jobs.find(query).sort('created_at', -1).limit(min(max(limit, 1), 500))
+        return [CrawlJob.from_doc(doc).to_status() async for doc in cursor]
+
+    def queue_position(self, job_id: str) -> int:
+        queued = [job for job in self.jobs.values() if job.status == 'queued']
+        queued.sort(key=lambda job: job.created_at)
+        for position, job in enumerate(queued, start=1):
+            if job.job_id == job_id:
+                return position
+        return 0
+
+    async def stop(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.status not in ACTIVE_STATUSES:
+            return False
+        job.stop_requested = True
+        if job.status == 'queued':
+            await self.finish(job, 'stopped', 'Durduruldu')
+        elif job.crawler:
+            job.crawler.stop_crawl()
+            job.message = 'Durduruluyor...'
+        return True
+
+    async def update_progress(self, job: CrawlJob, progress: Dict, message: str = '') -> None:
+        """İlerlemeyi güncelle; kayıt iş başına en fazla progress_interval'da bir"""
+        job.progress.update(progress)
+        if message:
+            job.message = message
+        now = time.monotonic()
+        if now - self._last_saved.get(job.job_id, 0) >= self.progress_interval:
+            await self.save(job)
+
+    async def save(self, job: CrawlJob) -> None:
+        self._last_saved[job.job_id] = time.monotonic()
+        doc = job.to_doc()
+        job_id = doc.pop('_id')
+        try:
+            await self.db.crawl_jobs.update_one({'_id': job_id}, {'$set': doc})
+        except Exception as e:
+            logger.error(f"Could not persist crawl job {job_id}: {e}")
+
+    async def finish(self, job: CrawlJob, status: str, message: str = '', error: str = '') -> None:
+        job.status = status
+        job.message = message or job.message
+        job.error = error
+        job.finished_at = _now()
+        job.crawler = None
+        self._last_saved.pop(job.job_id, None)
+        await self.save(job)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            try:
+                if job is None or job.status != 'queued':
+                    continue
+                job.status = 'running'
+                job.started_at = _now()
+                job.attempts += 1
+                job.message = 'Başlatılıyor...'
+                await self.save(job)
+                try:
+                    await self.runner(job)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Crawl job {job_id} failed: {e}")
+                    await self.finish(job, 'error', f"Hata: {e}", str(e))
+                else:
+                    if job.status == 'running':
+                        if job.stop_requested:
+                            await self.finish(job, 'stopped', 'Durduruldu')
+                        else:
+                            await self.finish(job, 'completed')
+            finally:
+                self._queue.task_done()
+                self._prune()
+
+    def _prune(self, keep: int = 200) -> None:
+        """Biten işlerin bellekteki kopyalarını sınırla (kayıtlar veritabanında kalır)"""
+        finished = [job for job in self.jobs.values() if job.status in FINAL_STATUSES]
+        if len(finished) <= keep:
+            return
+        finished.sort(key=lambda job: job.finished_at)
+        for job in finished[:len(finished) - keep]:
+            if job.job_id != self._latest_job_id:
+                self.jobs.pop(job.job_id, None)
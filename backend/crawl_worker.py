@@ -0,0 +1,402 @@
+"""
+Dağıtık Tarama Worker'ı
+server.py'den bağımsız giriş noktası: birden fazla süreç/makine MongoDB'deki paylaşılan
+frontier'dan URL kiralar, sonuçları rapor koleksiyonlarına yazar ve heartbeat gönderir.
+Tarama bittiğinde son worker rapor başlığını tamamlar; rapor /api/report/* ile okunur.
+
+Kullanım (backend klasöründen, MONGO_URL / DB_NAME server.py ile aynı):
+    python crawl_worker.py create https://site.com --max-pages 500   # crawl_id yazdırır (--no-discover: sitemap'siz)
+    python crawl_worker.py run <crawl_id> --workers 4                # her süreçte/makinede
+    python crawl_worker.py status <crawl_id>
+    python crawl_worker.py stop <crawl_id>
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from advanced_crawler import AdvancedCrawler
+from crawl_frontier import SITEMAP_PRIORITY, CrawlFrontier
+from http_cache import HttpCache
+from mongo_frontier import CRAWLS_COLLECTION, MongoFrontier
+from report_store import MongoReportWriter, ensure_report_indexes, recount_report
+from site_discovery import discover_site
+
+logger = logging.getLogger(__name__)
+
+WORKERS_COLLECTION = 'crawl_workers'
+
+# Kiralama süresi heartbeat aralığının birkaç katı olmalı: çöken worker'ın URL'leri bu süre sonunda geri döner
+VISIBILITY_TIMEOUT = float(os.environ.get("CRAWL_VISIBILITY_TIMEOUT", "120"))
+HEARTBEAT_INTERVAL = float(os.environ.get("CRAWL_HEARTBEAT_INTERVAL", "10"))
+# Sonuçlar bu kadar sayfada (veya COMMIT_INTERVAL sn'de) bir yazılır, sonra URL'ler tamamlandı işaretlenir
+COMMIT_PAGES = int(os.environ.get("CRAWL_COMMIT_PAGES", "20"))
+COMMIT_INTERVAL = float(os.environ.get("CRAWL_COMMIT_INTERVAL", "5"))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class DistributedCrawler(AdvancedCrawler):
+    """Yerel kuyruk yerine paylaşılan MongoFrontier kullanan AdvancedCrawler
+
+    Sonuçlar önce sink'e yazılır, ardından URL'ler tamamlandı işaretlenir (en az bir kez işleme):
+    yazmadan önce çöken worker'ın sayfaları kiralama süresi dolunca başka worker'a gider.
+    Sayfa/görsel/video tekrarlarını rapor koleksiyonlarındaki unique indeksler engeller.
+    """
+
+    def __init__(self, shared_frontier: MongoFrontier, worker_id: str, db,
+                 poll_interval: float = 1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.shared_frontier = shared_frontier
+        self.worker_id = worker_id
+        self.db = db
+        self.poll_interval = poll_interval
+        self._outbox: List[Tuple[str, int, int]] = []
+        self._uncommitted: List[str] = []
+        self._last_commit = time.monotonic()
+        self._commit_lock = asyncio.Lock()
+        self.pages_committed = 0
+
+    def enqueue_url(self, url: str, depth: int = 0, priority: Optional[int] = None) -> bool:
+        """Linkleri yerelde tekilleştir, bir sonraki yazımda paylaşılan frontier'a gönder"""
+        local = self.frontier
+        if url in local.seen or (local.max_depth is not None and depth > local.max_depth):
+            return False
+        local.seen.add(url)
+        self._outbox.append((url, depth, local.priority_for(url, depth) if priority is None else priority))
+        return True
+
+    def _reserve_url(self, url: str) -> bool:
+        # Sayfa bütçesi ve tekrar kontrolü paylaşılan frontier'da
+        if self.should_stop:
+            return False
+        self.visited_urls.add(url)
+        logger.info(f"Crawling: {url}")
+        return True
+
+    async def _flush_outbox(self) -> None:
+        entries, self._outbox = self._outbox, []
+        if entries:
+            await self.shared_frontier.add_many(entries)
+
+    async def commit(self, force: bool = False) -> None:
+        """Tamponlanmış sonuçları yaz, sonra işlenen URL'leri tamamlandı işaretle"""
+        if not self._uncommitted:
+            return
+        if not force and len(self._uncommitted) < COMMIT_PAGES and time.monotonic() - self._last_commit < COMMIT_INTERVAL:
+            return
+        async with self._commit_lock:
+            urls, self._uncommitted = self._uncommitted, []
+            self._last_commit = time.monotonic()
+            await self.sink.flush()
+            self.pages_committed += await self.shared_frontier.complete_many(urls, self.worker_id)
+
+    async def _finished(self) -> bool:
+        """Kiralanacak URL yok: tarama durduruldu mu ya da tüm worker'lar bitti mi?"""
+        await self.commit(force=True)
+        crawl = await self.db[CRAWLS_COLLECTION].find_one({'_id': self.shared_frontier.crawl_id}, {'status': 1})
+        if not crawl or crawl.get('status') != 'running':
+            return True
+        return await self.shared_frontier.is_finished()
+
+    async def _worker(self, index: int) -> None:
+        """Paylaşılan frontier'dan URL kiralayıp tarayan worker"""
+        page = None
+
+        async def get_page():
+            nonlocal page
+            if page is None:
+                page = await self._new_page(index)
+            return page
+
+        while not self.should_stop:
+            entry = await self.shared_frontier.lease(self.worker_id)
+            if entry is None:
+                if await self._finished():
+                    return
+                await asyncio.sleep(self.poll_interval)
+                continue
+            url = entry['url']
+            if self.should_stop:
+                await self.shared_frontier.release(url, self.worker_id, 0)
+                return
+            try:
+                await self.crawl_url(url, entry['depth'], get_page)
+                await self._flush_outbox()
+                self._uncommitted.append(url)
+                await self.commit()
+                if self.progress_callback and not self.should_stop:
+                    await self.progress_callback(self.progress())
+            except Exception as e:
+                logger.error(f"Worker error on {url}: {e}")
+                await self.shared_frontier.release(url, self.worker_id, entry['attempts'])
+
+    def progress(self) -> Dict[str, int]:
+        return {
+            'crawled': len(self.visited_urls),
+            'discovered': len(self.discovered_urls),
+            'images': self.item_counts['images'],
+            'videos': self.item_counts['videos'] + self.item_counts['youtube_videos'],
+            'issues': self.item_counts['issues']
+        }
+
+    async def heartbeat(self, status: str = 'running') -> None:
+        """Kiralamaları uzat, ilerlemeyi yaz ve durdurma isteğini kontrol et"""
+        crawl_id = self.shared_frontier.crawl_id
+        if status == 'running':
+            await self.shared_frontier.extend_leases(self.worker_id)
+        await self.db[WORKERS_COLLECTION].update_one(
+            {'_id': self.worker_id},
+            {'$set': {
+                'crawl_id': crawl_id, 'host': socket.gethostname(), 'pid': os.getpid(),
+                'status': status, 'progress': self.progress(), 'committed': self.pages_committed,
+                'last_heartbeat': time.time()
+            }},
+            upsert=True
+        )
+        crawl = await self.db[CRAWLS_COLLECTION].find_one({'_id': crawl_id}, {'status': 1})
+        if status == 'running' and crawl and crawl.get('status') == 'stopped':
+            logger.info(f"Crawl {crawl_id} stopped, finishing current pages")
+            self.stop_crawl()
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.warning(f"Heartbeat failed: {e}")
+
+    async def run_crawl(self, progress_callback=None):
+        await self.heartbeat()
+        heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        try:
+            return await super().run_crawl(progress_callback)
+        finally:
+            heartbeat_task.cancel()
+            await self._flush_outbox()
+            await self.commit(force=True)
+            await self.heartbeat(status='finished')
+
+
+async def create_crawl(db, target_url: str, options: Dict) -> Dict:
+    """Rapor başlığını ve dağıtık tarama dokümanını oluştur, başlangıç URL'sini frontier'a ekle
+
+    `options['discover']` açıksa robots.txt/sitemap URL'leri de bir kez burada eklenir;
+    Crawl-delay `options['crawl_delay']` olarak worker'lara iletilir.
+    """
+    if not target_url.startswith("http"):
+        target_url = "https://" + target_url
+    target_url = target_url.rstrip('/')
+    await ensure_report_indexes(db)
+    await MongoFrontier.ensure_indexes(db)
+
+    crawl_id = str(uuid.uuid4())
+    report_id = str(uuid.uuid4())
+    domain = urlparse(target_url).netloc
+    discovery = await _discover_seeds(target_url, options) if options.get('discover') else None
+    await db.reports.insert_one({
+        '_id': report_id,
+        'crawl_id': crawl_id,
+        'distributed': True,
+        'domain': domain,
+        'target_url': target_url,
+        'status': 'running',
+        'start_time': datetime.now().isoformat(),
+        'created_at': _now(),
+        **({'discovery': discovery['summary']} if discovery else {})
+    })
+    crawl = {
+        '_id': crawl_id,
+        'report_id': report_id,
+        'target_url': target_url,
+        'domain': domain,
+        'options': options,
+        'max_pages': options.get('max_pages'),
+        'leased': 0,
+        'status': 'running',
+        'created_at': _now(),
+        'finished_at': ''
+    }
+    await db[CRAWLS_COLLECTION].insert_one(crawl)
+    if discovery:
+        # Başlangıç URL'si sitemap URL'lerinden önce
+        seeds = [(target_url, 0, SITEMAP_PRIORITY - 1)] + discovery['seeds']
+    else:
+        seeds = [(target_url, 0, CrawlFrontier(path_priorities=options.get('path_priorities')).priority_for(target_url, 0))]
+    await MongoFrontier(db, crawl_id).add_many(seeds)
+    return crawl
+
+
+async def _discover_seeds(target_url: str, options: Dict) -> Optional[Dict]:
+    """robots.txt/sitemap keşfi; Crawl-delay options'a yazılır"""
+    if options.get('max_depth') == 0:
+        return None
+    domain = urlparse(target_url).netloc
+    max_pages = options.get('max_pages') or 10000
+    async with aiohttp.ClientSession(headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}) as session:
+        result = await discover_site(session, target_url, max_urls=max_pages * 2,
+                                     accept=lambda url: urlparse(url).netloc == domain)
+    if result.crawl_delay and not options.get('crawl_delay'):
+        options['crawl_delay'] = result.crawl_delay
+    seeds: Dict[str, Tuple[str, int, int]] = {}
+    for item in result.urls:
+        url = item.url.split('#')[0].rstrip('/')
+        if url and url != target_url and url not in seeds:
+            seeds[url] = (url, 1, item.priority)
+    return {
+        'seeds': list(seeds.values()),
+        'summary': {
+            'robots_found': result.robots_found,
+            'crawl_delay': options.get('crawl_delay'),
+            'sitemaps': len(result.sitemaps),
+            'sitemap_urls': result.scanned,
+            'seeded': len(seeds),
+            'errors': result.errors[:20],
+        }
+    }
+
+
+async def finalize_crawl(db, crawl_id: str) -> bool:
+    """Kiralanmış URL kalmadıysa rapor başlığını tamamla; sadece bir worker kazanır"""
+    crawl = await db[CRAWLS_COLLECTION].find_one({'_id': crawl_id})
+    if not crawl or crawl.get('finished_at'):
+        return False
+    frontier = MongoFrontier(db, crawl_id, max_pages=crawl.get('max_pages'))
+    if crawl['status'] == 'running' and not await frontier.is_finished():
+        return False
+    if (await frontier.counts())['leased']:
+        return False
+    final_status = 'stopped' if crawl['status'] == 'stopped' else 'completed'
+    claimed = await db[CRAWLS_COLLECTION].find_one_and_update(
+        {'_id': crawl_id, 'finished_at': ''}, {'$set': {'status': final_status, 'finished_at': _now()}}
+    )
+    if claimed is None:
+        return False
+
+    counts, breakdown = await recount_report(db, crawl['report_id'])
+    await db.reports.update_one({'_id': crawl['report_id']}, {'$set': {
+        'end_time': datetime.now().isoformat(),
+        'total_urls': counts['pages'],
+        'counts': counts,
+        'breakdown': breakdown,
+        'status': final_status
+    }})
+    logger.info(f"Crawl {crawl_id} {final_status}: {counts['pages']} pages, {counts['images']} images")
+    return True
+
+
+async def crawl_status(db, crawl_id: str) -> Optional[Dict]:
+    crawl = await db[CRAWLS_COLLECTION].find_one({'_id': crawl_id})
+    if not crawl:
+        return None
+    crawl['frontier'] = await MongoFrontier(db, crawl_id).counts()
+    alive_after = time.time() - VISIBILITY_TIMEOUT
+    crawl['workers'] = [
+        {**worker, 'alive': worker['status'] == 'running' and worker['last_heartbeat'] >= alive_after}
+        async for worker in db[WORKERS_COLLECTION].find({'crawl_id': crawl_id})
+    ]
+    return crawl
+
+
+async def run_worker(db, crawl_id: str, workers: Optional[int] = None,
+                     http_cache_dir: Optional[str] = None, download_dir: str = "./downloads") -> Dict:
+    """Bu süreçte tarama worker'larını çalıştır; frontier bitince (veya durdurulunca) döner"""
+    crawl = await db[CRAWLS_COLLECTION].find_one({'_id': crawl_id})
+    if not crawl:
+        raise ValueError(f"Unknown crawl: {crawl_id}")
+    options = crawl.get('options', {})
+    worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    shared = MongoFrontier(db, crawl_id, max_pages=crawl.get('max_pages'), visibility_timeout=VISIBILITY_TIMEOUT)
+
+    crawler = DistributedCrawler(
+        shared_frontier=shared,
+        worker_id=worker_id,
+        db=db,
+        target_url=crawl['target_url'],
+        max_pages=crawl.get('max_pages') or 0,
+        download_dir=download_dir,
+        workers=workers or options.get('workers', 4),
+        contexts=options.get('browser_contexts', 1),
+        max_per_host=options.get('max_per_host', 4),
+        max_depth=options.get('max_depth'),
+        path_priorities=options.get('path_priorities'),
+        block_resources=options.get('fast_mode', False),
+        block_domains=set(options.get('block_domains', [])),
+        allow_domains=set(options.get('allow_domains', [])),
+        engine=options.get('engine', 'hybrid'),
+        http_cache=HttpCache(http_cache_dir) if http_cache_dir else None,
+        report_sink=MongoReportWriter(db, crawl['report_id']),
+        # Keşif create_crawl'da bir kez yapıldı; Crawl-delay süreç başına uygulanır
+        crawl_delay=options.get('crawl_delay')
+    )
+    logger.info(f"Worker {worker_id} joined crawl {crawl_id}")
+    await crawler.run_crawl()
+    await finalize_crawl(db, crawl_id)
+    return {'worker_id': worker_id, 'pages': crawler.pages_committed, **crawler.progress()}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Dağıtık tarama worker'ı")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    create = commands.add_parser('create', help='Yeni dağıtık tarama oluştur')
+    create.add_argument('target_url')
+    create.add_argument('--max-pages', type=int, default=50)
+    create.add_argument('--max-depth', type=int, default=None)
+    create.add_argument('--engine', default='hybrid', choices=('hybrid', 'browser'))
+    create.add_argument('--fast-mode', action='store_true')
+    create.add_argument('--no-discover', dest='discover', action='store_false',
+                        help='robots.txt/sitemap keşfini atla')
+
+    run = commands.add_parser('run', help='Bu süreçte worker çalıştır')
+    run.add_argument('crawl_id')
+    run.add_argument('--workers', type=int, default=None, help='Süreç içi paralel sayfa sayısı')
+    run.add_argument('--http-cache-dir', default=None)
+
+    for name in ('status', 'stop'):
+        commands.add_parser(name).add_argument('crawl_id')
+
+    args = parser.parse_args()
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
+    db = client[os.environ.get('DB_NAME', 'website_scanner')]
+    try:
+        if args.command == 'create':
+            crawl = await create_crawl(db, args.target_url, {
+                'max_pages': args.max_pages, 'max_depth': args.max_depth,
+                'engine': args.engine, 'fast_mode': args.fast_mode, 'discover': args.discover
+            })
+            print(crawl['_id'])
+        elif args.command == 'run':
+            result = await run_worker(db, args.crawl_id, workers=args.workers, http_cache_dir=args.http_cache_dir)
+            print(json.dumps(result))
+        elif args.command == 'status':
+            print(json.dumps(await crawl_status(db, args.crawl_id), indent=2, default=str))
+        elif args.command == 'stop':
+            result = await db[CRAWLS_COLLECTION].update_one(
+                {'_id': args.crawl_id, 'status': 'running'}, {'$set': {'status': 'stopped'}}
+            )
+            print('stopped' if result.modified_count else 'not running')
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
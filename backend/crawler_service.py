@@ -5,8 +5,7 @@ Herhangi bir web sitesini tarar, görselleri, videoları ve metinleri toplar
 
 import asyncio
 import aiohttp
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse
 from typing import Dict, List, Set, Optional, Tuple
 import re
 from datetime import datetime
@@ -15,6 +14,13 @@ from dataclasses import dataclass, field, asdict
 import os
 from dotenv import load_dotenv
 
+from asset_probe import AssetProbeCache
+from crawl_frontier import SITEMAP_PRIORITY, CrawlFrontier, FrontierEntry
+from html_extraction import extract_static_payload_async
+from http_cache import HttpCache
+from rate_limiter import RateLimiter
+from site_discovery import discover_site
+
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
@@ -76,7 +82,10 @@ class WebsiteCrawler:
     """Herhangi bir web sitesini tarar"""
     
     def __init__(self, target_url: str, max_concurrent: int = 5, 
-                 enable_ai_analysis: bool = False, max_pages: int = 100):
+                 enable_ai_analysis: bool = False, max_pages: int = 100,
+                 max_depth: Optional[int] = None, path_priorities: Optional[Dict[str, int]] = None,
+                 http_cache: Optional[HttpCache] = None, discover: bool = False,
+                 crawl_delay: Optional[float] = None, rate_limiter: Optional[RateLimiter] = None):
         self.target_url = target_url.rstrip('/')
         parsed = urlparse(target_url)
         self.base_domain = parsed.netloc
@@ -86,15 +95,28 @@ class WebsiteCrawler:
         self.max_pages = max_pages
         self.enable_ai_analysis = enable_ai_analysis
         
+        # Öncelikli kuyruk; görülmüş-küme discovered_urls olarak paylaşılır
+        self.frontier = CrawlFrontier(max_depth=max_depth, path_priorities=path_priorities)
+        
         self.visited_urls: Set[str] = set()
-        self.discovered_urls: Set[str] = set()
+        self.discovered_urls: Set[str] = self.frontier.seen
         self.images: List[ImageInfo] = []
         self.videos: List[VideoInfo] = []
         self.texts: List[TextInfo] = []
         self.issues: List[CrawlIssue] = []
         
         self.session: Optional[aiohttp.ClientSession] = None
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        # Sayfa ve HEAD istekleri host başına uyarlanabilir sınırlayıcıdan geçer (Crawl-delay dahil);
+        # Crawl-delay run_crawl süresince bu tarama adına konur
+        self.rate_limiter = rate_limiter or RateLimiter(max_concurrency=max_concurrent)
+        self.crawl_delay = crawl_delay
+        # Tarama genelinde görsel HEAD önbelleği (run_crawl'da oluşturulur)
+        self.probes: Optional[AssetProbeCache] = None
+        # Tekrar taramalarda koşullu istek önbelleği (None = kapalı)
+        self.http_cache = http_cache
+        self.not_modified_pages = 0
+        # robots.txt/sitemap keşfi
+        self.discover = discover
         self.progress_callback = None
         self.is_running = False
         self.should_stop = False
@@ -133,162 +155,150 @@ class WebsiteCrawler:
         return any(re.search(pattern, url, re.IGNORECASE) for pattern in video_patterns)
 
     async def fetch_url(self, url: str) -> Tuple[int, str, str]:
-        """URL'yi fetch et"""
+        """URL'yi fetch et; önbellek varsa koşullu istek gönder, 304'te gövdeyi diskten al"""
+        headers = self.http_cache.conditional_headers(url) if self.http_cache else {}
+        attempt = 0
         try:
-            async with self.semaphore:
-                async with self.session.get(
-                    url,
-                    allow_redirects=True,
-                    timeout=aiohttp.ClientTimeout(total=30),
-                    ssl=False
-                ) as response:
-                    final_url = str(response.url)
-                    if response.status == 200:
-                        content = await response.text()
-                        return response.status, content, final_url
-                    return response.status, "", final_url
+            while True:
+                async with self.rate_limiter.slot(url) as slot:
+                    async with self.session.get(
+                        url,
+                        headers=headers,
+                        allow_redirects=True,
+                        timeout=aiohttp.ClientTimeout(total=30),
+                        ssl=False
+                    ) as response:
+                        slot.record(response.status, response.headers)
+                        final_url = str(response.url)
+                        if self.rate_limiter.should_retry(slot, attempt):
+                            attempt += 1
+                            continue
+                        if response.status == 304 and self.http_cache:
+                            cached = await self.http_cache.load_body(url)
+                            if cached:
+                                self.not_modified_pages += 1
+                                return 200, cached[0], cached[1]
+                            break
+                        elif response.status == 200:
+                            content = await response.text()
+                            if self.http_cache:
+                                await self.http_cache.store(url, response.headers, content, final_url)
+                            return response.status, content, final_url
+                        else:
+                            return response.status, "", final_url
         except Exception as e:
             logger.warning(f"Error fetching {url}: {e}")
             return 0, "", url
+        # 304 geldi ama gövde diskte yok: koşulsuz tekrar iste
+        self.http_cache.forget(url)
+        return await self.fetch_url(url)
 
     async def get_image_size(self, url: str) -> float:
         """Görsel boyutunu KB olarak al"""
-        try:
-            async with self.semaphore:
-                async with self.session.head(url, timeout=aiohttp.ClientTimeout(total=10), ssl=False) as response:
-                    size = response.headers.get('content-length', 0)
-                    return int(size) / 1024  # KB
-        except:
-            return 0
+        result = await self.probes.probe(url)
+        return result.size_kb
 
-    async def parse_page(self, url: str, content: str) -> None:
+    async def parse_page(self, url: str, content: str, depth: int = 0) -> None:
         """Sayfayı parse et ve içerikleri topla"""
-        soup = BeautifulSoup(content, 'html.parser')
+        # Tek geçişli lxml çıkarımı; büyük sayfalar process pool'da işlenir.
+        # Gövde önceki taramadakiyle aynıysa önbellekteki sonuç kullanılır
+        payload = self.http_cache.get_extraction(url, content, 'static:10') if self.http_cache else None
+        if payload is None:
+            payload = await extract_static_payload_async(content, url, min_text_length=10)
+            if self.http_cache:
+                await self.http_cache.put_extraction(url, content, 'static:10', payload)
         
-        # Remove script and style tags
-        for tag in soup.find_all(['script', 'style', 'noscript']):
-            tag.decompose()
+        page_images = [img for img in payload['images'] if img['source'] == 'img']
         
-        # Extract images
-        for img in soup.find_all('img'):
-            src = img.get('src') or img.get('data-src') or img.get('data-lazy')
-            if src:
-                full_url = urljoin(url, src)
-                if self.is_valid_image_url(full_url) or 'image' in full_url.lower():
-                    # Skip tiny icons
-                    width = img.get('width', '')
-                    height = img.get('height', '')
-                    try:
-                        w = int(width) if width else 100
-                        h = int(height) if height else 100
-                    except:
-                        w, h = 100, 100
-                    
-                    if w >= 50 and h >= 50:  # Skip very small images
-                        size_kb = await self.get_image_size(full_url)
-                        self.images.append(ImageInfo(
-                            url=full_url,
-                            alt=img.get('alt', ''),
-                            width=w,
-                            height=h,
-                            size_kb=size_kb,
-                            page_url=url
-                        ))
+        # Sayfadaki tüm <img> URL'leri tek seferde, eşzamanlı kontrol edilir;
+        # önceki sayfalarda görülen URL'ler (logo vb.) önbellekten gelir
+        probes = await self.probes.probe_many(img['url'] for img in page_images)
         
-        # Extract background images from style attributes
-        for tag in soup.find_all(style=True):
-            style = tag.get('style', '')
-            bg_match = re.search(r'background(?:-image)?:\s*url\(["\']?([^"\')]+)["\']?\)', style)
-            if bg_match:
-                img_url = urljoin(url, bg_match.group(1))
-                if self.is_valid_image_url(img_url):
+        # Extract images
+        for img in page_images:
+            full_url = img['url']
+            if self.is_valid_image_url(full_url) or 'image' in full_url.lower():
+                # Skip tiny icons
+                w = img['width'] or 100
+                h = img['height'] or 100
+                
+                if w >= 50 and h >= 50:  # Skip very small images
                     self.images.append(ImageInfo(
-                        url=img_url,
-                        alt='Background Image',
+                        url=full_url,
+                        alt=img['alt'],
+                        width=w,
+                        height=h,
+                        size_kb=probes[full_url].size_kb,
                         page_url=url
                     ))
         
-        # Extract videos
-        # YouTube iframes
-        for iframe in soup.find_all('iframe'):
-            src = iframe.get('src', '')
-            if 'youtube' in src or 'vimeo' in src:
-                self.videos.append(VideoInfo(
-                    url=src,
-                    title=iframe.get('title', 'Video'),
-                    type='youtube' if 'youtube' in src else 'vimeo',
+        # Background images from style attributes
+        for img in payload['images']:
+            if img['source'] == 'background' and self.is_valid_image_url(img['url']):
+                self.images.append(ImageInfo(
+                    url=img['url'],
+                    alt='Background Image',
                     page_url=url
                 ))
         
-        # Video tags
-        for video in soup.find_all('video'):
-            src = video.get('src')
-            if not src:
-                source = video.find('source')
-                if source:
-                    src = source.get('src')
-            if src:
+        # Extract videos: YouTube/Vimeo iframes and video tags
+        for video in payload['videos']:
+            if video['source'] == 'iframe' and video['type'] in ('youtube', 'vimeo'):
                 self.videos.append(VideoInfo(
-                    url=urljoin(url, src),
+                    url=video['url'],
+                    title=video['title'] or 'Video',
+                    type=video['type'],
+                    page_url=url
+                ))
+            elif video['source'] == 'video':
+                self.videos.append(VideoInfo(
+                    url=video['url'],
                     title='Video',
                     type='mp4',
                     page_url=url
                 ))
         
         # Extract meaningful texts
-        # Headings
-        for heading in soup.find_all(['h1', 'h2', 'h3']):
-            text = heading.get_text(strip=True)
-            if len(text) > 10:  # Skip very short headings
+        for text in payload['texts']:
+            if text['type'] == 'p':
+                # Paragraphs with substantial content
+                if text['length'] > 100:
+                    self.texts.append(TextInfo(
+                        content=text['content'] + ('...' if text['length'] > 500 else ''),
+                        title='Paragraph',
+                        type='paragraph',
+                        page_url=url,
+                        word_count=text['wordCount']
+                    ))
+            else:
                 self.texts.append(TextInfo(
-                    content=text,
-                    title=heading.name.upper(),
+                    content=text['content'],
+                    title=text['type'].upper(),
                     type='heading',
                     page_url=url,
-                    word_count=len(text.split())
-                ))
-        
-        # Paragraphs with substantial content
-        for p in soup.find_all('p'):
-            text = p.get_text(strip=True)
-            if len(text) > 100:  # Only meaningful paragraphs
-                self.texts.append(TextInfo(
-                    content=text[:500] + ('...' if len(text) > 500 else ''),
-                    title='Paragraph',
-                    type='paragraph',
-                    page_url=url,
-                    word_count=len(text.split())
+                    word_count=text['wordCount']
                 ))
         
         # Extract links for crawling
-        for link in soup.find_all('a', href=True):
-            href = link.get('href', '')
-            if href and not href.startswith('#') and not href.startswith('javascript:'):
-                full_url = urljoin(url, href)
-                if self.is_internal_url(full_url):
-                    self.discovered_urls.add(self.normalize_url(full_url))
+        for full_url in payload['links']:
+            if self.is_internal_url(full_url):
+                self.frontier.add(self.normalize_url(full_url), depth + 1)
         
         # Check for broken images
-        for img in soup.find_all('img'):
-            src = img.get('src') or img.get('data-src')
-            if src:
-                full_url = urljoin(url, src)
-                try:
-                    async with self.semaphore:
-                        async with self.session.head(full_url, timeout=aiohttp.ClientTimeout(total=5), ssl=False) as response:
-                            if response.status >= 400:
-                                self.issues.append(CrawlIssue(
-                                    source_url=url,
-                                    issue_type='broken_image',
-                                    element_text=img.get('alt', src),
-                                    target_url=full_url,
-                                    severity='High',
-                                    fix_suggestion=f'Görsel bulunamadı (HTTP {response.status}). Görseli düzeltin veya kaldırın.'
-                                ))
-                except:
-                    pass
+        for img in page_images:
+            full_url = img['url']
+            probe = probes[full_url]
+            if probe.is_broken:
+                self.issues.append(CrawlIssue(
+                    source_url=url,
+                    issue_type='broken_image',
+                    element_text=img['alt'] or full_url,
+                    target_url=full_url,
+                    severity='High',
+                    fix_suggestion=f'Görsel bulunamadı (HTTP {probe.status}). Görseli düzeltin veya kaldırın.'
+                ))
 
-    async def crawl_page(self, url: str) -> None:
+    async def crawl_page(self, url: str, depth: int = 0) -> None:
         """Tek bir sayfayı crawl et"""
         if self.should_stop:
             return
@@ -306,7 +316,7 @@ class WebsiteCrawler:
         status, content, final_url = await self.fetch_url(url)
         
         if status == 200 and content:
-            await self.parse_page(url, content)
+            await self.parse_page(url, content, depth)
         elif status >= 400:
             self.issues.append(CrawlIssue(
                 source_url=url,
@@ -317,6 +327,30 @@ class WebsiteCrawler:
                 fix_suggestion=f'Sayfa HTTP {status} hatası veriyor.'
             ))
 
+    async def _worker(self) -> None:
+        """Frontier'dan URL alıp tarayan worker"""
+        while True:
+            entry: Optional[FrontierEntry] = await self.frontier.get()
+            if entry is None:
+                return
+            try:
+                await self.crawl_page(entry.url, entry.depth)
+                if len(self.visited_urls) >= self.max_pages:
+                    self.frontier.close()
+                if self.progress_callback:
+                    progress = {
+                        'crawled': len(self.visited_urls),
+                        'discovered': len(self.discovered_urls),
+                        'issues': len(self.issues),
+                        'images': len(self.images),
+                        'videos': len(self.videos)
+                    }
+                    await self.progress_callback(progress)
+            except Exception as e:
+                logger.error(f"Worker error on {entry.url}: {e}")
+            finally:
+                self.frontier.task_done()
+
     async def run_crawl(self, progress_callback=None) -> CrawlReport:
         """Ana crawl işlemini başlat"""
         self.is_running = True
@@ -335,48 +369,29 @@ class WebsiteCrawler:
                 'Accept-Language': 'tr,en;q=0.9',
             }
         )
+        self.probes = AssetProbeCache(self.session, rate_limiter=self.rate_limiter)
+        self.rate_limiter.set_host_limits(self.base_domain, crawl_delay=self.crawl_delay, owner=self)
         
         try:
             # Add start URL
-            self.discovered_urls.add(self.normalize_url(self.target_url))
+            self.frontier.add(self.normalize_url(self.target_url),
+                              priority=SITEMAP_PRIORITY - 1 if self.discover else None)
+            if self.discover:
+                result = await discover_site(self.session, self.target_url, max_urls=self.max_pages * 2,
+                                             accept=self.is_internal_url)
+                if result.crawl_delay and not self.crawl_delay:
+                    self.rate_limiter.set_host_limits(self.base_domain, crawl_delay=result.crawl_delay,
+                                                      owner=self)
+                for item in result.urls:
+                    self.frontier.add(self.normalize_url(item.url), 1, priority=item.priority)
             
             logger.info(f"Starting crawl of {self.target_url}")
             
-            # Crawl pages
-            iteration = 0
-            max_iterations = 20
+            # Worker'lar frontier'ı boşalana kadar sürekli tüketir
+            await asyncio.gather(*(self._worker() for _ in range(self.max_concurrent)))
             
-            while iteration < max_iterations and not self.should_stop:
-                urls_to_crawl = list(self.discovered_urls - self.visited_urls)
-                
-                if not urls_to_crawl or len(self.visited_urls) >= self.max_pages:
-                    break
-                
-                urls_to_crawl = urls_to_crawl[:self.max_pages - len(self.visited_urls)]
-                
-                logger.info(f"Iteration {iteration + 1}: Crawling {len(urls_to_crawl)} URLs")
-                
-                # Crawl in batches
-                batch_size = 5
-                for i in range(0, len(urls_to_crawl), batch_size):
-                    if self.should_stop:
-                        break
-                    
-                    batch = urls_to_crawl[i:i+batch_size]
-                    tasks = [self.crawl_page(url) for url in batch]
-                    await asyncio.gather(*tasks, return_exceptions=True)
-                    
-                    if progress_callback:
-                        progress = {
-                            'crawled': len(self.visited_urls),
-                            'discovered': len(self.discovered_urls),
-                            'issues': len(self.issues),
-                            'images': len(self.images),
-                            'videos': len(self.videos)
-                        }
-                        await progress_callback(progress)
-                
-                iteration += 1
+            if self.http_cache:
+                logger.info(f"HTTP cache: {self.not_modified_pages} of {len(self.visited_urls)} pages not modified")
             
             # Remove duplicates
             seen_images = set()
@@ -411,12 +426,14 @@ class WebsiteCrawler:
             return report
             
         finally:
+            self.rate_limiter.clear_host_limits(self)
             await self.session.close()
             self.is_running = False
 
     def stop_crawl(self):
         """Crawl işlemini durdur"""
         self.should_stop = True
+        self.frontier.close()
 
 
 def report_to_dict(report: CrawlReport) -> dict:
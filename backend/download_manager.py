@@ -14,6 +14,8 @@ from enum import Enum
 import threading
 import yt_dlp
 
+from progress_bridge import ProgressBridge
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -58,6 +60,8 @@ class DownloadManager:
         self.completed_downloads: Dict[str, DownloadItem] = {}
         self.lock = asyncio.Lock()
         self._progress_callbacks: List[Callable] = []
+        # yt-dlp hook'ları executor thread'inde: öğe güncellemesi ve bildirim event loop'ta, saniyede en fazla 4 kez
+        self.progress = ProgressBridge(self._apply_progress, max_rate=4)
         
         os.makedirs(download_dir, exist_ok=True)
     
@@ -198,21 +202,26 @@ class DownloadManager:
                 # İndirmeyi başlat
                 asyncio.create_task(self._download_item(item))
     
+    def _apply_progress(self, download_id: str, d: Dict):
+        """İlerleme olayını öğeye uygula (event loop'ta, ProgressBridge çağırır)"""
+        item = self.active_downloads.get(download_id)
+        if item is None:
+            return
+        if d['status'] == 'downloading':
+            item.progress = d.get('downloaded_bytes', 0) / d.get('total_bytes', 1) * 100 if d.get('total_bytes') else 0
+            item.speed = d.get('_speed_str', '')
+            item.eta = d.get('_eta_str', '')
+            item.downloaded_bytes = d.get('downloaded_bytes', 0)
+            item.total_bytes = d.get('total_bytes', 0)
+            item.file_size = d.get('_total_bytes_str', '')
+            asyncio.create_task(self._notify_progress())
+        elif d['status'] == 'finished':
+            item.progress = 100
+            item.filename = d.get('filename', '')
+
     async def _download_item(self, item: DownloadItem):
         """Videoyu indir"""
-        def progress_hook(d):
-            if d['status'] == 'downloading':
-                item.progress = d.get('downloaded_bytes', 0) / d.get('total_bytes', 1) * 100 if d.get('total_bytes') else 0
-                item.speed = d.get('_speed_str', '')
-                item.eta = d.get('_eta_str', '')
-                item.downloaded_bytes = d.get('downloaded_bytes', 0)
-                item.total_bytes = d.get('total_bytes', 0)
-                item.file_size = d.get('_total_bytes_str', '')
-                # Sync callback notification
-                asyncio.create_task(self._notify_progress())
-            elif d['status'] == 'finished':
-                item.progress = 100
-                item.filename = d.get('filename', '')
+        progress_hook = self.progress.hook(item.id)
         
         try:
             if item.format == "audio":
@@ -246,6 +255,7 @@ class DownloadManager:
                     return ydl.prepare_filename(info)
             
             filepath = await loop.run_in_executor(None, do_download)
+            self.progress.close(item.id)
             
             # Audio için .mp3 uzantısı
             if item.format == "audio":
@@ -267,15 +277,16 @@ class DownloadManager:
             item.error = str(e)[:200]
         
         finally:
+            self.progress.close(item.id)
             # Active'den completed'a taşı
             async with self.lock:
                 if item.id in self.active_downloads:
                     del self.active_downloads[item.id]
                 self.completed_downloads[item.id] = item
                 await self._notify_progress()
-                
-                # Kuyruğu işlemeye devam et
-                await self._process_queue()
+            
+            # Kuyruğu işlemeye devam et (_process_queue kilidi kendisi alır)
+            await self._process_queue()
     
     def clear_completed(self):
         """Tamamlanan indirmeleri temizle"""
@@ -0,0 +1,207 @@
+"""
+Statik HTML İçerik Çıkarımı (lxml)
+Tek geçişte görsel, arka plan, iframe, video, başlık, paragraf ve linkleri çıkarır.
+Sonuç page_extraction.js ile aynı formattadır; büyük sayfalar process pool'da işlenir.
+"""
+
+import asyncio
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+from lxml import etree, html as lxml_html
+
+BACKGROUND_URL_PATTERN = re.compile(r'background(?:-image)?\s*:[^;]*url\(["\']?([^"\')]+)["\']?\)', re.IGNORECASE)
+VIDEO_FILE_PATTERN = re.compile(r'\.(mp4|webm|avi|mov|m3u8)$', re.IGNORECASE)
+
+# JavaScript ile render edilen uygulamaların boş kök elemanları
+SPA_ROOT_PATTERN = re.compile(
+    r'<(?:div|main|section)[^>]+id=["\'](?:root|app|__next|__nuxt|___gatsby|svelte)["\'][^>]*>\s*</(?:div|main|section)>'
+    r'|<app-root[\s>]|\bng-app\b|\bdata-reactroot\b|\bdata-server-rendered=["\']false',
+    re.IGNORECASE
+)
+NOSCRIPT_BLOCK_PATTERN = re.compile(r'<noscript[^>]*>(.*?)</noscript>', re.IGNORECASE | re.DOTALL)
+NOSCRIPT_HINT_PATTERN = re.compile(
+    r'enable\s+javascript|javascript\s+(?:is\s+)?(?:required|disabled)|javascript.{0,30}(?:etkinle|gerekli)',
+    re.IGNORECASE | re.DOTALL
+)
+MIN_STATIC_TEXT_LENGTH = 200
+MIN_STATIC_LINKS = 3
+
+# Bu boyutun üzerindeki sayfalar event loop'u bloklamamak için process pool'da parse edilir
+LARGE_PAGE_CHARS = int(os.environ.get("HTML_PARSE_POOL_THRESHOLD", str(512 * 1024)))
+
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'template'}
+TEXT_TAGS = {'h1', 'h2', 'h3', 'p'}
+
+_parser = lxml_html.HTMLParser(encoding='utf-8', remove_comments=True, remove_pis=True)
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def classify_video_url(url: str) -> str:
+    """Video URL tipini belirle; video değilse boş string"""
+    if 'youtube' in url or 'youtu.be' in url:
+        return 'youtube'
+    if 'vimeo' in url:
+        return 'vimeo'
+    if 'vk.com/video' in url or 'vkvideo' in url:
+        return 'vk'
+    if 'dailymotion' in url:
+        return 'dailymotion'
+    if VIDEO_FILE_PATTERN.search(url.split('?')[0]):
+        return 'video'
+    return ''
+
+
+def _to_int(value) -> int:
+    try:
+        return int(str(value).strip().rstrip('px'))
+    except (TypeError, ValueError):
+        return 0
+
+
+def extract_static_payload(html: str, base_url: str, min_text_length: int = 50) -> Dict[str, List]:
+    """HTML'den görsel, video, metin ve linkleri tek geçişte çıkar
+
+    Görsellerde `source` ('img' / 'background'), videolarda `source`
+    ('iframe' / 'video' / 'link' / 'data') alanı bulunur; metinlerde `length`
+    kesilmemiş metin uzunluğudur.
+    """
+    images: List[Dict] = []
+    videos: List[Dict] = []
+    texts: List[Dict] = []
+    links: List[str] = []
+    payload = {'images': images, 'videos': videos, 'texts': texts, 'links': links, 'text_length': 0}
+    if not html or not html.strip():
+        return payload
+
+    try:
+        root = lxml_html.fromstring(html.encode('utf-8', errors='replace'), parser=_parser)
+    except (etree.ParserError, ValueError):
+        return payload
+    if root is None:
+        return payload
+
+    seen_images = set()
+    seen_videos = set()
+    text_length = 0
+
+    def push_image(url: str, alt: str, width: int, height: int, source: str) -> None:
+        if not url or url.startswith('data:') or url in seen_images:
+            return
+        seen_images.add(url)
+        images.append({'url': url, 'alt': alt, 'width': width, 'height': height, 'source': source})
+
+    def push_video(url: str, video_type: str, source: str, title: str = '') -> None:
+        if not url or url in seen_videos:
+            return
+        seen_videos.add(url)
+        videos.append({'url': url, 'type': video_type, 'source': source, 'title': title})
+
+    walker = etree.iterwalk(root, events=('start', 'end'))
+    for event, el in walker:
+        tag = el.tag if isinstance(el.tag, str) else ''
+        if event == 'end':
+            if el.tail:
+                text_length += len(el.tail.strip())
+            continue
+        if tag in SKIPPED_TAGS:
+            walker.skip_subtree()
+            continue
+        if el.text:
+            text_length += len(el.text.strip())
+
+        attrib = el.attrib
+        if tag == 'base' and attrib.get('href'):
+            # <base href> <head> içinde gelir; sonraki göreli URL'ler ona göre çözülür
+            base_url = urljoin(base_url, attrib['href'].strip())
+        elif tag == 'img':
+            src = attrib.get('src') or attrib.get('data-src') or attrib.get('data-lazy')
+            if src:
+                push_image(urljoin(base_url, src.strip()), attrib.get('alt', ''),
+                           _to_int(attrib.get('width')), _to_int(attrib.get('height')), 'img')
+        elif tag == 'a':
+            href = attrib.get('href', '').strip()
+            if href and not href.startswith('#') and not href.startswith('javascript:'):
+                full_url = urljoin(base_url, href)
+                links.append(full_url)
+                video_type = classify_video_url(full_url)
+                if video_type:
+                    push_video(full_url, video_type, 'link')
+        elif tag == 'iframe':
+            src = attrib.get('src') or attrib.get('data-src')
+            if src:
+                full_url = urljoin(base_url, src.strip())
+                video_type = classify_video_url(full_url)
+                if video_type and video_type != 'video':
+                    push_video(full_url, video_type, 'iframe', attrib.get('title', ''))
+        elif tag == 'video':
+            src = attrib.get('src')
+            if not src:
+                source = el.find('.//source[@src]')
+                src = source.get('src') if source is not None else None
+            if src and not src.startswith('blob:'):
+                push_video(urljoin(base_url, src.strip()), 'video', 'video')
+        elif tag in TEXT_TAGS:
+            text = ' '.join(el.text_content().split())
+            if len(text) > min_text_length:
+                texts.append({
+                    'content': text[:500],
+                    'type': tag,
+                    'wordCount': len(text.split()),
+                    'length': len(text)
+                })
+
+        data_video = attrib.get('data-video') or attrib.get('data-video-url') or attrib.get('data-video-src')
+        if data_video and not data_video.startswith('blob:'):
+            push_video(urljoin(base_url, data_video.strip()), 'video', 'data')
+
+        style = attrib.get('style')
+        if style and 'url(' in style:
+            match = BACKGROUND_URL_PATTERN.search(style)
+            if match:
+                push_image(urljoin(base_url, match.group(1).strip()), 'Background', 0, 0, 'background')
+
+    payload['text_length'] = text_length
+    return payload
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) - 1))
+    return _process_pool
+
+
+async def extract_static_payload_async(html: str, base_url: str, min_text_length: int = 50) -> Dict[str, List]:
+    """Küçük sayfaları doğrudan, büyük sayfaları process pool'da parse et"""
+    if len(html) < LARGE_PAGE_CHARS:
+        return extract_static_payload(html, base_url, min_text_length)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_process_pool(), extract_static_payload, html, base_url, min_text_length)
+
+
+def shutdown_process_pool() -> None:
+    """Uygulama kapanırken process pool'u kapat"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+
+def needs_rendering(html: str, payload: Dict) -> bool:
+    """Sayfa JavaScript render'ı gerektiriyor mu? (boş gövde, SPA kökü, noscript uyarısı, az link)"""
+    if not html or not html.strip():
+        return True
+    if SPA_ROOT_PATTERN.search(html):
+        return True
+    if any(NOSCRIPT_HINT_PATTERN.search(block) for block in NOSCRIPT_BLOCK_PATTERN.findall(html)):
+        return True
+    if payload.get('text_length', 0) < MIN_STATIC_TEXT_LENGTH:
+        return True
+    # Az link + script: navigasyon büyük ihtimalle JS ile oluşturuluyor
+    if len(payload.get('links', [])) < MIN_STATIC_LINKS and '<script' in html.lower():
+        return True
+    return False
@@ -0,0 +1,187 @@
+"""
+Kalıcı HTTP Koşullu İstek Önbelleği
+Normalize URL anahtarıyla ETag / Last-Modified / gövde hash'i saklar; tekrar taramalarda
+If-None-Match / If-Modified-Since gönderilir, 304 gelirse gövde ve çıkarım sonucu diskten okunur.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    etag: str = ""
+    last_modified: str = ""
+    body_hash: str = ""
+    content_type: str = ""
+    final_url: str = ""
+    fetched_at: float = 0.0
+    extractions: Dict[str, Dict] = field(default_factory=dict)  # varyant -> çıkarım sonucu
+
+
+def normalize_cache_url(url: str) -> str:
+    """Önbellek anahtarı için URL'yi normalize et (fragment yok, küçük harf host)"""
+    parsed = urlparse(url)
+    path = parsed.path.rstrip('/') or '/'
+    normalized = f"{parsed.scheme.lower()}://{parsed.netloc.lower()}{path}"
+    if parsed.query:
+        normalized += f"?{parsed.query}"
+    return normalized
+
+
+def body_hash(body: str) -> str:
+    return hashlib.sha1(body.encode('utf-8', errors='replace')).hexdigest()
+
+
+class HttpCache:
+    """Disk üzerinde URL başına metadata (.json) ve sıkıştırılmış gövde (.html.gz)
+
+    Birden fazla tarama aynı önbelleği paylaşabilir; dosyalar geçici dosya + rename
+    ile atomik yazılır.
+    """
+
+    def __init__(self, cache_dir: str, max_memory_entries: int = 2048):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Son kullanılan kayıtlar bellekte tutulur (LRU); gerisi gerektiğinde diskten okunur
+        self.max_memory_entries = max_memory_entries
+        self._entries: 'OrderedDict[str, Optional[CacheEntry]]' = OrderedDict()
+        self.hits = 0  # 304 ile yeniden kullanılan sayfalar
+        self.misses = 0
+
+    def _paths(self, url: str) -> Tuple[str, Path, Path]:
+        key = hashlib.sha1(normalize_cache_url(url).encode('utf-8')).hexdigest()
+        directory = self.cache_dir / key[:2]
+        return key, directory / f"{key}.json", directory / f"{key}.html.gz"
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """URL'nin önbellek kaydı (bellekte yoksa diskten okunur)"""
+        key, meta_path, _ = self._paths(url)
+        if key not in self._entries:
+            entry = None
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    entry = CacheEntry(**json.load(f))
+            except FileNotFoundError:
+                pass
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Corrupt cache entry for {url}: {e}")
+            self._remember(key, entry)
+        else:
+            self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def _remember(self, key: str, entry: Optional[CacheEntry]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_memory_entries:
+            self._entries.popitem(last=False)
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Kayıtlı doğrulayıcılara göre If-None-Match / If-Modified-Since başlıkları"""
+        entry = self.get(url)
+        headers: Dict[str, str] = {}
+        if entry is None or not entry.body_hash:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def forget(self, url: str) -> None:
+        """Kaydı yok say (örn. 304 geldi ama gövde dosyası kayıp)"""
+        key, _, _ = self._paths(url)
+        self._remember(key, None)
+
+    async def load_body(self, url: str) -> Optional[Tuple[str, str]]:
+        """304 yanıtı için önbellekteki (gövde, final_url); kayıt yoksa None"""
+        entry = self.get(url)
+        if entry is None:
+            return None
+        _, _, body_path = self._paths(url)
+        try:
+            body = await asyncio.to_thread(self._read_body, body_path)
+        except (OSError, EOFError) as e:
+            logger.warning(f"Cached body missing for {url}: {e}")
+            return None
+        self.hits += 1
+        return body, entry.final_url or url
+
+    async def store(self, url: str, headers, body: str, final_url: str = "") -> CacheEntry:
+        """200 yanıtını kaydet; gövde değiştiyse eski çıkarım sonuçları silinir"""
+        self.misses += 1
+        digest = body_hash(body)
+        previous = self.get(url)
+        entry = CacheEntry(
+            url=normalize_cache_url(url),
+            etag=headers.get('etag', ''),
+            last_modified=headers.get('last-modified', ''),
+            body_hash=digest,
+            content_type=headers.get('content-type', ''),
+            final_url=final_url or url,
+            fetched_at=time.time(),
+            extractions=previous.extractions if previous and previous.body_hash == digest else {}
+        )
+        key, meta_path, body_path = self._paths(url)
+        self._remember(key, entry)
+        try:
+            if not (previous and previous.body_hash == digest and body_path.exists()):
+                await asyncio.to_thread(self._write_body, body_path, body)
+            await asyncio.to_thread(self._write_meta, meta_path, entry)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry for {url}: {e}")
+        return entry
+
+    def get_extraction(self, url: str, body: str, variant: str) -> Optional[Dict]:
+        """Gövde değişmediyse önceki çıkarım sonucunu döndür"""
+        entry = self.get(url)
+        if entry is None or entry.body_hash != body_hash(body):
+            return None
+        return entry.extractions.get(variant)
+
+    async def put_extraction(self, url: str, body: str, variant: str, payload: Dict) -> None:
+        entry = self.get(url)
+        if entry is None or entry.body_hash != body_hash(body):
+            return
+        entry.extractions[variant] = payload
+        _, meta_path, _ = self._paths(url)
+        try:
+            await asyncio.to_thread(self._write_meta, meta_path, entry)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry for {url}: {e}")
+
+    @staticmethod
+    def _read_body(path: Path) -> str:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    @staticmethod
+    def _write_body(path: Path, body: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=5) as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _write_meta(path: Path, entry: CacheEntry) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(asdict(entry), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
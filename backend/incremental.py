@@ -0,0 +1,98 @@
+"""
+Artımlı (Incremental) Tarama
+Aynı alan adının önceki raporunu yükler: içerik hash'i değişmeyen sayfaların öğeleri
+(görsel, video, metin, sorun) ve linkleri yeniden kullanılır; sonunda iki rapor karşılaştırılır.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+# Sayfa başına gruplanan rapor listeleri -> sayfa URL alanı
+PAGE_ITEM_FIELDS = {
+    'images': 'page_url',
+    'videos': 'page_url',
+    'youtube_videos': 'page_url',
+    'texts': 'page_url',
+    'issues': 'source_url',
+}
+
+# Delta listeleri başlık dokümanında saklanır; çok büyük değişikliklerde sadece sayı tam tutulur
+DELTA_LIST_LIMIT = 1000
+
+
+def issue_key(issue: Dict) -> Tuple:
+    return (issue.get('source_url', ''), issue.get('issue_type', ''),
+            issue.get('target_url', ''), issue.get('fix_suggestion', ''))
+
+
+class PreviousCrawl:
+    """Tek dokümanlık (bellekteki) önceki rapor; Mongo koleksiyonlu sürüm report_store'dadır"""
+
+    def __init__(self, report: Dict):
+        self.report_id = str(report.get('id') or report.get('_id') or '')
+        self.end_time = report.get('end_time', '')
+        self.page_hashes: Dict[str, str] = {
+            page['url']: page.get('content_hash', '') for page in report.get('pages', [])
+        }
+        self._links = {page['url']: page.get('links', []) for page in report.get('pages', [])}
+        self._report = report
+        self._items: Dict[str, Dict[str, List[Dict]]] = defaultdict(lambda: defaultdict(list))
+        for field_name, url_field in PAGE_ITEM_FIELDS.items():
+            for item in report.get(field_name, []):
+                self._items[item.get(url_field, '')][field_name].append(item)
+
+    def is_unchanged(self, url: str, content_hash: str) -> bool:
+        return bool(content_hash) and self.page_hashes.get(url) == content_hash
+
+    async def page_items(self, url: str) -> Dict[str, List[Dict]]:
+        """Sayfanın önceki rapordaki öğeleri (tür -> liste)"""
+        return self._items.get(url, {})
+
+    async def links_for(self, url: str) -> List[str]:
+        return self._links.get(url, [])
+
+    async def item_keys(self) -> Dict[str, Set]:
+        """Delta için öğe anahtarları: görsel/video URL'leri ve sorun anahtarları"""
+        report = self._report
+        return {
+            'images': {item['url'] for item in report.get('images', [])},
+            'videos': {item['url'] for item in report.get('videos', []) + report.get('youtube_videos', [])},
+            'issues': {issue_key(issue) for issue in report.get('issues', [])},
+        }
+
+
+def _diff(previous: Set, current: Set) -> Tuple[List, List]:
+    return sorted(current - previous), sorted(previous - current)
+
+
+def compute_delta(previous: PreviousCrawl, previous_keys: Dict[str, Set], current_keys: Dict[str, Set],
+                  current_pages: Dict[str, str]) -> Dict:
+    """Önceki ve yeni tarama arasındaki farklar (sayfa, görsel, video, sorun)"""
+    previous_pages = previous.page_hashes
+    delta = {
+        'previous_report_id': previous.report_id,
+        'previous_end_time': previous.end_time,
+        'new_pages': [url for url in current_pages if url not in previous_pages],
+        'removed_pages': [url for url in previous_pages if url not in current_pages],
+        'changed_pages': [
+            url for url, content_hash in current_pages.items()
+            if url in previous_pages and (not content_hash or previous_pages[url] != content_hash)
+        ],
+    }
+    delta['unchanged_pages'] = len(current_pages) - len(delta['new_pages']) - len(delta['changed_pages'])
+
+    for name in ('images', 'videos', 'issues'):
+        added, removed = _diff(previous_keys.get(name, set()), current_keys.get(name, set()))
+        if name == 'issues':
+            fields = ('source_url', 'issue_type', 'target_url', 'fix_suggestion')
+            added = [dict(zip(fields, key)) for key in added]
+            removed = [dict(zip(fields, key)) for key in removed]
+        delta[f'added_{name}'] = added
+        delta[f'removed_{name}'] = removed
+
+    # Başlık dokümanı küçük kalsın: listeleri kırp, sayıları ayrıca tut
+    for key in list(delta):
+        if isinstance(delta[key], list):
+            delta[f'{key}_count'] = len(delta[key])
+            delta[key] = delta[key][:DELTA_LIST_LIMIT]
+    return delta
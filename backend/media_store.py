@@ -0,0 +1,271 @@
+"""
+İçerik Adresli Medya Deposu
+İndirilen görsel/video/ses dosyaları SHA-256'ya göre parçalanmış klasörlerde (objects/ab/cd/<hash>.ext)
+bir kez saklanır; DOWNLOADS_DIR'deki okunabilir adlar bu nesnelere hardlink'tir. SQLite indeksi
+URL -> hash, ad -> hash eşlemelerini ve referans sayılarını tutar: aynı URL veya aynı içerik
+yeniden indirilmez, son adı silinen nesne diskten kaldırılır.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from http_cache import normalize_cache_url
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_NAME_LENGTH = 180
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    content_type TEXT NOT NULL DEFAULT '',
+    refcount INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS names (
+    name TEXT PRIMARY KEY,
+    hash TEXT NOT NULL REFERENCES objects(hash)
+);
+CREATE INDEX IF NOT EXISTS names_hash ON names(hash);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES objects(hash),
+    name TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (url, variant)
+);
+CREATE INDEX IF NOT EXISTS urls_hash ON urls(hash);
+"""
+
+
+@dataclass
+class StoredMedia:
+    hash: str
+    name: str  # DOWNLOADS_DIR içindeki okunabilir ad (hardlink)
+    path: str  # Nesne dosyası
+    size: int
+    content_type: str = ''
+    deduplicated: bool = False  # İçerik zaten depodaydı
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def safe_name(name: str, fallback: str = 'file') -> str:
+    """Dosya sistemi için güvenli, kısaltılmış ad (uzantı korunur)"""
+    name = os.path.basename(name.replace('\\', '/')).strip().lstrip('.')
+    name = ''.join(ch if ch.isprintable() and ch not in '<>:"|?*' else '_' for ch in name)
+    stem, ext = os.path.splitext(name or fallback)
+    return f"{stem[:MAX_NAME_LENGTH - len(ext)]}{ext}"
+
+
+class MediaStore:
+    """Hardlink'li okunabilir adlarla içerik adresli depo
+
+    Metotlar engelleyici (hash/kopyalama + SQLite); event loop'tan `asyncio.to_thread` ile çağrılır.
+    Tüm işlemler tek bir kilitle sıralanır.
+    """
+
+    def __init__(self, root: str, names_dir: str):
+        self.root = Path(root)
+        self.names_dir = Path(names_dir)
+        self.objects_dir = self.root / 'objects'
+        self.staging_dir = self.root / 'staging'
+        for directory in (self.objects_dir, self.staging_dir, self.names_dir):
+            directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / 'index.sqlite3'), check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+        self.hits = 0
+        self.deduplicated = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def object_path(self, digest: str, ext: str = '') -> Path:
+        return self.objects_dir / digest[:2] / digest[2:4] / f"{digest}{ext}"
+
+    def staging_path(self, key: str) -> Path:
+        """İndirme için geçici klasör/dosya yolu (aynı dosya sisteminde: taşıma kopyasız)"""
+        return self.staging_dir / key
+
+    def lookup(self, url: str, variant: str = '', link: bool = True) -> Optional[StoredMedia]:
+        """URL daha önce saklandıysa (dosya hâlâ yerindeyse) kaydı
+
+        `link` ise okunabilir ad yoksa (silinmiş / hiç bağlanmamış) yeniden bağlanır.
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT u.hash, u.name, o.ext, o.size, o.content_type FROM urls u JOIN objects o ON o.hash = u.hash '
+                'WHERE u.url = ? AND u.variant = ?', (normalize_cache_url(url), variant)
+            ).fetchone()
+            if row is None:
+                return None
+            digest, name, ext, size, content_type = row
+            path = self.object_path(digest, ext)
+            if not path.exists():
+                # Nesne dışarıdan silinmiş: kaydı unut, yeniden indirilsin
+                self._forget_object(digest)
+                return None
+            if link and not (name and self._same_file(self.names_dir / name, path)):
+                name = self._link_name(digest, path, name or self._url_name(url, digest, ext))
+                self._db.execute('UPDATE urls SET name = ? WHERE url = ? AND variant = ?',
+                                 (name, normalize_cache_url(url), variant))
+            self._db.execute('UPDATE objects SET last_access = ? WHERE hash = ?', (time.time(), digest))
+            self.hits += 1
+            return StoredMedia(hash=digest, name=name, path=str(path), size=size, content_type=content_type)
+
+    def put_file(self, source: str, url: Optional[str] = None, variant: str = '', name: Optional[str] = None,
+                 content_type: str = '', digest: Optional[str] = None, link: bool = True) -> StoredMedia:
+        """Dosyayı depoya taşı (içerik zaten varsa kaynak silinir) ve okunabilir adla bağla
+
+        `link=False`: sadece önbellek olarak sakla (ör. ZIP'e giren görseller), ad oluşturma.
+        """
+        digest = digest or file_sha256(source)
+        ext = os.path.splitext(name or source)[1].lower()[:10]
+        with self._lock:
+            row = self._db.execute('SELECT ext, size, content_type FROM objects WHERE hash = ?', (digest,)).fetchone()
+            deduplicated = row is not None and self.object_path(digest, row[0]).exists()
+            if deduplicated:
+                ext, size, content_type = row[0], row[1], row[2] or content_type
+                os.unlink(source)
+                self.deduplicated += 1
+            else:
+                if row is not None:
+                    # Nesne dosyası dışarıdan silinmiş: eski ad/URL kayıtlarını temizle
+                    self._forget_object(digest)
+                path = self.object_path(digest, ext)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(source, path)
+                size = path.stat().st_size
+                now = time.time()
+                self._db.execute(
+                    'INSERT OR REPLACE INTO objects (hash, ext, size, content_type, refcount, created_at, last_access) '
+                    'VALUES (?, ?, ?, ?, 0, ?, ?)', (digest, ext, size, content_type, now, now)
+                )
+            path = self.object_path(digest, ext)
+            linked_name = ''
+            if link:
+                linked_name = self._link_name(digest, path, safe_name(name or os.path.basename(source), digest[:12] + ext))
+            if url:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO urls (url, variant, hash, name, stored_at) VALUES (?, ?, ?, ?, ?)',
+                    (normalize_cache_url(url), variant, digest, linked_name, time.time())
+                )
+            return StoredMedia(hash=digest, name=linked_name, path=str(path), size=size,
+                               content_type=content_type, deduplicated=deduplicated)
+
+    def release(self, name: str) -> bool:
+        """Okunabilir adı sil; nesnenin son adıysa nesneyi ve URL kayıtlarını da sil"""
+        with self._lock:
+            row = self._db.execute('SELECT hash FROM names WHERE name = ?', (name,)).fetchone()
+            if row is None:
+                return False
+            digest = row[0]
+            self._db.execute('DELETE FROM names WHERE name = ?', (name,))
+            self._db.execute('UPDATE objects SET refcount = refcount - 1 WHERE hash = ?', (digest,))
+            try:
+                (self.names_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+            remaining = self._db.execute('SELECT refcount FROM objects WHERE hash = ?', (digest,)).fetchone()
+            if remaining is not None and remaining[0] <= 0:
+                self._forget_object(digest)
+            return True
+
+    def stats(self) -> Dict:
+        with self._lock:
+            objects, stored_bytes = self._db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects').fetchone()
+            names = self._db.execute('SELECT COUNT(*) FROM names').fetchone()[0]
+            urls, url_bytes = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(o.size), 0) FROM urls u JOIN objects o ON o.hash = u.hash'
+            ).fetchone()
+        return {
+            'objects': objects,
+            'names': names,
+            'urls': urls,
+            'stored_mb': round(stored_bytes / 1024 / 1024, 2),
+            'saved_mb': round(max(0, url_bytes - stored_bytes) / 1024 / 1024, 2),  # Tekilleştirmenin kazandırdığı
+            'hits': self.hits,
+            'deduplicated': self.deduplicated,
+        }
+
+    def _link_name(self, digest: str, path: Path, name: str) -> str:
+        """`name`'i nesneye hardlink'le; ad başka içeriğe aitse _1, _2... eklenir"""
+        stem, ext = os.path.splitext(name)
+        candidate, counter = name, 1
+        while True:
+            row = self._db.execute('SELECT hash FROM names WHERE name = ?', (candidate,)).fetchone()
+            target = self.names_dir / candidate
+            if row is not None and row[0] == digest:
+                if not self._same_file(target, path):
+                    self._hardlink(path, target)
+                return candidate
+            if row is None and not target.exists():
+                self._hardlink(path, target)
+                self._db.execute('INSERT INTO names (name, hash) VALUES (?, ?)', (candidate, digest))
+                self._db.execute('UPDATE objects SET refcount = refcount + 1 WHERE hash = ?', (digest,))
+                return candidate
+            candidate = f"{stem}_{counter}{ext}"
+            counter += 1
+
+    @staticmethod
+    def _url_name(url: str, digest: str, ext: str) -> str:
+        filename = os.path.basename(url.split('?')[0].split('#')[0])
+        if '.' not in filename:
+            filename = f"{filename or digest[:12]}{ext}"
+        return safe_name(filename, digest[:12] + ext)
+
+    def _forget_object(self, digest: str) -> None:
+        row = self._db.execute('SELECT ext FROM objects WHERE hash = ?', (digest,)).fetchone()
+        for (name,) in self._db.execute('SELECT name FROM names WHERE hash = ?', (digest,)).fetchall():
+            try:
+                (self.names_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+        self._db.execute('DELETE FROM urls WHERE hash = ?', (digest,))
+        self._db.execute('DELETE FROM names WHERE hash = ?', (digest,))
+        self._db.execute('DELETE FROM objects WHERE hash = ?', (digest,))
+        if row is not None:
+            try:
+                self.object_path(digest, row[0]).unlink()
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _same_file(first: Path, second: Path) -> bool:
+        try:
+            return os.path.samefile(first, second)
+        except OSError:
+            return False
+
+    @staticmethod
+    def _hardlink(source: Path, target: Path) -> None:
+        try:
+            if target.exists() or target.is_symlink():
+                target.unlink()
+            os.link(source, target)
+        except OSError:
+            # Hardlink desteklenmiyor (farklı dosya sistemi vb.): kopyala
+            shutil.copy2(source, target)
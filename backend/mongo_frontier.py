@@ -0,0 +1,154 @@
+"""
+Paylaşılan Tarama Sınırı (MongoDB)
+Birden fazla süreç/makine aynı kuyruktan URL kiralar (lease). Kiralanan URL görünürlük
+süresi dolana kadar başkasına verilmez; worker çökerse süre dolunca URL tekrar dağıtılır.
+"""
+
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+FRONTIER_COLLECTION = 'crawl_frontier'
+CRAWLS_COLLECTION = 'distributed_crawls'
+
+
+class MongoFrontier:
+    """`crawl_frontier` koleksiyonunda (crawl_id, url) başına tek doküman
+
+    state: pending -> leased -> done / failed. `max_pages` verilirse dağıtım bütçesi
+    `distributed_crawls.leased` sayacıyla tüm worker'lar arasında atomik olarak sınırlanır.
+    """
+
+    def __init__(self, db, crawl_id: str, max_pages: Optional[int] = None,
+                 visibility_timeout: float = 120, max_attempts: int = 3):
+        self.db = db
+        self.crawl_id = crawl_id
+        self.max_pages = max_pages
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.collection = db[FRONTIER_COLLECTION]
+
+    @staticmethod
+    async def ensure_indexes(db) -> None:
+        collection = db[FRONTIER_COLLECTION]
+        await collection.create_index([('crawl_id', 1), ('url', 1)], unique=True)
+        await collection.create_index([('crawl_id', 1), ('state', 1), ('priority', 1), ('created_at', 1)])
+        await collection.create_index([('crawl_id', 1), ('state', 1), ('lease_expires', 1)])
+        await collection.create_index([('lease_owner', 1), ('state', 1)])
+
+    async def add_many(self, entries: Iterable[Tuple[str, int, int]]) -> int:
+        """(url, depth, priority) girişlerini ekle; daha önce görülmüş URL'ler atlanır"""
+        now = time.time()
+        documents = [
+            {
+                'crawl_id': self.crawl_id, 'url': url, 'depth': depth, 'priority': priority,
+                'state': 'pending', 'attempts': 0, 'lease_owner': '', 'lease_expires': 0.0,
+                'created_at': now
+            }
+            for url, depth, priority in entries
+        ]
+        if not documents:
+            return 0
+        return await self._insert_missing(documents)
+
+    async def _insert_missing(self, documents: List[Dict]) -> int:
+        """(crawl_id, url) başına olmayanları ekle (upsert + $setOnInsert); eklenen sayısı"""
+        operations = [
+            UpdateOne({'crawl_id': doc['crawl_id'], 'url': doc['url']}, {'$setOnInsert': doc}, upsert=True)
+            for doc in documents
+        ]
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            return result.upserted_count
+        except BulkWriteError as e:
+            # Eşzamanlı upsert yarışı: unique indeks ikinci eklemeyi reddeder
+            return e.details.get('nUpserted', 0)
+
+    async def lease(self, worker_id: str) -> Optional[Dict]:
+        """Süresi dolmuş bir kiralamayı ya da (bütçe varsa) yeni bir URL'yi kirala"""
+        now = time.time()
+        lease_update = {
+            '$set': {'state': 'leased', 'lease_owner': worker_id, 'lease_expires': now + self.visibility_timeout},
+            '$inc': {'attempts': 1}
+        }
+        sort = [('priority', 1), ('created_at', 1)]
+
+        # 1) Çöken worker'lardan kalan kiralamalar (bütçeden zaten düşülmüş)
+        while True:
+            entry = await self.collection.find_one_and_update(
+                {'crawl_id': self.crawl_id, 'state': 'leased', 'lease_expires': {'$lt': now}},
+                lease_update, sort=sort, return_document=ReturnDocument.AFTER
+            )
+            if entry is None:
+                break
+            if entry['attempts'] <= self.max_attempts:
+                return entry
+            await self._set_state(entry['url'], 'failed')
+
+        # 2) Yeni URL: önce bütçeden bir sayfa ayır
+        if self.max_pages is not None:
+            reserved = await self.db[CRAWLS_COLLECTION].find_one_and_update(
+                {'_id': self.crawl_id, 'leased': {'$lt': self.max_pages}}, {'$inc': {'leased': 1}}
+            )
+            if reserved is None:
+                return None
+        entry = await self.collection.find_one_and_update(
+            {'crawl_id': self.crawl_id, 'state': 'pending'},
+            lease_update, sort=sort, return_document=ReturnDocument.AFTER
+        )
+        if entry is None and self.max_pages is not None:
+            await self.db[CRAWLS_COLLECTION].update_one({'_id': self.crawl_id}, {'$inc': {'leased': -1}})
+        return entry
+
+    async def extend_leases(self, worker_id: str) -> int:
+        """Heartbeat: worker'ın elindeki tüm kiralamaların süresini uzat"""
+        result = await self.collection.update_many(
+            {'crawl_id': self.crawl_id, 'state': 'leased', 'lease_owner': worker_id},
+            {'$set': {'lease_expires': time.time() + self.visibility_timeout}}
+        )
+        return result.modified_count
+
+    async def complete_many(self, urls: List[str], worker_id: str) -> int:
+        """Sonuçları yazılmış URL'leri tamamlandı işaretle (sadece kiralama hâlâ bu worker'daysa)"""
+        if not urls:
+            return 0
+        result = await self.collection.update_many(
+            {'crawl_id': self.crawl_id, 'url': {'$in': urls}, 'state': 'leased', 'lease_owner': worker_id},
+            {'$set': {'state': 'done', 'lease_owner': '', 'completed_at': time.time()}}
+        )
+        return result.modified_count
+
+    async def release(self, url: str, worker_id: str, attempts: int) -> None:
+        """İşlenemeyen URL'yi geri bırak; deneme hakkı bittiyse failed"""
+        state = 'pending' if attempts < self.max_attempts else 'failed'
+        result = await self.collection.update_one(
+            {'crawl_id': self.crawl_id, 'url': url, 'state': 'leased', 'lease_owner': worker_id},
+            {'$set': {'state': state, 'lease_owner': '', 'lease_expires': 0.0}}
+        )
+        if state == 'pending' and result.modified_count and self.max_pages is not None:
+            # Tekrar kiralanırken bütçeden yeniden düşülecek
+            await self.db[CRAWLS_COLLECTION].update_one({'_id': self.crawl_id}, {'$inc': {'leased': -1}})
+
+    async def _set_state(self, url: str, state: str) -> None:
+        await self.collection.update_one({'crawl_id': self.crawl_id, 'url': url}, {'$set': {'state': state}})
+
+    async def counts(self) -> Dict[str, int]:
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        pipeline = [{'$match': {'crawl_id': self.crawl_id}}, {'$group': {'_id': '$state', 'n': {'$sum': 1}}}]
+        async for row in self.collection.aggregate(pipeline):
+            counts[row['_id']] = row['n']
+        return counts
+
+    async def is_finished(self) -> bool:
+        """Kimsede kiralama kalmadı ve bekleyen yok (ya da sayfa bütçesi bitti)"""
+        counts = await self.counts()
+        if counts['leased']:
+            return False
+        if not counts['pending']:
+            return True
+        if self.max_pages is None:
+            return False
+        crawl = await self.db[CRAWLS_COLLECTION].find_one({'_id': self.crawl_id}, {'leased': 1})
+        return bool(crawl) and crawl.get('leased', 0) >= self.max_pages
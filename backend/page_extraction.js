@@ -0,0 +1,225 @@
+(options = {}) => {
+    // Tek geçişte görsel, video, metin ve link toplama.
+    // options.videosOnly: VK kaydırma turlarında sadece videoları döndür
+    const videosOnly = !!options.videosOnly;
+    const images = [];
+    const videos = [];
+    const texts = [];
+    const links = [];
+    const seenVideos = new Set();
+    const seenImages = new Set();
+    const currentUrl = window.location.href;
+    const isVkSite = currentUrl.includes('vk.com') || currentUrl.includes('vkvideo.ru');
+    const viewportHeight = window.innerHeight || document.documentElement.clientHeight;
+    const viewportWidth = window.innerWidth || document.documentElement.clientWidth;
+
+    const vkSelector = [
+        'a[href*="/video-"]',
+        'a[href*="/video@"]',
+        'a[href*="video"][href*="_"]',
+        '[data-video-id]',
+        '.VideoCard a',
+        '.video_item a',
+        '.VideoThumb a'
+    ].join(', ');
+    // Sadece bu ipuçlarını taşıyan elemanlarda getComputedStyle çağrılır
+    const bgClassHint = /(^|[\s_-])(bg|background|hero|banner|cover|slide|slider|thumb|poster|parallax)/i;
+    const urlPattern = /url\(["']?([^"')]+)["']?\)/;
+
+    const getBackgroundImage = (el) => {
+        if (!el) return '';
+        const style = getComputedStyle(el).backgroundImage;
+        if (!style || style === 'none') {
+            return '';
+        }
+        const match = style.match(urlPattern);
+        return match ? match[1] : '';
+    };
+    const isVisible = (el) => {
+        if (!el) return false;
+        if (el.hidden) return false;
+        const style = window.getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') {
+            return false;
+        }
+        return !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    };
+    const isInViewport = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.bottom > 0 && rect.right > 0 && rect.top < viewportHeight && rect.left < viewportWidth;
+    };
+    const shouldIncludeElement = (el) => isVisible(el) && isInViewport(el);
+    const pushVideo = (url, type, extra) => {
+        if (!url || seenVideos.has(url)) return;
+        seenVideos.add(url);
+        videos.push(Object.assign({ url, type }, extra || {}));
+    };
+    const pushImage = (url, alt, width, height) => {
+        if (!url || url.startsWith('data:') || seenImages.has(url)) return;
+        seenImages.add(url);
+        images.push({ url, alt, width, height });
+    };
+
+    const collectVkCard = (el) => {
+        let href = el.href || el.getAttribute('href');
+        const videoId = el.dataset?.videoId;
+        const rawId = el.dataset?.videoRawId;
+        const thumbData = el.dataset?.thumb || el.dataset?.preview || el.dataset?.poster;
+
+        // data-video-id varsa URL oluştur
+        if (videoId && !href) {
+            href = 'https://vk.com/video' + videoId;
+        }
+        if (rawId && !href) {
+            href = 'https://vk.com/video' + rawId;
+        }
+        if (!href || seenVideos.has(href)) return;
+
+        // VK video URL formatını kontrol et
+        const vkMatch = href.match(/video(-?\d+_\d+)/);
+        if (!vkMatch) return;
+        const cleanUrl = 'https://vk.com/video' + vkMatch[1];
+        if (seenVideos.has(cleanUrl)) return;
+
+        // Thumbnail bulmaya çalış
+        let thumb = '';
+        const img = el.querySelector('img') || el.closest('.VideoCard')?.querySelector('img');
+        if (img) {
+            thumb = img.src || img.dataset.src || img.dataset.lazy || img.dataset.lazySrc || '';
+        }
+        if (!thumb && thumbData) {
+            thumb = thumbData;
+        }
+        if (!thumb) {
+            thumb = getBackgroundImage(el) || getBackgroundImage(el.closest('.VideoCard') || el);
+        }
+        pushVideo(cleanUrl, 'vk', { thumbnail: thumb });
+    };
+
+    const collectLinkVideo = (a) => {
+        const href = a.href;
+        if (!href) return;
+        if (href.includes('youtube') || href.includes('youtu.be')) {
+            pushVideo(href, 'youtube');
+        } else if (href.includes('vk.com/video') || href.includes('vkvideo')) {
+            pushVideo(href, 'vk');
+        } else if (/\.(mp4|webm|avi|mov|m3u8)$/i.test(href)) {
+            pushVideo(href, 'video');
+        }
+    };
+
+    const collectIframe = (iframe) => {
+        const src = iframe.src || iframe.dataset.src;
+        if (!src) return;
+        if (src.includes('youtube') || src.includes('youtu.be')) {
+            pushVideo(src, 'youtube');
+        } else if (src.includes('vimeo')) {
+            pushVideo(src, 'vimeo');
+        } else if (src.includes('vk.com') || src.includes('vkvideo')) {
+            pushVideo(src, 'vk');
+        } else if (src.includes('dailymotion')) {
+            pushVideo(src, 'dailymotion');
+        }
+    };
+
+    const collectVideoTag = (v) => {
+        const src = v.src || v.currentSrc;
+        // CDN video URL'lerini ATLA - bunlar süreli ve çalışmaz
+        if (src && !src.startsWith('blob:') && !src.includes('okcdn') && !src.includes('vkuservideo')) {
+            // Sadece temiz .mp4/.webm URL'lerini al
+            if (src.match(/\.(mp4|webm|mov)(\?|$)/i)) {
+                pushVideo(src, 'video');
+            }
+        }
+    };
+
+    const collectBackground = (el) => {
+        const inline = el.getAttribute('style');
+        if (inline && inline.includes('url(')) {
+            const match = inline.match(urlPattern);
+            if (match) {
+                pushImage(match[1], 'Background', 0, 0);
+                return;
+            }
+        }
+        const className = typeof el.className === 'string' ? el.className : '';
+        if ((inline && inline.includes('background')) || (className && bgClassHint.test(className))) {
+            const bg = getBackgroundImage(el);
+            if (bg) {
+                pushImage(bg, 'Background', 0, 0);
+            }
+        }
+    };
+
+    const root = document.body || document.documentElement;
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT);
+    for (let el = walker.currentNode; el; el = walker.nextNode()) {
+        const tag = el.tagName;
+        switch (tag) {
+            case 'SCRIPT':
+            case 'STYLE':
+            case 'NOSCRIPT':
+            case 'TEMPLATE':
+                continue;
+            case 'IMG':
+                if (!videosOnly) {
+                    const src = el.src || el.dataset.src || el.dataset.lazy;
+                    pushImage(src, el.alt || '', el.naturalWidth || el.width || 0, el.naturalHeight || el.height || 0);
+                }
+                break;
+            case 'VIDEO':
+                if (shouldIncludeElement(el)) collectVideoTag(el);
+                break;
+            case 'IFRAME':
+                if (shouldIncludeElement(el)) collectIframe(el);
+                break;
+            case 'A': {
+                const href = el.href;
+                if (!videosOnly && href && !href.startsWith('javascript:') && !href.startsWith('#')) {
+                    links.push(href);
+                }
+                if (isVkSite && el.matches(vkSelector) && shouldIncludeElement(el)) {
+                    collectVkCard(el);
+                }
+                if (href && (href.includes('youtu') || href.includes('vk') || /\.(mp4|webm|avi|mov|m3u8)$/i.test(href))
+                        && shouldIncludeElement(el)) {
+                    collectLinkVideo(el);
+                }
+                break;
+            }
+            case 'H1':
+            case 'H2':
+            case 'H3':
+            case 'P':
+                if (!videosOnly) {
+                    const text = el.innerText.trim();
+                    if (text.length > 50) {
+                        texts.push({
+                            content: text.substring(0, 500),
+                            type: tag.toLowerCase(),
+                            wordCount: text.split(/\s+/).length
+                        });
+                    }
+                }
+                break;
+            default:
+                break;
+        }
+
+        if (isVkSite && tag !== 'A' && el.hasAttribute('data-video-id') && shouldIncludeElement(el)) {
+            collectVkCard(el);
+        }
+        // data-video attributes
+        if (el.hasAttribute('data-video') || el.hasAttribute('data-video-url') || el.hasAttribute('data-video-src')) {
+            const src = el.dataset.video || el.dataset.videoUrl || el.dataset.videoSrc;
+            if (src && !src.startsWith('blob:') && shouldIncludeElement(el)) {
+                pushVideo(src, 'video');
+            }
+        }
+        if (!videosOnly && (el.hasAttribute('style') || el.className)) {
+            collectBackground(el);
+        }
+    }
+
+    return { images, videos, texts, links };
+}
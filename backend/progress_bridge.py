@@ -0,0 +1,136 @@
+"""
+İlerleme Köprüsü - yt-dlp thread'lerinden event loop'a
+yt-dlp progress hook'ları executor thread'lerinde çalışır. Hook sadece olayın küçük bir
+kopyasını indirme başına sınırlı halka tampona ve "son durum"a yazar; uygulama (progress_data,
+WebSocket) `loop.call_soon_threadsafe` ile event loop'ta, indirme başına saniyede en fazla
+`max_rate` kez ve her zaman en güncel olayla yapılır. Son durum kilitsiz okunabilir.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# yt-dlp progress sözlüğünden tutulan alanlar (info_dict gibi büyük alanlar kopyalanmaz)
+PROGRESS_FIELDS = (
+    'status', 'downloaded_bytes', 'total_bytes', 'total_bytes_estimate', 'speed', 'eta', 'elapsed',
+    'filename', '_percent_str', '_speed_str', '_eta_str', '_downloaded_bytes_str',
+    '_total_bytes_str', '_total_bytes_estimate_str',
+)
+# Bu durumlar beklemeden iletilir
+IMMEDIATE_STATUSES = ('finished', 'error')
+
+ProgressApply = Callable[[str, Dict], None]
+
+
+@dataclass
+class _Channel:
+    loop: asyncio.AbstractEventLoop
+    recent: Deque[Dict]
+    latest: Optional[Dict] = None
+    seq: int = 0  # Hook thread'i artırır
+    delivered_seq: int = 0  # Event loop artırır
+    last_delivery: float = 0.0
+    scheduled: bool = False
+    closed: bool = False
+    timer: Optional[asyncio.TimerHandle] = field(default=None, repr=False)
+
+
+class ProgressBridge:
+    """Thread'lerden gelen ilerleme olaylarını birleştirip event loop'ta `apply(download_id, olay)` çağırır"""
+
+    def __init__(self, apply: ProgressApply, max_rate: float = 4.0, history: int = 32):
+        self.apply = apply
+        self.interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.history = history
+        self.received = 0
+        self.delivered = 0
+        self._channels: Dict[str, _Channel] = {}
+
+    def hook(self, download_id: str) -> Callable[[Dict], None]:
+        """yt-dlp `progress_hooks` için; event loop'ta (indirme başlarken) çağrılmalı"""
+        self._channels[download_id] = _Channel(asyncio.get_running_loop(), deque(maxlen=self.history))
+
+        def progress_hook(d: Dict) -> None:
+            self.publish(download_id, {key: d[key] for key in PROGRESS_FIELDS if key in d})
+
+        return progress_hook
+
+    def publish(self, download_id: str, event: Dict, force: bool = False) -> None:
+        """Her thread'den çağrılabilir; teslimi event loop'a bırakır"""
+        channel = self._channels.get(download_id)
+        if channel is None or channel.closed:
+            return
+        event['at'] = time.time()
+        channel.recent.append(event)
+        channel.latest = event
+        channel.seq += 1
+        self.received += 1
+        force = force or event.get('status') in IMMEDIATE_STATUSES
+        if channel.scheduled and not force:
+            return  # Bekleyen teslim en güncel olayı alır
+        channel.scheduled = True
+        try:
+            channel.loop.call_soon_threadsafe(self._schedule, download_id, force)
+        except RuntimeError:
+            pass  # Loop kapandı
+
+    def latest(self, download_id: str) -> Optional[Dict]:
+        """Son olay (kilitsiz; olay sözlükleri yazıldıktan sonra değişmez)"""
+        channel = self._channels.get(download_id)
+        return channel.latest if channel else None
+
+    def recent(self, download_id: str) -> List[Dict]:
+        """Halka tampondaki son olaylar (eskiden yeniye)"""
+        channel = self._channels.get(download_id)
+        return list(channel.recent) if channel else []
+
+    def close(self, download_id: str) -> None:
+        """Bekleyen son olayı hemen uygula ve kanalı kapat (event loop'ta, indirme bittiğinde)
+
+        Böylece geç gelen bir ilerleme olayı tamamlanma durumunun üzerine yazamaz.
+        """
+        channel = self._channels.pop(download_id, None)
+        if channel is None:
+            return
+        if channel.timer:
+            channel.timer.cancel()
+        self._deliver(download_id, channel)
+        channel.closed = True
+
+    def _schedule(self, download_id: str, force: bool) -> None:
+        channel = self._channels.get(download_id)
+        if channel is None:
+            return
+        delay = 0.0 if force else channel.last_delivery + self.interval - time.monotonic()
+        if delay <= 0:
+            if channel.timer:
+                channel.timer.cancel()
+                channel.timer = None
+            self._deliver(download_id, channel)
+        elif channel.timer is None:
+            channel.timer = channel.loop.call_later(delay, self._deliver_later, download_id)
+
+    def _deliver_later(self, download_id: str) -> None:
+        channel = self._channels.get(download_id)
+        if channel is not None:
+            channel.timer = None
+            self._deliver(download_id, channel)
+
+    def _deliver(self, download_id: str, channel: _Channel) -> None:
+        # Önce bayrağı kaldır, sonra oku: arada gelen olay yeni bir teslim planlar (kayıp olmaz)
+        channel.scheduled = False
+        seq, event = channel.seq, channel.latest
+        if event is None or seq == channel.delivered_seq:
+            return
+        channel.delivered_seq = seq
+        channel.last_delivery = time.monotonic()
+        self.delivered += 1
+        try:
+            self.apply(download_id, event)
+        except Exception as e:
+            logger.error(f"Progress apply failed for {download_id}: {e}")
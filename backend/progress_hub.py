@@ -0,0 +1,170 @@
+"""
+İlerleme Yayın Merkezi - /api/ws/progress
+Konu (topic) tabanlı pub/sub: `download:<id>`, `downloads` (kuyruk özeti), `crawl:<job_id>`,
+`image_download:<job_id>`; `download:*` gibi önek aboneliği ve `*` desteklenir.
+
+İstemci mesajları: {"action": "subscribe" | "unsubscribe", "topics": [...]}
+Sunucu mesajları: ilk mesajda {"topic", "state"} (tam durum), sonra {"topic", "delta"} (sadece
+değişen alanlar; silinen alan None). Her bağlantının kendi gönderim kuyruğu vardır ve kuyrukta konu
+başına sadece en son durum tutulur: yavaş istemci ara durumları atlar, diğerlerini bekletmez.
+
+Hiç abone olmamış (eski) istemciler tarama ve toplu görsel durumlarını eskisi gibi ham sözlük
+olarak alır.
+"""
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SEND_TIMEOUT = 10.0  # Bu sürede gönderilemeyen bağlantı kapatılır
+MAX_TOPICS_PER_CLIENT = 1000
+MAX_RETAINED_STATES = 2000  # Abonelikte anında gönderilen son durumlar
+TERMINAL_STATUSES = ('completed', 'failed', 'error', 'stopped', 'removed')
+LEGACY_TOPICS = ('crawl:*', 'image_download:*')
+
+
+def _diff(old: Dict, new: Dict) -> Dict:
+    delta = {key: value for key, value in new.items() if key not in old or old[key] != value}
+    delta.update({key: None for key in old if key not in new})
+    return delta
+
+
+class Subscriber:
+    """Tek WebSocket bağlantısı: abonelikler, konu başına birleştirilmiş gönderim kuyruğu"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.topics: Set[str] = set(LEGACY_TOPICS)
+        self.legacy = True  # İlk subscribe mesajına kadar eski biçim
+        self.pending: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.sent: Dict[str, Dict] = {}  # Konu -> istemcinin bildiği son durum (delta için)
+        self.ready = asyncio.Event()
+        self.coalesced = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def matches(self, topic: str) -> bool:
+        if topic in self.topics or '*' in self.topics:
+            return True
+        prefix = topic.split(':', 1)[0]
+        return f"{prefix}:*" in self.topics
+
+    def offer(self, topic: str, state: Dict) -> None:
+        if topic in self.pending:
+            self.coalesced += 1
+            self.pending.move_to_end(topic)
+        self.pending[topic] = state
+        self.ready.set()
+
+    def message(self, topic: str, state: Dict) -> Optional[Dict]:
+        if self.legacy:
+            return state
+        previous = self.sent.get(topic)
+        if state.get('status') in TERMINAL_STATUSES:
+            self.sent.pop(topic, None)  # Son durum: delta tabanını tutma
+        else:
+            self.sent[topic] = state
+        if previous is None:
+            return {'topic': topic, 'state': state}
+        delta = _diff(previous, state)
+        return {'topic': topic, 'delta': delta} if delta else None
+
+
+class ProgressHub:
+    """Konu tabanlı ilerleme yayını; `publish` engellemez ve event loop'ta çağrılır"""
+
+    def __init__(self):
+        self.subscribers: Set[Subscriber] = set()
+        self.retained: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.published = 0
+
+    async def connect(self, websocket) -> Subscriber:
+        await websocket.accept()
+        subscriber = Subscriber(websocket)
+        subscriber.task = asyncio.create_task(self._sender(subscriber))
+        self.subscribers.add(subscriber)
+        return subscriber
+
+    def disconnect(self, subscriber: Subscriber) -> None:
+        self.subscribers.discard(subscriber)
+        if subscriber.task and subscriber.task is not asyncio.current_task():
+            subscriber.task.cancel()
+
+    def publish(self, topic: str, state: Dict[str, Any]) -> None:
+        """Durumu yayınla; her abonenin kuyruğunda bu konunun önceki durumu varsa üzerine yazılır"""
+        state = dict(state)
+        self.published += 1
+        self.retained[topic] = state
+        self.retained.move_to_end(topic)
+        while len(self.retained) > MAX_RETAINED_STATES:
+            self.retained.popitem(last=False)
+        for subscriber in self.subscribers:
+            if subscriber.matches(topic):
+                subscriber.offer(topic, state)
+
+    async def handle_message(self, subscriber: Subscriber, text: str) -> None:
+        """İstemci komutu: subscribe / unsubscribe"""
+        try:
+            command = json.loads(text)
+            action = command.get('action')
+            topics = [str(topic) for topic in command.get('topics', []) if topic]
+        except (ValueError, AttributeError, TypeError):
+            return
+        if action == 'subscribe':
+            if subscriber.legacy:
+                subscriber.legacy = False
+                subscriber.topics.clear()
+                subscriber.pending.clear()
+            self._subscribe(subscriber, topics)
+        elif action == 'unsubscribe':
+            subscriber.topics.difference_update(topics)
+            for topic in topics:
+                subscriber.pending.pop(topic, None)
+                subscriber.sent.pop(topic, None)
+
+    def _subscribe(self, subscriber: Subscriber, topics: Iterable[str]) -> None:
+        for topic in topics:
+            if len(subscriber.topics) >= MAX_TOPICS_PER_CLIENT:
+                break
+            subscriber.topics.add(topic)
+            # Bilinen son durumu hemen gönder (abonelik anındaki anlık görüntü)
+            if topic.endswith('*'):
+                prefix = topic[:-1]
+                for retained_topic, state in list(self.retained.items()):
+                    if retained_topic.startswith(prefix) and state.get('status') not in TERMINAL_STATUSES:
+                        subscriber.offer(retained_topic, state)
+            elif topic in self.retained:
+                subscriber.offer(topic, self.retained[topic])
+
+    def stats(self) -> Dict:
+        return {
+            'clients': len(self.subscribers),
+            'published': self.published,
+            'retained': len(self.retained),
+            'pending': sum(len(subscriber.pending) for subscriber in self.subscribers),
+            'coalesced': sum(subscriber.coalesced for subscriber in self.subscribers),
+        }
+
+    async def _sender(self, subscriber: Subscriber) -> None:
+        try:
+            while True:
+                await subscriber.ready.wait()
+                subscriber.ready.clear()
+                while subscriber.pending:
+                    topic, state = subscriber.pending.popitem(last=False)
+                    message = subscriber.message(topic, state)
+                    if message is not None:
+                        await asyncio.wait_for(subscriber.websocket.send_json(message), SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Yavaş/kopmuş istemci: sadece bu bağlantı kapanır
+            logger.debug(f"WebSocket sender stopped: {e}")
+            self.disconnect(subscriber)
+            try:
+                await subscriber.websocket.close()
+            except Exception:
+                pass
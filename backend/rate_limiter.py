@@ -0,0 +1,350 @@
+"""
+Host Başına Uyarlanabilir Hız Sınırlayıcı
+Sayfa istekleri, görsel HEAD kontrolleri ve indirmeler aynı sınırlayıcıyı paylaşır. Her host için
+token bucket (istek/sn) + eşzamanlılık penceresi tutulur ve AIMD ile ayarlanır: başarılı yanıtlarda
+toplamsal artış, 429/503, zaman aşımı veya gecikmenin taban değerin çok üstüne çıkmasında yarıya iniş.
+Retry-After ve robots.txt Crawl-delay'e uyulur.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Hashable, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = (429, 503)
+MAX_RETRY_AFTER = 300.0  # Daha uzun Retry-After değerleri bu süreye indirilir
+MAX_BACKOFF = 60.0  # Retry-After'sız 429'da üstel bekleme sınırı
+LATENCY_ALPHA = 0.2  # Gecikme EWMA katsayısı
+LATENCY_FACTOR = 3.0  # EWMA > taban x 3 ise sunucu zorlanıyor: pencereyi daralt
+LATENCY_MIN_SAMPLES = 5
+MAX_IDLE_HOSTS = 1000  # Bu kadar host birikince boştaki eski durumlar silinir
+IDLE_HOST_SECONDS = 600
+
+
+@dataclass
+class HostState:
+    host: str
+    window: float  # Eşzamanlı istek sınırı (kesirli; int(window) kullanılır)
+    rate: float  # Token bucket dolum hızı (istek/sn)
+    max_concurrency: int
+    max_rate: float
+    tokens: float = 1.0
+    refilled_at: float = field(default_factory=time.monotonic)
+    in_flight: int = 0
+    blocked_until: float = 0.0  # Retry-After / geri çekilme bitişi
+    crawl_delay: Optional[float] = None
+    latency: float = 0.0  # EWMA (sn)
+    latency_floor: float = 0.0  # Görülen en düşük gecikme (taban)
+    samples: int = 0
+    last_decrease: float = 0.0
+    consecutive_throttles: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+    requests: int = 0
+    throttled: int = 0
+    timeouts: int = 0
+    waiters: Optional[asyncio.Condition] = None
+
+    @property
+    def capacity(self) -> float:
+        """Bucket kapasitesi: Crawl-delay varsa patlama yok"""
+        return 1.0 if self.crawl_delay else max(1.0, self.window)
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.refilled_at) * self.rate)
+        self.refilled_at = now
+
+
+class RateSlot:
+    """Tek istek için kiralanan yer; yanıt geldiğinde `record()` çağrılır"""
+
+    def __init__(self, state: HostState):
+        self.state = state
+        self.started = time.monotonic()
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+        self.latency = 0.0
+
+    def record(self, status: int, headers=None) -> None:
+        """Yanıt durumu (ve başlıkları); gecikme ilk byte'a kadar ölçülür"""
+        self.status = status
+        self.latency = time.monotonic() - self.started
+        if headers is not None and status in THROTTLE_STATUSES:
+            self.retry_after = parse_retry_after(headers.get('retry-after') or headers.get('Retry-After'))
+
+    def record_timeout(self) -> None:
+        self.status = 0
+        self.latency = time.monotonic() - self.started
+
+    @property
+    def throttled(self) -> bool:
+        return self.status in THROTTLE_STATUSES
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After: saniye veya HTTP tarihi"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return min(float(value), MAX_RETRY_AFTER)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return min(max(0.0, (when - datetime.now(timezone.utc)).total_seconds()), MAX_RETRY_AFTER)
+
+
+class RateLimiter:
+    """Host başına AIMD token bucket + eşzamanlılık penceresi
+
+    Kullanım:
+        async with limiter.slot(url) as slot:
+            async with session.get(url) as response:
+                slot.record(response.status, response.headers)
+
+    Pencere `initial_concurrency`'den başlar; ilk kısıtlamaya kadar her başarılı yanıtta, sonrasında
+    her pencere dolusu başarılı yanıtta 1 artar (`max_concurrency`'ye kadar); hız da aynı şekilde
+    `rate_step` artar. Kısıtlama sinyalinde ikisi de yarıya iner (gecikme başına en fazla bir kez).
+    Zaman aşımı ve bağlantı kopması da kısıtlama sayılır.
+    """
+
+    def __init__(self, initial_concurrency: int = 2, max_concurrency: int = 16,
+                 initial_rate: float = 10.0, max_rate: float = 100.0, min_rate: float = 0.2,
+                 rate_step: float = 1.0, max_retries: int = 2):
+        self.initial_concurrency = max(1, initial_concurrency)
+        self.max_concurrency = max(self.initial_concurrency, max_concurrency)
+        self.initial_rate = initial_rate
+        self.max_rate = max(initial_rate, max_rate)
+        self.min_rate = min_rate
+        self.rate_step = rate_step
+        self.max_retries = max_retries  # Kısıtlanan isteği çağıran en fazla bu kadar tekrar dener
+        self._hosts: Dict[str, HostState] = {}
+        self._host_limits: Dict[str, Dict[Hashable, Dict]] = {}  # host -> sahip (tarama) -> sınırlar
+
+    def set_host_limits(self, host: str, max_concurrency: Optional[int] = None,
+                        crawl_delay: Optional[float] = None, owner: Hashable = None) -> None:
+        """Host için üst sınırlar: tarama başına max_per_host ve robots.txt Crawl-delay
+
+        Sınırlar `owner` (tarama) adına tutulur ve `clear_host_limits(owner)` ile kalkar;
+        aynı host'u tarayan birden fazla sahip varsa en kısıtlayıcı değerler uygulanır.
+        """
+        limits = self._host_limits.setdefault(host, {}).setdefault(owner, {})
+        if max_concurrency:
+            limits['max_concurrency'] = max(1, max_concurrency)
+        if crawl_delay:
+            limits['crawl_delay'] = crawl_delay
+        state = self._hosts.get(host)
+        if state is not None:
+            self._apply_limits(state, self._limits(host))
+
+    def clear_host_limits(self, owner: Hashable) -> None:
+        """`owner` adına konan tüm host sınırlarını kaldır (tarama bitince)"""
+        for host, owners in list(self._host_limits.items()):
+            if owners.pop(owner, None) is None:
+                continue
+            if not owners:
+                del self._host_limits[host]
+            state = self._hosts.get(host)
+            if state is not None:
+                self._apply_limits(state, self._limits(host))
+
+    def crawl_delay(self, url: str, owner: Hashable = None) -> Optional[float]:
+        """Host'un geçerli Crawl-delay'i; `owner` verilirse sadece o sahibin koyduğu değer"""
+        host = _host(url)
+        if owner is not None:
+            return self._host_limits.get(host, {}).get(owner, {}).get('crawl_delay')
+        return self._limits(host).get('crawl_delay')
+
+    def _limits(self, host: str) -> Dict:
+        """Sahiplerin sınırlarının birleşimi: en düşük eşzamanlılık, en uzun Crawl-delay"""
+        merged: Dict = {}
+        for limits in self._host_limits.get(host, {}).values():
+            if 'max_concurrency' in limits:
+                merged['max_concurrency'] = min(merged.get('max_concurrency', limits['max_concurrency']),
+                                                limits['max_concurrency'])
+            if 'crawl_delay' in limits:
+                merged['crawl_delay'] = max(merged.get('crawl_delay', 0.0), limits['crawl_delay'])
+        return merged
+
+    def should_retry(self, slot: RateSlot, attempt: int) -> bool:
+        """Kısıtlanan istek tekrar denenmeli mi (bekleme bir sonraki slot'ta yapılır)"""
+        return slot.throttled and attempt < self.max_retries
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[RateSlot]:
+        state = await self._acquire(_host(url))
+        slot = RateSlot(state)
+        try:
+            yield slot
+        except (asyncio.TimeoutError, aiohttp.ServerDisconnectedError):
+            if slot.status is None:
+                slot.record_timeout()
+            raise
+        finally:
+            await self._release(slot)
+
+    def stats(self) -> Dict:
+        return {
+            'hosts': len(self._hosts),
+            'max_concurrency': self.max_concurrency,
+            'max_rate': self.max_rate,
+            'busiest': [
+                {
+                    'host': state.host,
+                    'window': round(state.window, 2),
+                    'rate': round(state.rate, 2),
+                    'in_flight': state.in_flight,
+                    'latency_ms': round(state.latency * 1000, 1),
+                    'blocked_for': round(max(0.0, state.blocked_until - time.monotonic()), 1),
+                    'crawl_delay': state.crawl_delay,
+                    'requests': state.requests,
+                    'throttled': state.throttled,
+                    'timeouts': state.timeouts,
+                }
+                for state in sorted(self._hosts.values(), key=lambda item: -item.requests)[:20]
+            ]
+        }
+
+    def _state(self, host: str) -> HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            if len(self._hosts) >= MAX_IDLE_HOSTS:
+                self._prune()
+            state = HostState(
+                host=host,
+                window=float(self.initial_concurrency),
+                rate=self.initial_rate,
+                max_concurrency=self.max_concurrency,
+                max_rate=self.max_rate,
+                waiters=asyncio.Condition()
+            )
+            self._apply_limits(state, self._limits(host))
+            self._hosts[host] = state
+        return state
+
+    def _apply_limits(self, state: HostState, limits: Dict) -> None:
+        state.max_concurrency = limits.get('max_concurrency', self.max_concurrency)
+        state.crawl_delay = limits.get('crawl_delay')
+        state.max_rate = 1.0 / state.crawl_delay if state.crawl_delay else self.max_rate
+        if state.crawl_delay:
+            state.max_concurrency = 1
+        state.window = min(state.window, state.max_concurrency)
+        state.rate = min(state.rate, state.max_rate)
+
+    def _prune(self) -> None:
+        cutoff = time.monotonic() - IDLE_HOST_SECONDS
+        for host, state in list(self._hosts.items()):
+            if state.in_flight == 0 and state.last_used < cutoff and state.blocked_until < time.monotonic():
+                del self._hosts[host]
+
+    async def _acquire(self, host: str) -> HostState:
+        state = self._state(host)
+        async with state.waiters:
+            while True:
+                now = time.monotonic()
+                state.refill(now)
+                wait = state.blocked_until - now
+                if wait <= 0 and state.in_flight < int(state.window):
+                    if state.tokens >= 1:
+                        state.tokens -= 1
+                        state.in_flight += 1
+                        state.requests += 1
+                        state.last_used = now
+                        return state
+                    wait = (1 - state.tokens) / state.rate
+                if wait > 0:
+                    try:
+                        await asyncio.wait_for(state.waiters.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    # Pencere dolu: bir istek bitene kadar bekle
+                    await state.waiters.wait()
+
+    async def _release(self, slot: RateSlot) -> None:
+        state = slot.state
+        async with state.waiters:
+            state.in_flight -= 1
+            state.last_used = time.monotonic()
+            if slot.status is not None:
+                self._adjust(state, slot)
+            state.waiters.notify_all()
+
+    def _adjust(self, state: HostState, slot: RateSlot) -> None:
+        now = time.monotonic()
+        if slot.throttled or slot.status == 0:
+            if slot.throttled:
+                state.throttled += 1
+                state.consecutive_throttles += 1
+                backoff = slot.retry_after
+                if backoff is None and slot.status == 429:
+                    backoff = min(MAX_BACKOFF, 2.0 ** (state.consecutive_throttles - 1))
+                # Retry-After'sız tekil 503'ler (CDN hıçkırıkları) host'u durdurmaz, sadece pencereyi daraltır
+                if backoff is not None:
+                    state.blocked_until = max(state.blocked_until, now + backoff)
+            else:
+                state.timeouts += 1
+            self._decrease(state, now, f"HTTP {slot.status}" if slot.status else "timeout")
+            return
+
+        state.consecutive_throttles = 0
+        latency = slot.latency
+        state.samples += 1
+        state.latency = latency if state.samples == 1 else (
+            LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * state.latency
+        )
+        state.latency_floor = latency if state.samples == 1 else min(state.latency_floor, latency)
+        if (state.samples >= LATENCY_MIN_SAMPLES and state.latency_floor > 0
+                and state.latency > LATENCY_FACTOR * state.latency_floor):
+            self._decrease(state, now, f"latency {state.latency * 1000:.0f} ms")
+            # Taban yavaşça yukarı kayar: kalıcı olarak yavaşlayan sunucu sürekli cezalandırılmaz
+            state.latency_floor *= 1.1
+            return
+
+        # Sadece gerçekten sınıra dayanan pencere/hız büyütülür (kullanılmayan pencere şişmez)
+        window_limited = state.in_flight + 1 >= int(state.window)
+        state.refill(now)
+        rate_limited = state.tokens < 1
+        if not state.last_decrease:
+            # Yavaş başlangıç (ilk kısıtlamaya kadar): her başarılı yanıtta +1 eşzamanlılık;
+            # hız, pencerenin ulaşabileceği hızın iki katının altında kalmaz (bağlayıcı olmaz)
+            if window_limited:
+                state.window = min(state.max_concurrency, state.window + 1.0)
+            state.rate = min(state.max_rate, max(state.rate + self.rate_step, 2 * self._achievable(state)))
+            return
+        # Toplamsal artış: pencere dolusu başarılı yanıtta +1 eşzamanlılık, +rate_step istek/sn
+        if window_limited:
+            state.window = min(state.max_concurrency, state.window + 1.0 / state.window)
+        if rate_limited:
+            state.rate = min(state.max_rate, state.rate + self.rate_step / state.window)
+
+    @staticmethod
+    def _achievable(state: HostState) -> float:
+        """Mevcut pencere ve gecikmeyle ulaşılabilecek istek/sn"""
+        return state.window / max(state.latency, 0.001)
+
+    def _decrease(self, state: HostState, now: float, reason: str) -> None:
+        # Aynı anda dönen kısıtlama yanıtları pencereyi tek seferde bir kez daraltır
+        if now - state.last_decrease < max(state.latency, 0.5):
+            return
+        state.last_decrease = now
+        # Hız, tavan değerin değil gerçekte ulaşılan hızın yarısına iner
+        state.rate = max(self.min_rate, min(state.rate, self._achievable(state)) / 2)
+        state.window = max(1.0, state.window / 2)
+        state.tokens = min(state.tokens, 1.0)
+        logger.info(f"Rate limit {state.host}: {reason}, window {state.window:.1f}, {state.rate:.1f} req/s")
+
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc
@@ -0,0 +1,366 @@
+"""
+Rapor Deposu - Sayfa ve medya başına MongoDB koleksiyonları
+Tarama sırasında öğeler toplu (insert_many) yazılır; db.reports sadece hafif başlık dokümanını tutar.
+Bellek kullanımı parti boyutuyla sınırlıdır ve çökme durumunda yazılmış partiler kalır.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
+
+from incremental import PAGE_ITEM_FIELDS, PreviousCrawl, issue_key
+
+logger = logging.getLogger(__name__)
+
+REPORT_KINDS = ('pages', 'images', 'videos', 'youtube_videos', 'texts', 'issues')
+REPORT_COLLECTIONS = {
+    'pages': 'report_pages',
+    'images': 'report_images',
+    'videos': 'report_videos',
+    'youtube_videos': 'report_youtube',
+    'texts': 'report_texts',
+    'issues': 'report_issues',
+}
+# Okurken dışarı verilmeyen iç alanlar
+ITEM_PROJECTION = {'_id': 0, 'report_id': 0}
+
+# Özet için önceden sayılan kırılımlar: tür -> alan
+BREAKDOWN_FIELDS = {
+    'videos': ('type',),
+    'youtube_videos': ('type',),
+    'texts': ('type',),
+    'issues': ('severity', 'issue_type'),
+}
+
+# Sorgu API'sinde filtrelenebilen alanlar (her biri report_id + alan + _id ile indekslenir)
+FILTER_FIELDS = {
+    'pages': ('url',),
+    'images': ('page_url',),
+    'videos': ('page_url', 'type'),
+    'youtube_videos': ('page_url',),
+    'texts': ('page_url', 'type'),
+    'issues': ('source_url', 'severity', 'issue_type'),
+}
+MAX_PAGE_SIZE = 1000
+
+# URL başına tekil türler: dağıtık worker'lar aynı öğeyi yazarsa unique indeks ikinciyi reddeder
+UNIQUE_URL_KINDS = ('pages', 'images', 'videos', 'youtube_videos')
+DUPLICATE_KEY_ERROR = 11000
+
+# Eski rapor taşıma: sahiplik bu süreden eskiyse (süreç çöktü) başka istek devralır
+MIGRATION_STALE_SECONDS = 300
+MIGRATION_WAIT_SECONDS = 30
+
+
+class ReportCounters:
+    """Tür başına sayaçlar ve kırılımlar; özet uç noktası listeleri saymaz"""
+
+    def __init__(self):
+        self.counts: Dict[str, int] = {kind: 0 for kind in REPORT_KINDS}
+        self.breakdown: Dict[str, Dict[str, int]] = {}
+
+    def add(self, kind: str, doc: Dict) -> None:
+        self.counts[kind] += 1
+        for field_name in BREAKDOWN_FIELDS.get(kind, ()):
+            bucket = self.breakdown.setdefault(f"{kind}_by_{field_name}", {})
+            value = str(doc.get(field_name) or 'unknown')
+            bucket[value] = bucket.get(value, 0) + 1
+
+
+class MemoryReportSink:
+    """Öğeleri bellekte listelerde tutar (CLI, benchmark ve testler için varsayılan)"""
+
+    def __init__(self):
+        self.items: Dict[str, List[Dict]] = {kind: [] for kind in REPORT_KINDS}
+
+    def add(self, kind: str, doc: Dict) -> None:
+        self.items[kind].append(doc)
+
+    async def maybe_flush(self) -> None:
+        pass
+
+    async def flush(self) -> None:
+        pass
+
+
+class MongoReportWriter:
+    """Öğeleri tür başına tamponlayıp parti dolunca insert_many ile yazar"""
+
+    def __init__(self, db, report_id: str, batch_size: int = 500):
+        self.db = db
+        self.report_id = report_id
+        self.batch_size = batch_size
+        self._buffers: Dict[str, List[Dict]] = {kind: [] for kind in REPORT_KINDS}
+        self.written: Dict[str, int] = {kind: 0 for kind in REPORT_KINDS}
+
+    def add(self, kind: str, doc: Dict) -> None:
+        self._buffers[kind].append({**doc, 'report_id': self.report_id})
+
+    async def maybe_flush(self) -> None:
+        """Dolan tamponları yaz (her sayfadan sonra çağrılır)"""
+        for kind, buffer in self._buffers.items():
+            if len(buffer) >= self.batch_size:
+                await self._write(kind)
+
+    async def flush(self) -> None:
+        """Tüm tamponları yaz (tarama sonu / hata)"""
+        for kind in REPORT_KINDS:
+            if self._buffers[kind]:
+                await self._write(kind)
+
+    async def _write(self, kind: str) -> None:
+        # Tampon await'ten önce değiştirilir: eşzamanlı worker'lar aynı partiyi iki kez yazamaz
+        batch, self._buffers[kind] = self._buffers[kind], []
+        try:
+            await self.db[REPORT_COLLECTIONS[kind]].insert_many(batch, ordered=False)
+            self.written[kind] += len(batch)
+        except BulkWriteError as e:
+            # ordered=False: tekrar eden öğeler dışındakiler yazılmıştır
+            self.written[kind] += e.details.get('nInserted', 0)
+            errors = e.details.get('writeErrors', [])
+            other = [error for error in errors if error.get('code') != DUPLICATE_KEY_ERROR]
+            if other:
+                logger.error(f"Report batch write failed ({kind}, {len(other)} docs): {other[0].get('errmsg')}")
+            else:
+                logger.debug(f"Skipped {len(errors)} duplicate {kind} items")
+        except Exception as e:
+            logger.error(f"Report batch write failed ({kind}, {len(batch)} docs): {e}")
+
+
+class MongoPreviousCrawl(PreviousCrawl):
+    """Koleksiyonlara yazılmış önceki rapor; sayfa öğeleri gerektiğinde sorgulanır"""
+
+    def __init__(self, db, header: Dict, page_hashes: Dict[str, str]):
+        self.db = db
+        self.report_id = str(header.get('id') or header.get('_id') or '')
+        self.end_time = header.get('end_time', '')
+        self.page_hashes = page_hashes
+
+    @classmethod
+    async def load(cls, db, header: Dict) -> 'MongoPreviousCrawl':
+        report_id = str(header.get('id') or header.get('_id'))
+        page_hashes: Dict[str, str] = {}
+        cursor = db[REPORT_COLLECTIONS['pages']].find({'report_id': report_id}, {'_id': 0, 'url': 1, 'content_hash': 1})
+        async for page in cursor:
+            page_hashes[page['url']] = page.get('content_hash', '')
+        return cls(db, header, page_hashes)
+
+    async def page_items(self, url: str) -> Dict[str, List[Dict]]:
+        items: Dict[str, List[Dict]] = {}
+        for kind, url_field in PAGE_ITEM_FIELDS.items():
+            cursor = self.db[REPORT_COLLECTIONS[kind]].find({'report_id': self.report_id, url_field: url}, ITEM_PROJECTION)
+            items[kind] = await cursor.to_list(length=None)
+        return items
+
+    async def links_for(self, url: str) -> List[str]:
+        page = await self.db[REPORT_COLLECTIONS['pages']].find_one(
+            {'report_id': self.report_id, 'url': url}, {'_id': 0, 'links': 1}
+        )
+        return page.get('links', []) if page else []
+
+    async def item_keys(self) -> Dict[str, Set]:
+        keys: Dict[str, Set] = {'images': set(), 'videos': set(), 'issues': set()}
+        query = {'report_id': self.report_id}
+        async for item in self.db[REPORT_COLLECTIONS['images']].find(query, {'_id': 0, 'url': 1}):
+            keys['images'].add(item['url'])
+        for kind in ('videos', 'youtube_videos'):
+            async for item in self.db[REPORT_COLLECTIONS[kind]].find(query, {'_id': 0, 'url': 1}):
+                keys['videos'].add(item['url'])
+        async for issue in self.db[REPORT_COLLECTIONS['issues']].find(query, ITEM_PROJECTION):
+            keys['issues'].add(issue_key(issue))
+        return keys
+
+
+async def ensure_report_indexes(db) -> None:
+    """Rapor koleksiyonlarının indekslerini oluştur (uygulama başlangıcında)
+
+    Her filtre alanı için (report_id, alan, _id): filtreli sorgular da _id sırasıyla
+    cursor tabanlı sayfalanır.
+    """
+    for kind, fields in FILTER_FIELDS.items():
+        collection = db[REPORT_COLLECTIONS[kind]]
+        await collection.create_index([('report_id', 1), ('_id', 1)])
+        for field_name in fields:
+            await collection.create_index([('report_id', 1), (field_name, 1), ('_id', 1)])
+    for kind in UNIQUE_URL_KINDS:
+        await db[REPORT_COLLECTIONS[kind]].create_index([('report_id', 1), ('url', 1)], unique=True)
+    await db.reports.create_index([('domain', 1), ('created_at', -1)])
+    await db.reports.create_index([('status', 1), ('created_at', -1)])
+
+
+def finished_report_header(report, stopped: bool = False) -> Dict:
+    """Biten taramanın (CrawlReport) başlık alanları
+
+    Durdurulan tarama kısmidir: 'stopped' işaretlenir ve artımlı taramada taban olarak kullanılmaz.
+    """
+    header = {
+        'end_time': report.end_time,
+        'total_urls': report.total_urls,
+        'counts': report.counts,
+        'breakdown': report.breakdown,
+        'status': 'stopped' if stopped else 'completed'
+    }
+    if report.delta:
+        header['delta'] = report.delta
+    if report.discovery:
+        header['discovery'] = report.discovery
+    return header
+
+
+async def recount_report(db, report_id: str) -> Tuple[Dict[str, int], Dict[str, Dict[str, int]]]:
+    """Sayaçları koleksiyonlardan yeniden hesapla (birden çok yazarlı dağıtık taramalar için)"""
+    counts: Dict[str, int] = {}
+    breakdown: Dict[str, Dict[str, int]] = {}
+    for kind in REPORT_KINDS:
+        collection = db[REPORT_COLLECTIONS[kind]]
+        counts[kind] = await collection.count_documents({'report_id': report_id})
+        for field_name in BREAKDOWN_FIELDS.get(kind, ()):
+            bucket = breakdown.setdefault(f"{kind}_by_{field_name}", {})
+            pipeline = [{'$match': {'report_id': report_id}}, {'$group': {'_id': f'${field_name}', 'n': {'$sum': 1}}}]
+            async for row in collection.aggregate(pipeline):
+                value = str(row['_id'] or 'unknown')
+                bucket[value] = bucket.get(value, 0) + row['n']
+    return counts, breakdown
+
+
+def _legacy_query(report_id) -> Dict:
+    return {'_id': report_id, '$or': [{kind: {'$exists': True}} for kind in REPORT_KINDS]}
+
+
+def _legacy_header(report: Dict, counters: ReportCounters) -> Dict:
+    header = {key: value for key, value in report.items() if key not in REPORT_KINDS and key != 'migrating_since'}
+    header.update(counts=counters.counts, breakdown=counters.breakdown, status='completed')
+    return header
+
+
+async def migrate_legacy_report(db, report: Dict) -> Dict:
+    """Eski tek doküman raporu koleksiyonlara taşı ve başlığa dönüştür
+
+    Taşıma `migrating_since` ile atomik olarak sahiplenilir; aynı rapor için eşzamanlı istekler
+    sahibin bitirmesini bekler. Yarım kalmış (çökmüş) taşımanın öğeleri silinip baştan yazılır.
+    """
+    report_id = str(report['_id'])
+    now = time.time()
+    claimed = await db.reports.find_one_and_update(
+        {**_legacy_query(report['_id']),
+         '$and': [{'$or': [{'migrating_since': {'$exists': False}},
+                           {'migrating_since': {'$lt': now - MIGRATION_STALE_SECONDS}}]}]},
+        {'$set': {'migrating_since': now}}
+    )
+    if claimed is None:
+        return await _wait_for_migration(db, report)
+
+    for kind in REPORT_KINDS:
+        await db[REPORT_COLLECTIONS[kind]].delete_many({'report_id': report_id})
+    writer = MongoReportWriter(db, report_id)
+    counters = ReportCounters()
+    for kind in REPORT_KINDS:
+        for item in claimed.get(kind, []):
+            writer.add(kind, item)
+            counters.add(kind, item)
+    await writer.flush()
+    await db.reports.update_one(
+        {'_id': claimed['_id']},
+        {
+            '$set': {'counts': counters.counts, 'breakdown': counters.breakdown, 'status': 'completed'},
+            '$unset': {**{kind: '' for kind in REPORT_KINDS}, 'migrating_since': ''}
+        }
+    )
+    logger.info(f"Migrated legacy report {report_id} into collections")
+    return _legacy_header(claimed, counters)
+
+
+async def _wait_for_migration(db, report: Dict) -> Dict:
+    """Başka isteğin yürüttüğü taşımanın bitmesini bekle"""
+    deadline = time.monotonic() + MIGRATION_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.2)
+        current = await db.reports.find_one({'_id': report['_id']})
+        if current is None:
+            break
+        if not any(kind in current for kind in REPORT_KINDS):
+            return current
+    # Taşıma sürüyor: başlığı eski dokümandan hesapla (yazmadan)
+    counters = ReportCounters()
+    for kind in REPORT_KINDS:
+        for item in report.get(kind, []):
+            counters.add(kind, item)
+    return _legacy_header(report, counters)
+
+
+async def find_report_header(db, report_id: Optional[str] = None, domain: Optional[str] = None,
+                             completed_only: bool = False) -> Optional[Dict]:
+    """Rapor başlığını bul (id, alan adının son raporu veya en son rapor); eski format taşınır
+
+    `completed_only`: durdurulmuş (kısmi) raporlar atlanır.
+    """
+    if report_id:
+        header = await db.reports.find_one({'_id': report_id})
+    else:
+        query = {'status': {'$nin': ['running', 'error', 'stopped'] if completed_only else ['running', 'error']}}
+        if domain:
+            query['domain'] = domain
+        header = await db.reports.find_one(query, sort=[('created_at', -1)])
+    if not header:
+        return None
+    if any(kind in header for kind in REPORT_KINDS):
+        header = await migrate_legacy_report(db, header)
+    header['id'] = str(header.pop('_id'))
+    return header
+
+
+async def load_previous_crawl(db, domain: str) -> Optional[PreviousCrawl]:
+    """Alan adının tamamlanmış son raporu"""
+    header = await find_report_header(db, domain=domain, completed_only=True)
+    if not header:
+        return None
+    return await MongoPreviousCrawl.load(db, header)
+
+
+async def query_report_items(db, report: Dict, kind: str, filters: Optional[Dict] = None,
+                             cursor: Optional[str] = None, limit: int = 100,
+                             skip: int = 0) -> Tuple[List[Dict], Optional[str]]:
+    """Filtreli, _id sıralı sayfa; (öğeler, sonraki cursor). Geçersiz cursor ValueError verir"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = {'report_id': report['id']}
+    query.update({key: value for key, value in (filters or {}).items() if value})
+    if cursor:
+        try:
+            query['_id'] = {'$gt': ObjectId(cursor)}
+        except (InvalidId, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+    find = db[REPORT_COLLECTIONS[kind]].find(query, {'report_id': 0}).sort('_id', 1)
+    if skip and not cursor:
+        find = find.skip(skip)
+    docs = await find.limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = str(docs[limit - 1]['_id']) if len(docs) > limit else None
+    items = docs[:limit]
+    for item in items:
+        item.pop('_id', None)
+    return items, next_cursor
+
+
+async def count_report_items(db, report: Dict, kind: str, filters: Optional[Dict] = None) -> int:
+    """Filtresiz sayılar ve tek kırılım filtresi başlıktan; diğerleri indeksli count_documents
+
+    Başlık sayaçları tarama sonunda yazılır; tarama sürerken sayılar koleksiyondan gelir.
+    """
+    active = {key: value for key, value in (filters or {}).items() if value}
+    if not active and kind in report.get('counts', {}):
+        return report['counts'][kind]
+    if len(active) == 1:
+        field_name, value = next(iter(active.items()))
+        bucket = report.get('breakdown', {}).get(f"{kind}_by_{field_name}")
+        if bucket is not None:
+            return bucket.get(str(value), 0)
+    return await db[REPORT_COLLECTIONS[kind]].count_documents({'report_id': report['id'], **active})
+
+
+async def report_counts(db, report: Dict) -> Dict[str, int]:
+    """Tür başına öğe sayıları (başlıkta yoksa koleksiyonlardan)"""
+    return {kind: await count_report_items(db, report, kind) for kind in REPORT_KINDS}
@@ -0,0 +1,156 @@
+async (options = {}) => {
+    // Sonsuz kaydırmalı sayfalarda video kartlarını sabit beklemeler olmadan topla.
+    // Sayfanın altına gelene kadar ekran ekran kaydırılır (bekleme yok, sadece bir kare);
+    // altta yeni içerik MutationObserver ile beklenir; süren fetch/XHR istekleri varken beklemeye devam edilir,
+    // ağ boştayken uyarlanabilir pencerede büyüme yoksa durulur.
+    // Aşağıdaki yer tutucuya Python tarafında page_extraction.js gömülür.
+    const extract = __PAGE_EXTRACTION__;
+    const maxRounds = options.maxRounds ?? 200;
+    const maxDurationMs = options.maxDurationMs ?? 20000;
+    const minIdleMs = options.minIdleMs ?? 400;
+    const maxIdleMs = options.maxIdleMs ?? 3000;
+    const quietGapMs = options.quietGapMs ?? 80;
+    const quietMaxMs = options.quietMaxMs ?? 600;
+    let idleWindowMs = options.initialIdleMs ?? 2000;
+    let slowestLoadMs = 0;
+
+    const scroller = document.scrollingElement || document.documentElement;
+    const started = performance.now();
+    const videos = new Map();
+    const collect = () => {
+        for (const item of extract({ videosOnly: true }).videos) {
+            if (item.url && !videos.has(item.url)) videos.set(item.url, item);
+        }
+    };
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+    const nextFrame = () => Promise.race([
+        new Promise((resolve) => requestAnimationFrame(() => requestAnimationFrame(resolve))),
+        sleep(100)
+    ]);
+    const atBottom = () => window.scrollY + window.innerHeight >= scroller.scrollHeight - 2;
+
+    // Eklenen elemanlar, son DOM/ağ etkinliği ve süren istekler
+    let addedElements = 0;
+    let lastMutationAt = 0;
+    let lastResourceAt = 0;
+    let inflight = 0;
+    let wake = null;
+    const mutationObserver = new MutationObserver((records) => {
+        for (const record of records) {
+            for (const node of record.addedNodes) {
+                if (node.nodeType === 1) addedElements++;
+            }
+        }
+        lastMutationAt = performance.now();
+        if (wake) wake();
+    });
+    mutationObserver.observe(document.body || document.documentElement, { childList: true, subtree: true });
+    const requestDone = () => {
+        inflight = Math.max(0, inflight - 1);
+        lastResourceAt = performance.now();
+    };
+    const originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = function (...args) {
+            inflight++;
+            return originalFetch.apply(this, args).finally(requestDone);
+        };
+    }
+    const xhrPrototype = typeof XMLHttpRequest !== 'undefined' ? XMLHttpRequest.prototype : null;
+    const originalSend = xhrPrototype ? xhrPrototype.send : null;
+    if (xhrPrototype) {
+        xhrPrototype.send = function (...args) {
+            inflight++;
+            this.addEventListener('loadend', requestDone, { once: true });
+            return originalSend.apply(this, args);
+        };
+    }
+    let resourceObserver = null;
+    if (typeof PerformanceObserver !== 'undefined') {
+        try {
+            resourceObserver = new PerformanceObserver(() => { lastResourceAt = performance.now(); });
+            resourceObserver.observe({ type: 'resource' });
+        } catch (e) {
+            resourceObserver = null;
+        }
+    }
+
+    // DOM sakinleşene kadar bekle (toplu eklemeler tamamlansın), en fazla quietMaxMs
+    const quiet = async () => {
+        const deadline = performance.now() + quietMaxMs;
+        while (performance.now() < deadline) {
+            const since = performance.now() - lastMutationAt;
+            if (since >= quietGapMs) return;
+            await sleep(quietGapMs - since);
+        }
+    };
+    // Büyüme (yeni eleman veya yükseklik artışı) olana kadar ya da süre dolana kadar bekle
+    const waitForGrowth = (grew, ms) => new Promise((resolve) => {
+        if (grew()) return resolve(true);
+        const timer = setTimeout(() => { wake = null; resolve(false); }, ms);
+        wake = () => {
+            if (grew()) {
+                clearTimeout(timer);
+                wake = null;
+                resolve(true);
+            }
+        };
+    });
+
+    let rounds = 0;
+    let stopReason = 'max_rounds';
+    collect();
+    try {
+        while (rounds < maxRounds) {
+            if (performance.now() - started > maxDurationMs) {
+                stopReason = 'timeout';
+                break;
+            }
+            rounds++;
+            if (!atBottom()) {
+                window.scrollBy(0, Math.floor(window.innerHeight * 0.9));
+                await nextFrame();
+                await quiet();
+                collect();
+                continue;
+            }
+
+            const heightBefore = scroller.scrollHeight;
+            const addedBefore = addedElements;
+            const grew = () => addedElements > addedBefore || scroller.scrollHeight > heightBefore;
+            const waitStarted = performance.now();
+            let found = await waitForGrowth(grew, idleWindowMs);
+            // İstek sürüyor ya da yeni bitti: ağ boşalana kadar bekle (sürekli istek atan sayfalarda en fazla 3 x maxIdleMs)
+            while (!found && (inflight > 0 || lastResourceAt > waitStarted)
+                    && performance.now() - waitStarted < maxIdleMs * 3
+                    && performance.now() - started < maxDurationMs) {
+                const checkedAt = performance.now();
+                found = await waitForGrowth(grew, inflight > 0 ? minIdleMs : idleWindowMs);
+                if (!found && inflight === 0 && lastResourceAt <= checkedAt) break;
+            }
+            if (!found) {
+                stopReason = 'idle';
+                break;
+            }
+            // Pencere her büyümede %25 daralır ama en yavaş yüklemenin iki katının altına inmez
+            slowestLoadMs = Math.max(slowestLoadMs, performance.now() - waitStarted);
+            idleWindowMs = Math.min(maxIdleMs, Math.max(minIdleMs, Math.round(slowestLoadMs * 2), Math.round(idleWindowMs * 0.75)));
+            await quiet();
+            collect();
+        }
+    } finally {
+        mutationObserver.disconnect();
+        if (resourceObserver) resourceObserver.disconnect();
+        if (originalFetch) window.fetch = originalFetch;
+        if (xhrPrototype) xhrPrototype.send = originalSend;
+        window.scrollTo(0, 0);
+    }
+
+    return {
+        videos: Array.from(videos.values()),
+        rounds,
+        elapsedMs: Math.round(performance.now() - started),
+        idleWindowMs,
+        stopReason
+    };
+}
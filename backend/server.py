@@ -7,22 +7,36 @@ import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Awaitable, Callable
 import uuid
+import hashlib
 from datetime import datetime, timezone
 import asyncio
-import json
 import csv
 import io
 import aiohttp
 import aiofiles
-import zipfile
 import shutil
 from collections import deque
 import threading
+from urllib.parse import urlparse
 
 # Gelişmiş crawler
-from advanced_crawler import AdvancedCrawler, YouTubeDownloaderWithProgress, report_to_dict
+from advanced_crawler import AdvancedCrawler, YouTubeDownloaderWithProgress
+from browser_pool import BrowserPool
+from bulk_downloader import BulkDownloadJob, BulkImageDownloader
+from html_extraction import shutdown_process_pool
+from http_cache import HttpCache
+from media_store import MediaStore
+from progress_bridge import ProgressBridge
+from progress_hub import ProgressHub
+from rate_limiter import RateLimiter
+from state_persistence import StateStore, WriteBehindWriter, open_state_store
+from crawl_jobs import CrawlJob, CrawlJobScheduler
+from report_store import (
+    MongoReportWriter, count_report_items, ensure_report_indexes, find_report_header,
+    finished_report_header, load_previous_crawl, query_report_items, report_counts
+)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -36,14 +50,53 @@ db = client[os.environ.get('DB_NAME', 'website_scanner')]
 DOWNLOADS_DIR = ROOT_DIR / 'downloads'
 DOWNLOADS_DIR.mkdir(exist_ok=True)
 
+# Tekrar taramalar için koşullu HTTP önbelleği (tüm taramalar paylaşır)
+HTTP_CACHE_DIR = Path(os.environ.get("HTTP_CACHE_DIR", str(ROOT_DIR / 'http_cache')))
+http_cache = HttpCache(str(HTTP_CACHE_DIR))
+
+# Rapor öğeleri MongoDB'ye bu boyutta partilerle yazılır
+REPORT_BATCH_SIZE = int(os.environ.get("REPORT_BATCH_SIZE", "500"))
+
+# Aynı anda çalışan tarama işi sayısı
+CRAWL_JOB_WORKERS = int(os.environ.get("CRAWL_JOB_WORKERS", "2"))
+
+# Crawl worker üst sınırı (istek başına)
+CRAWL_MAX_WORKERS = int(os.environ.get("CRAWL_MAX_WORKERS", "16"))
+
+# Uygulama boyunca açık Chromium havuzu; taramalar context alır, tarayıcı başlatmaz
+browser_pool = BrowserPool(
+    size=int(os.environ.get("BROWSER_POOL_SIZE", "1")),
+    max_pages_per_browser=int(os.environ.get("BROWSER_MAX_PAGES", "2000")),
+    max_rss_mb=float(os.environ.get("BROWSER_MAX_RSS_MB", "2048")),
+)
+
+# Host başına uyarlanabilir hız sınırlayıcı: tarama istekleri ve görsel indirmeleri paylaşır
+rate_limiter = RateLimiter(
+    initial_concurrency=int(os.environ.get("RATE_LIMIT_INITIAL_PER_HOST", "2")),
+    max_concurrency=int(os.environ.get("RATE_LIMIT_MAX_PER_HOST", "16")),
+    max_rate=float(os.environ.get("RATE_LIMIT_MAX_RPS", "100")),
+)
+
+# İçerik adresli medya deposu: aynı URL/içerik tekrar indirilmez, DOWNLOADS_DIR'deki adlar hardlink
+MEDIA_STORE_DIR = Path(os.environ.get("MEDIA_STORE_DIR", str(ROOT_DIR / 'media_store')))
+media_store = MediaStore(str(MEDIA_STORE_DIR), str(DOWNLOADS_DIR))
+
+# Toplu görsel indirme (ZIP): eşzamanlı, diske akışlı, tekrar denemeli
+image_downloader = BulkImageDownloader(
+    str(DOWNLOADS_DIR),
+    rate_limiter=rate_limiter,
+    media_store=media_store,
+    concurrency=int(os.environ.get("IMAGE_DOWNLOAD_CONCURRENCY", "16")),
+    retries=int(os.environ.get("IMAGE_DOWNLOAD_RETRIES", "3")),
+)
+
 # App
 app = FastAPI(title="Gelişmiş Web Tarama ve İndirme Aracı")
 api_router = APIRouter(prefix="/api")
 
-# Global state
-crawler_instance: Optional[AdvancedCrawler] = None
+# Global state (taramalar crawl_scheduler'da; burada sadece son tamamlanan raporun başlığı)
 current_report: Optional[dict] = None
-crawl_progress: Dict[str, Any] = {
+IDLE_CRAWL_STATUS: Dict[str, Any] = {
     'status': 'idle', 'crawled': 0, 'discovered': 0,
     'images': 0, 'videos': 0, 'issues': 0, 'message': ''
 }
@@ -53,65 +106,137 @@ logger = logging.getLogger(__name__)
 
 
 # ===== İndirme Sıra Yönetimi (Maks eşzamanlı) =====
-# İndirme durumunu dosyaya kaydet
+# İndirme durumu: varsayılan SQLite (WAL); DOWNLOAD_STATE_BACKEND=json eski tek dosya biçimi
 DOWNLOAD_STATE_FILE = ROOT_DIR / 'download_state.json'
+DOWNLOAD_STATE_DB = Path(os.environ.get("DOWNLOAD_STATE_DB", str(ROOT_DIR / 'download_state.sqlite3')))
 
 class DownloadQueueManager:
     """Video indirme sıra yöneticisi - Maks eşzamanlı indirme, kalıcı durum"""
     
-    def __init__(self, max_concurrent: int = 20):
+    def __init__(self, max_concurrent: int = 20, store: Optional[StateStore] = None,
+                 runner: Optional[Callable[[str, str, str], Awaitable[None]]] = None,
+                 publisher: Optional[Callable[[str, Dict], None]] = None):
         self.max_concurrent = max_concurrent
         self.active_downloads: Dict[str, Dict] = {}  # download_id -> info
         self.queue: deque = deque()  # Bekleyen indirmeler
         self.lock = asyncio.Lock()
+        # Dağıtıcı: slot alan indirmeler _ready'ye konur, max_concurrent worker hemen başlatır (polling yok)
+        self.runner = runner  # runner(download_id, url, format)
+        self._ready: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        # Değişen ilerlemeler WebSocket'e yayınlanır: publisher(konu, durum)
+        self.publisher = publisher
         self.progress_data: Dict[str, Dict] = {}  # download_id -> progress
         self.incomplete_downloads: Dict[str, Dict] = {}  # Yarım kalan indirmeler
+        self.store = store or open_state_store(
+            os.environ.get("DOWNLOAD_STATE_BACKEND", "sqlite"), str(DOWNLOAD_STATE_DB), str(DOWNLOAD_STATE_FILE)
+        )
+        # Sadece değişen kayıtlar yazılır; ilerleme güncellemeleri birleştirilir, yaşam döngüsü geçişleri hemen
+        self._writer = WriteBehindWriter(
+            self.store, self._state_record,
+            interval=int(os.environ.get("DOWNLOAD_STATE_FLUSH_MS", "500")) / 1000
+        )
         self._load_state()
     
     def _load_state(self):
-        """Kayıtlı durumu yükle"""
+        """Kayıtlı durumu yükle (sadece bitmemiş indirmeler okunur)"""
         try:
-            if DOWNLOAD_STATE_FILE.exists():
-                with open(DOWNLOAD_STATE_FILE, 'r') as f:
-                    data = json.load(f)
-                    saved_queue = data.get('queue', [])
-                    self.incomplete_downloads = data.get('incomplete', {})
-                    # Eski aktif indirmeleri yarım kalan olarak işaretle
-                    for did, info in data.get('active', {}).items():
-                        if info.get('status') not in ['completed', 'failed']:
-                            info['status'] = 'interrupted'
-                            self.incomplete_downloads[did] = info
-                    # Kuyruktaki indirmeleri geri yükle
-                    if saved_queue:
-                        self.queue = deque(saved_queue)
-                        for idx, item in enumerate(self.queue):
-                            item['status'] = 'queued'
-                            item['queue_position'] = idx + 1
-                            download_id = item.get('download_id')
-                            if download_id:
-                                self.progress_data[download_id] = {
-                                    'percent': item.get('progress', 0),
-                                    'status': 'queued',
-                                    'queue_position': idx + 1,
-                                    'url': item.get('url', ''),
-                                    'title': item.get('url', '')
-                                }
-                    logger.info(f"Loaded {len(self.incomplete_downloads)} incomplete downloads")
+            data = self.store.load()
+            self.incomplete_downloads = data['incomplete']
+            # Eski aktif indirmeleri yarım kalan olarak işaretle (sıradakiler aşağıda geri yüklenir)
+            for did, info in data['active'].items():
+                if did not in data['queue']:
+                    info['status'] = 'interrupted'
+                    self.incomplete_downloads[did] = info
+                    self._save_state(('active', did), ('incomplete', did))
+            # Kuyruktaki indirmeleri geri yükle
+            self.queue = deque(data['queue'].values())
+            for idx, item in enumerate(self.queue):
+                item['status'] = 'queued'
+                item['queue_position'] = idx + 1
+                download_id = item.get('download_id')
+                if download_id:
+                    self.progress_data[download_id] = {
+                        'percent': item.get('progress', 0),
+                        'status': 'queued',
+                        'queue_position': idx + 1,
+                        'url': item.get('url', ''),
+                        'title': item.get('url', '')
+                    }
+            logger.info(f"Loaded {len(self.incomplete_downloads)} incomplete downloads")
         except Exception as e:
             logger.error(f"Error loading download state: {e}")
     
-    def _save_state(self):
-        """Durumu dosyaya kaydet"""
-        try:
-            data = {
-                'active': {k: v for k, v in self.progress_data.items() if v.get('status') not in ['completed']},
-                'queue': list(self.queue),
-                'incomplete': self.incomplete_downloads
-            }
-            with open(DOWNLOAD_STATE_FILE, 'w') as f:
-                json.dump(data, f, indent=2, default=str)
-        except Exception as e:
-            logger.error(f"Error saving download state: {e}")
+    def _state_record(self, section: str, download_id: str) -> Optional[Dict]:
+        """Yazım anındaki kayıt; None ise depodan silinir"""
+        if section == 'active':
+            return self.progress_data.get(download_id)
+        if section == 'incomplete':
+            return self.incomplete_downloads.get(download_id)
+        for item in list(self.queue):
+            if item.get('download_id') == download_id:
+                return item
+        return None
+
+    def _save_state(self, *keys: tuple, force: bool = True):
+        """Değişen kayıtları kaydet ve yayınla: force=True yaşam döngüsü geçişleri (sıra, başlama, bitiş) için, beklemeden"""
+        self._writer.save(keys, force=force)
+        if self.publisher is None:
+            return
+        for section, download_id in keys:
+            if section == 'active':
+                self.publisher(f"download:{download_id}", self.progress_data.get(download_id) or {'status': 'removed'})
+        if force:
+            self.publisher('downloads', self.get_summary())
+
+    def get_summary(self) -> Dict:
+        """Kuyruk özeti (WebSocket `downloads` konusu)"""
+        return {
+            "active_count": len(self.active_downloads),
+            "queue_count": len(self.queue),
+            "max_concurrent": self.max_concurrent,
+            "incomplete": self.incomplete_downloads
+        }
+
+    def close(self):
+        """Kapanışta bekleyen durumu yaz"""
+        self._writer.close()
+
+    def _dispatch(self, download_info: Dict):
+        """Slot almış indirmeyi bir worker'a ver (event loop'ta, kilit altında çağrılır)"""
+        if self._ready is None:
+            self._ready = asyncio.Queue()
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker(), name=f"download-worker-{index}")
+                for index in range(self.max_concurrent)
+            ]
+        self._ready.put_nowait(download_info)
+
+    async def _worker(self):
+        while True:
+            info = await self._ready.get()
+            download_id = info['download_id']
+            try:
+                if self.runner is None:
+                    raise RuntimeError("download runner is not configured")
+                await self.runner(download_id, info.get('url', ''), info.get('format', 'video'))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Download {download_id} crashed: {e}")
+            finally:
+                self._ready.task_done()
+            # Runner slotu bırakmadan döndüyse (hata) slotu burada bırak
+            if download_id in self.active_downloads:
+                await self.complete_download(download_id, False, {"message": "İndirme başarısız"})
+
+    async def stop(self):
+        """Worker'ları durdur (kapanışta); yarım kalanlar bir sonraki açılışta kuyruktan devam eder"""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
     
     def get_status(self) -> Dict:
         """Kuyruk durumunu döndür - sayfa yenilenince de görünsün"""
@@ -143,8 +268,8 @@ class DownloadQueueManager:
             current.update(progress)
         else:
             self.progress_data[download_id] = progress
-        # Her güncellenmede durumu kaydet
-        self._save_state()
+        # Sık gelen ilerleme güncellemeleri en fazla DOWNLOAD_STATE_FLUSH_MS'de bir yazılır
+        self._save_state(('active', download_id), force=False)
     
     async def can_start_download(self) -> bool:
         """Yeni indirme başlatılabilir mi?"""
@@ -173,6 +298,7 @@ class DownloadQueueManager:
                     'url': download_info.get('url', ''),
                     'title': download_info.get('url', '')  # Başlangıçta URL, sonra title ile güncellenir
                 }
+                self._dispatch(download_info)
             else:
                 download_info['status'] = 'queued'
                 download_info['queue_position'] = len(self.queue) + 1
@@ -184,7 +310,7 @@ class DownloadQueueManager:
                     'url': download_info.get('url', ''),
                     'title': download_info.get('url', '')
                 }
-        self._save_state()
+        self._save_state(('active', download_id), ('queue', download_id))
         return download_id
     
     async def start_download(self, download_id: str):
@@ -194,6 +320,7 @@ class DownloadQueueManager:
                 self.active_downloads[download_id]['status'] = 'downloading'
                 if download_id in self.progress_data:
                     self.progress_data[download_id]['status'] = 'downloading'
+        self._save_state(('active', download_id))
 
     async def prime_queue(self) -> List[Dict]:
         """Kuyruktan boş slotları doldur"""
@@ -211,17 +338,19 @@ class DownloadQueueManager:
                     'title': next_download.get('url', '')
                 }
                 started.append(next_download)
+                self._dispatch(next_download)
 
             for i, item in enumerate(self.queue):
                 item['queue_position'] = i + 1
                 if item.get('download_id') in self.progress_data:
                     self.progress_data[item['download_id']]['queue_position'] = i + 1
 
-        self._save_state()
+            keys = [(section, item['download_id']) for item in started for section in ('active', 'queue')]
+            self._save_state(*keys)
         return started
     
     async def complete_download(self, download_id: str, success: bool = True, result: Dict = None):
-        """İndirmeyi tamamla ve sıradaki başlat"""
+        """İndirmeyi tamamla ve sıradakini hemen bir worker'a ver"""
         async with self.lock:
             download_info = self.active_downloads.get(download_id, {})
             
@@ -248,7 +377,7 @@ class DownloadQueueManager:
                     }
             
             # Durumu kaydet
-            self._save_state()
+            self._save_state(('active', download_id), ('incomplete', download_id))
             
             # Sıradaki indirmeyi başlat
             if self.queue and len(self.active_downloads) < self.max_concurrent:
@@ -266,7 +395,8 @@ class DownloadQueueManager:
                 for i, item in enumerate(self.queue):
                     item['queue_position'] = i + 1
                     self.progress_data[item['download_id']]['queue_position'] = i + 1
-                self._save_state()
+                self._save_state(('active', next_id), ('queue', next_id))
+                self._dispatch(next_download)
                 return next_download
         return None
     
@@ -278,16 +408,16 @@ class DownloadQueueManager:
                 to_remove.append(did)
         for did in to_remove:
             del self.progress_data[did]
-        self._save_state()
+        self._save_state(*(('active', did) for did in to_remove))
     
     def clear_incomplete(self, download_id: str = None):
         """Yarım kalan indirmeyi temizle"""
         if download_id:
-            if download_id in self.incomplete_downloads:
-                del self.incomplete_downloads[download_id]
+            removed = [download_id] if self.incomplete_downloads.pop(download_id, None) is not None else []
         else:
+            removed = list(self.incomplete_downloads)
             self.incomplete_downloads.clear()
-        self._save_state()
+        self._save_state(*(('incomplete', did) for did in removed))
     
     async def resume_download(self, download_id: str) -> Optional[str]:
         """Yarım kalan indirmeyi devam ettir"""
@@ -305,7 +435,7 @@ class DownloadQueueManager:
         
         # Eski incomplete'den sil
         del self.incomplete_downloads[download_id]
-        self._save_state()
+        self._save_state(('incomplete', download_id))
         
         return new_id
 
@@ -315,14 +445,28 @@ download_queue = DownloadQueueManager(max_concurrent=int(os.environ.get("DOWNLOA
 
 
 # Models
+# Varsayılanlar eski davranıştır (her sayfa Playwright, önbellek/keşif kapalı); istemci açıkça seçer
 class CrawlStartRequest(BaseModel):
     target_url: str
     max_pages: int = 50
+    workers: int = 4  # Paralel Playwright sayfası sayısı
+    browser_contexts: int = 1
+    max_per_host: int = 4  # Hedef host için eşzamanlılık üst sınırı (sınırlayıcı 2'den başlayıp uyarlar)
+    max_depth: Optional[int] = None  # None = sınırsız
+    fast_mode: bool = False  # Font/medya/görsel byte'ları ve reklam/analitik alan adlarını engelle
+    block_domains: List[str] = []
+    allow_domains: List[str] = []
+    engine: str = "browser"  # hybrid: önce HTTP, gerekirse Playwright; browser: her sayfa Playwright
+    use_cache: bool = False  # Değişmeyen sayfalar için If-None-Match / If-Modified-Since
+    incremental: bool = False  # Aynı alan adının son raporuna göre sadece değişen sayfaları işle
+    discover: bool = False  # robots.txt/sitemap URL'leriyle frontier'ı baştan doldur, Crawl-delay'e uy
 
 
 class DownloadRequest(BaseModel):
     urls: List[str]
     download_type: str = "images"
+    wait: bool = True  # False: hemen job_id döner, ilerleme WebSocket'ten (type=image_download)
+    stream: bool = False  # True: ZIP diske yazılmaz; download_url indirilirken görseller çekilip akıtılır
 
 
 class YouTubeDownloadRequest(BaseModel):
@@ -360,18 +504,10 @@ async def clear_completed_downloads():
 
 
 @api_router.post("/download/resume/{download_id}")
-async def resume_incomplete_download(download_id: str, background_tasks: BackgroundTasks):
-    """Yarım kalan indirmeyi devam ettir"""
+async def resume_incomplete_download(download_id: str):
+    """Yarım kalan indirmeyi devam ettir (slot boşalınca dağıtıcı başlatır)"""
     new_id = await download_queue.resume_download(download_id)
     if new_id:
-        # Arka planda indirmeyi başlat
-        incomplete = download_queue.incomplete_downloads.get(download_id, {})
-        url = incomplete.get('url', '')
-        format_type = incomplete.get('format', 'video')
-        
-        if download_queue.progress_data.get(new_id, {}).get('status') == 'starting':
-            background_tasks.add_task(process_youtube_download, new_id, url, format_type)
-        
         return {
             "success": True,
             "download_id": new_id,
@@ -396,42 +532,56 @@ async def clear_all_incomplete_downloads():
 
 @api_router.post("/download/direct-image")
 async def download_direct_image(url: str):
-    """Tek bir görseli direkt indir"""
+    """Tek bir görseli direkt indir (depoda varsa indirmeden döner)"""
+    stored = await asyncio.to_thread(media_store.lookup, url)
+    if stored:
+        return direct_image_result(stored, cached=True)
+
+    staging = media_store.staging_path(f"{uuid.uuid4().hex}.part")
     try:
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession() as session, rate_limiter.slot(url) as slot:
             async with session.get(url, timeout=aiohttp.ClientTimeout(total=60), ssl=False) as resp:
-                if resp.status == 200:
-                    # Dosya adı
-                    filename = url.split('/')[-1].split('?')[0]
-                    if not filename or '.' not in filename:
-                        content_type = resp.headers.get('content-type', '')
-                        ext = '.jpg'
-                        if 'png' in content_type:
-                            ext = '.png'
-                        elif 'gif' in content_type:
-                            ext = '.gif'
-                        elif 'webp' in content_type:
-                            ext = '.webp'
-                        filename = f"image_{uuid.uuid4().hex[:8]}{ext}"
-                    
-                    filepath = DOWNLOADS_DIR / filename
-                    content = await resp.read()
-                    
-                    async with aiofiles.open(filepath, 'wb') as f:
-                        await f.write(content)
-                    
-                    return {
-                        "success": True,
-                        "filename": filename,
-                        "size_kb": len(content) / 1024,
-                        "download_url": f"/api/download/file-direct/{filename}"
-                    }
-                else:
+                slot.record(resp.status, resp.headers)
+                if resp.status != 200:
                     return {"success": False, "message": f"HTTP {resp.status}"}
+                # Dosya adı
+                filename = url.split('/')[-1].split('?')[0]
+                content_type = resp.headers.get('content-type', '')
+                if not filename or '.' not in filename:
+                    ext = '.jpg'
+                    if 'png' in content_type:
+                        ext = '.png'
+                    elif 'gif' in content_type:
+                        ext = '.gif'
+                    elif 'webp' in content_type:
+                        ext = '.webp'
+                    filename = f"image_{uuid.uuid4().hex[:8]}{ext}"
+
+                # Belleğe almadan geçici dosyaya yaz; hash depoya taşınırken hesaplanır
+                async with aiofiles.open(staging, 'wb') as f:
+                    async for chunk in resp.content.iter_chunked(64 * 1024):
+                        await f.write(chunk)
+
+        stored = await asyncio.to_thread(
+            media_store.put_file, str(staging), url=url, name=filename, content_type=content_type
+        )
+        return direct_image_result(stored, cached=False)
     except Exception as e:
+        staging.unlink(missing_ok=True)
         return {"success": False, "message": str(e)}
 
 
+def direct_image_result(stored, cached: bool) -> dict:
+    return {
+        "success": True,
+        "filename": stored.name,
+        "size_kb": stored.size / 1024,
+        "download_url": f"/api/download/file-direct/{stored.name}",
+        "cached": cached,
+        "deduplicated": stored.deduplicated,
+    }
+
+
 @api_router.get("/download/file-direct/{filename}")
 async def get_direct_file(filename: str):
     """İndirilen dosyayı getir"""
@@ -441,66 +591,131 @@ async def get_direct_file(filename: str):
     return {"error": "Dosya bulunamadı"}
 
 
-# WebSocket
-class ConnectionManager:
-    def __init__(self):
-        self.connections: List[WebSocket] = []
+# WebSocket: konu tabanlı ilerleme yayını (indirmeler, taramalar, toplu görsel işleri)
+manager = ProgressHub()
+download_queue.publisher = manager.publish
+
+
+async def run_crawl_job(job: CrawlJob):
+    """Zamanlayıcı worker'ında tek bir tarama işini çalıştır"""
+    global current_report
+    request = CrawlStartRequest(**job.options)
+    url = job.target_url
+    domain = urlparse(url).netloc
+    
+    previous_crawl = await load_previous_crawl(db, domain) if request.incremental else None
+    
+    # Başlık dokümanı baştan yazılır; öğeler tarama sırasında partiler halinde koleksiyonlara akar
+    report_id = str(uuid.uuid4())
+    job.report_id = report_id
+    await db.reports.insert_one({
+        '_id': report_id,
+        'job_id': job.job_id,
+        'domain': domain,
+        'target_url': url.rstrip('/'),
+        'status': 'running',
+        'start_time': datetime.now().isoformat(),
+        'created_at': datetime.now(timezone.utc).isoformat()
+    })
+    
+    crawler = AdvancedCrawler(
+        target_url=url,
+        max_pages=request.max_pages,
+        download_dir=str(DOWNLOADS_DIR),
+        workers=max(1, min(request.workers, CRAWL_MAX_WORKERS)),
+        contexts=request.browser_contexts,
+        max_per_host=request.max_per_host,
+        max_depth=request.max_depth,
+        block_resources=request.fast_mode,
+        block_domains=set(request.block_domains),
+        allow_domains=set(request.allow_domains),
+        engine=request.engine,
+        http_cache=http_cache if request.use_cache else None,
+        previous_crawl=previous_crawl,
+        report_sink=MongoReportWriter(db, report_id, batch_size=REPORT_BATCH_SIZE),
+        browser_pool=browser_pool,
+        discover=request.discover,
+        rate_limiter=rate_limiter
+    )
+    job.crawler = crawler
+    
+    async def progress_callback(progress: dict):
+        message = f"Taranıyor... {progress['crawled']} sayfa, {progress.get('images', 0)} görsel"
+        await crawl_scheduler.update_progress(job, progress, message)
+        manager.publish(f"crawl:{job.job_id}", job.to_status())
+    
+    try:
+        job.message = 'Playwright başlatılıyor...'
+        manager.publish(f"crawl:{job.job_id}", job.to_status())
+        
+        report = await crawler.run_crawl(progress_callback)
+    except Exception as e:
+        logger.error(f"Crawl error: {e}")
+        # Yazılmış partiler kalır; rapor hatalı olarak işaretlenir
+        await db.reports.update_one({'_id': report_id}, {'$set': {
+            'status': 'error', 'error': str(e), 'counts': dict(crawler.item_counts),
+            'breakdown': crawler.counters.breakdown
+        }})
+        job.status = 'error'
+        job.message = f"Hata: {str(e)}"
+        manager.publish(f"crawl:{job.job_id}", job.to_status())
+        raise
+    
+    # Öğeler zaten koleksiyonlarda; başlığı tamamla
+    header = finished_report_header(report, stopped=job.stop_requested)
+    await db.reports.update_one({'_id': report_id}, {'$set': header})
+    current_report = await load_report_header(report_id)
+    
+    total_images = report.counts.get('images', 0)
+    total_videos = report.counts.get('videos', 0) + report.counts.get('youtube_videos', 0)
+    
+    job.progress.update(crawled=report.total_urls, images=total_images, videos=total_videos,
+                        issues=report.counts.get('issues', 0))
+    job.message = f"Tamamlandı! {report.total_urls} sayfa, {total_images} görsel, {total_videos} video"
+    delta = report.delta
+    if delta:
+        job.message += (
+            f" (değişen {delta['changed_pages_count']}, yeni {delta['new_pages_count']} sayfa; "
+            f"+{delta['added_images_count']}/-{delta['removed_images_count']} görsel, "
+            f"+{delta['added_issues_count']}/-{delta['removed_issues_count']} sorun)"
+        )
+    if job.stop_requested:
+        await crawl_scheduler.finish(job, 'stopped', 'Durduruldu')
+    else:
+        await crawl_scheduler.finish(job, 'completed')
+    manager.publish(f"crawl:{job.job_id}", job.to_status())
 
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        self.connections.append(ws)
 
-    def disconnect(self, ws: WebSocket):
-        if ws in self.connections:
-            self.connections.remove(ws)
+crawl_scheduler = CrawlJobScheduler(db, run_crawl_job, max_workers=CRAWL_JOB_WORKERS)
 
-    async def broadcast(self, msg: dict):
-        for conn in self.connections:
-            try:
-                await conn.send_json(msg)
-            except Exception:
-                pass
 
-manager = ConnectionManager()
+async def load_report_header(report_id: Optional[str] = None) -> Optional[dict]:
+    """Rapor başlığını yükle (verilmezse en son tamamlanan rapor)"""
+    return await find_report_header(db, report_id=report_id)
 
 
-async def progress_callback(progress: dict):
-    global crawl_progress
-    crawl_progress.update(progress)
-    crawl_progress['status'] = 'running'
-    crawl_progress['message'] = f"Taranıyor... {progress['crawled']} sayfa, {progress.get('images', 0)} görsel"
-    await manager.broadcast(crawl_progress)
+async def resolve_report(report_id: Optional[str] = None, domain: Optional[str] = None) -> Optional[dict]:
+    """Sorgulanacak rapor: id, alan adının son raporu veya güncel rapor"""
+    global current_report
+    if report_id or domain:
+        return await find_report_header(db, report_id=report_id, domain=domain)
+    if not current_report:
+        current_report = await load_report_header()
+    return current_report
 
 
-async def run_crawl_task():
-    global crawler_instance, current_report, crawl_progress
-    
+async def report_page(kind: str, report: dict, filters: Dict[str, Optional[str]],
+                      cursor: Optional[str], limit: int, skip: int = 0) -> dict:
+    """Tek tür için cursor'lı sayfa + toplam; geçersiz cursor'da error"""
     try:
-        crawl_progress['status'] = 'running'
-        crawl_progress['message'] = 'Playwright başlatılıyor...'
-        await manager.broadcast(crawl_progress)
-        
-        report = await crawler_instance.run_crawl(progress_callback)
-        current_report = report_to_dict(report)
-        
-        # MongoDB'ye kaydet
-        report_doc = current_report.copy()
-        report_doc['_id'] = str(uuid.uuid4())
-        report_doc['created_at'] = datetime.now(timezone.utc).isoformat()
-        await db.reports.insert_one(report_doc)
-        
-        total_images = len(current_report.get('images', []))
-        total_videos = len(current_report.get('videos', [])) + len(current_report.get('youtube_videos', []))
-        
-        crawl_progress['status'] = 'completed'
-        crawl_progress['message'] = f"Tamamlandı! {current_report['total_urls']} sayfa, {total_images} görsel, {total_videos} video"
-        await manager.broadcast(crawl_progress)
-        
-    except Exception as e:
-        logger.error(f"Crawl error: {e}")
-        crawl_progress['status'] = 'error'
-        crawl_progress['message'] = f"Hata: {str(e)}"
-        await manager.broadcast(crawl_progress)
+        items, next_cursor = await query_report_items(db, report, kind, filters, cursor=cursor, limit=limit, skip=skip)
+    except ValueError:
+        return {"error": "Geçersiz cursor"}
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "total": await count_report_items(db, report, kind, filters)
+    }
 
 
 # API Endpoints
@@ -510,165 +725,244 @@ async def root():
 
 
 @api_router.post("/crawl/start")
-async def start_crawl(request: CrawlStartRequest, background_tasks: BackgroundTasks):
-    global crawler_instance, crawl_progress
-    
-    if crawler_instance and crawler_instance.is_running:
-        return {"success": False, "message": "Tarama devam ediyor"}
-    
+async def start_crawl(request: CrawlStartRequest):
+    """Taramayı kuyruğa al; en fazla CRAWL_JOB_WORKERS iş aynı anda çalışır"""
     url = request.target_url
     if not url.startswith("http"):
         url = "https://" + url
     
-    crawler_instance = AdvancedCrawler(
-        target_url=url,
-        max_pages=request.max_pages,
-        download_dir=str(DOWNLOADS_DIR)
-    )
-    
-    crawl_progress = {
-        'status': 'starting', 'crawled': 0, 'discovered': 0,
-        'images': 0, 'videos': 0, 'issues': 0, 'message': 'Başlatılıyor...'
+    job = await crawl_scheduler.submit(url, request.model_dump())
+    return {
+        "success": True,
+        "message": "Tarama sıraya alındı",
+        "job_id": job.job_id,
+        "queue_position": crawl_scheduler.queue_position(job.job_id)
     }
-    
-    background_tasks.add_task(run_crawl_task)
-    return {"success": True, "message": "Tarama başlatıldı"}
 
 
 @api_router.post("/crawl/stop")
 async def stop_crawl():
-    global crawler_instance, crawl_progress
-    if crawler_instance:
-        crawler_instance.stop_crawl()
-        crawl_progress['status'] = 'stopped'
-        crawl_progress['message'] = 'Durduruldu'
-        return {"success": True}
+    """Son başlatılan taramayı durdur (eski istemciler için)"""
+    job = crawl_scheduler.latest()
+    if job and await crawl_scheduler.stop(job.job_id):
+        return {"success": True, "job_id": job.job_id}
     return {"success": False, "message": "Aktif tarama yok"}
 
 
 @api_router.get("/crawl/status")
 async def get_status():
-    return crawl_progress
+    """Son başlatılan taramanın durumu (eski istemciler için)"""
+    job = crawl_scheduler.latest()
+    return job.to_status() if job else IDLE_CRAWL_STATUS
+
+
+@api_router.get("/rate-limiter/stats")
+async def get_rate_limiter_stats():
+    """En çok istek atılan host'lar: pencere, hız, gecikme, 429/503 sayıları"""
+    return rate_limiter.stats()
+
+
+@api_router.get("/browser-pool/stats")
+async def get_browser_pool_stats():
+    """Havuzdaki tarayıcılar: yaş, sayfa sayısı, açık context, RSS"""
+    return browser_pool.stats()
+
+
+@api_router.get("/crawl/jobs")
+async def list_crawl_jobs(status: Optional[str] = None, limit: int = 50):
+    return {"jobs": await crawl_scheduler.list_jobs(status, limit)}
+
+
+@api_router.get("/crawl/{job_id}")
+async def get_crawl_job(job_id: str):
+    job = await crawl_scheduler.get(job_id)
+    if not job:
+        return {"error": "İş bulunamadı"}
+    status = job.to_status()
+    status['queue_position'] = crawl_scheduler.queue_position(job_id)
+    return status
+
+
+@api_router.post("/crawl/{job_id}/stop")
+async def stop_crawl_job(job_id: str):
+    if await crawl_scheduler.stop(job_id):
+        return {"success": True}
+    return {"success": False, "message": "Aktif iş bulunamadı"}
+
+
+@api_router.get("/crawl/{job_id}/report")
+async def get_crawl_job_report(job_id: str):
+    """İşin rapor özeti; öğeler /report/*?report_id=... ile sayfalanır"""
+    job = await crawl_scheduler.get(job_id)
+    if not job:
+        return {"error": "İş bulunamadı"}
+    if not job.report_id:
+        return {"error": "Rapor henüz oluşmadı", "status": job.status}
+    return await get_summary(report_id=job.report_id)
 
 
 @api_router.get("/report/summary")
-async def get_summary():
-    global current_report
-    if not current_report:
-        latest = await db.reports.find_one(sort=[('created_at', -1)])
-        if latest:
-            latest['id'] = str(latest.pop('_id'))
-            current_report = latest
-        else:
-            return {"error": "Rapor yok"}
+async def get_summary(report_id: Optional[str] = None, domain: Optional[str] = None):
+    report = await resolve_report(report_id, domain)
+    if not report:
+        return {"error": "Rapor yok"}
     
+    counts = await report_counts(db, report)
     return {
-        'domain': current_report.get('domain', ''),
-        'target_url': current_report.get('target_url', ''),
-        'total_urls': current_report.get('total_urls', 0),
-        'total_images': len(current_report.get('images', [])),
-        'total_videos': len(current_report.get('videos', [])),
-        'total_youtube': len(current_report.get('youtube_videos', [])),
-        'total_texts': len(current_report.get('texts', [])),
-        'issues_count': len(current_report.get('issues', []))
+        'report_id': report['id'],
+        'status': report.get('status', ''),
+        'domain': report.get('domain', ''),
+        'target_url': report.get('target_url', ''),
+        'total_urls': report.get('total_urls', counts['pages']),
+        'total_images': counts.get('images', 0),
+        'total_videos': counts.get('videos', 0),
+        'total_youtube': counts.get('youtube_videos', 0),
+        'total_texts': counts.get('texts', 0),
+        'issues_count': counts.get('issues', 0),
+        'breakdown': report.get('breakdown', {})
     }
 
 
 @api_router.get("/report/images")
-async def get_images(page: int = 1, limit: int = 100):
-    global current_report
-    if not current_report:
-        return {"images": [], "total": 0}
+async def get_images(page: int = 1, limit: int = 100, cursor: Optional[str] = None,
+                     page_url: Optional[str] = None, report_id: Optional[str] = None,
+                     domain: Optional[str] = None):
+    report = await resolve_report(report_id, domain)
+    if not report:
+        return {"images": [], "total": 0, "next_cursor": None}
     
-    images = current_report.get('images', [])
-    start = (page - 1) * limit
-    return {"images": images[start:start+limit], "total": len(images)}
+    # page (offset) eski istemciler için; büyük raporlarda next_cursor kullanılmalı
+    result = await report_page('images', report, {'page_url': page_url}, cursor, limit,
+                               skip=max(page - 1, 0) * limit)
+    if 'error' in result:
+        return result
+    return {"images": result['items'], "total": result['total'], "next_cursor": result['next_cursor']}
 
 
 @api_router.get("/report/videos")
-async def get_videos():
-    global current_report
-    if not current_report:
+async def get_videos(limit: int = 1000, cursor: Optional[str] = None, youtube_cursor: Optional[str] = None,
+                     type: Optional[str] = None, page_url: Optional[str] = None,
+                     report_id: Optional[str] = None, domain: Optional[str] = None):
+    report = await resolve_report(report_id, domain)
+    if not report:
         return {"videos": [], "youtube": [], "total": 0}
     
-    return {
-        "videos": current_report.get('videos', []),
-        "youtube": current_report.get('youtube_videos', []),
-        "total": len(current_report.get('videos', [])) + len(current_report.get('youtube_videos', []))
-    }
+    response = {"videos": [], "youtube": [], "next_cursor": None, "youtube_next_cursor": None, "total": 0}
+    if type != 'youtube':
+        result = await report_page('videos', report, {'type': type, 'page_url': page_url}, cursor, limit)
+        if 'error' in result:
+            return result
+        response.update(videos=result['items'], next_cursor=result['next_cursor'])
+        response['total'] += result['total']
+    if type in (None, 'youtube'):
+        result = await report_page('youtube_videos', report, {'page_url': page_url}, youtube_cursor, limit)
+        if 'error' in result:
+            return result
+        response.update(youtube=result['items'], youtube_next_cursor=result['next_cursor'])
+        response['total'] += result['total']
+    return response
 
 
 @api_router.get("/report/texts")
-async def get_texts(limit: int = 100):
-    global current_report
-    if not current_report:
-        return {"texts": [], "total": 0}
+async def get_texts(limit: int = 100, cursor: Optional[str] = None, type: Optional[str] = None,
+                    page_url: Optional[str] = None, report_id: Optional[str] = None,
+                    domain: Optional[str] = None):
+    report = await resolve_report(report_id, domain)
+    if not report:
+        return {"texts": [], "total": 0, "next_cursor": None}
     
-    texts = current_report.get('texts', [])
-    return {"texts": texts[:limit], "total": len(texts)}
+    result = await report_page('texts', report, {'type': type, 'page_url': page_url}, cursor, limit)
+    if 'error' in result:
+        return result
+    return {"texts": result['items'], "total": result['total'], "next_cursor": result['next_cursor']}
 
 
 @api_router.get("/report/issues")
-async def get_issues():
-    global current_report
-    if not current_report:
-        return {"issues": [], "total": 0}
+async def get_issues(limit: int = 1000, cursor: Optional[str] = None, severity: Optional[str] = None,
+                     issue_type: Optional[str] = None, page_url: Optional[str] = None,
+                     report_id: Optional[str] = None, domain: Optional[str] = None):
+    report = await resolve_report(report_id, domain)
+    if not report:
+        return {"issues": [], "total": 0, "next_cursor": None}
     
-    return {"issues": current_report.get('issues', []), "total": len(current_report.get('issues', []))}
+    filters = {'severity': severity, 'issue_type': issue_type, 'source_url': page_url}
+    result = await report_page('issues', report, filters, cursor, limit)
+    if 'error' in result:
+        return result
+    return {"issues": result['items'], "total": result['total'], "next_cursor": result['next_cursor']}
+
+
+@api_router.get("/report/delta")
+async def get_delta(report_id: Optional[str] = None, domain: Optional[str] = None):
+    """Artımlı taramada önceki rapora göre farklar"""
+    report = await resolve_report(report_id, domain)
+    if not report or not report.get('delta'):
+        return {"delta": None}
+    
+    return {"delta": report['delta']}
+
+
+async def run_image_download(job: BulkDownloadJob) -> BulkDownloadJob:
+    async def progress_callback(current: BulkDownloadJob):
+        manager.publish(f"image_download:{current.job_id}", current.to_status())
+
+    return await image_downloader.run(job, progress_callback)
 
 
 @api_router.post("/download/images")
-async def download_images(request: DownloadRequest):
-    """Görselleri ZIP olarak indir"""
-    download_id = str(uuid.uuid4())[:8]
-    download_dir = DOWNLOADS_DIR / download_id
-    download_dir.mkdir(exist_ok=True)
-    
-    downloaded = []
-    errors = []
-    
-    async with aiohttp.ClientSession() as session:
-        for url in request.urls:
-            try:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=30), ssl=False) as resp:
-                    if resp.status == 200:
-                        filename = url.split('/')[-1].split('?')[0] or f"image_{len(downloaded)}.jpg"
-                        filepath = download_dir / filename
-                        
-                        # Duplicate önle
-                        counter = 1
-                        while filepath.exists():
-                            name, ext = os.path.splitext(filename)
-                            filepath = download_dir / f"{name}_{counter}{ext}"
-                            counter += 1
-                        
-                        content = await resp.read()
-                        async with aiofiles.open(filepath, 'wb') as f:
-                            await f.write(content)
-                        downloaded.append(filepath.name)
-            except Exception as e:
-                errors.append({"url": url, "error": str(e)})
-    
-    if downloaded:
-        zip_path = DOWNLOADS_DIR / f"{download_id}.zip"
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zf:
-            for file in downloaded:
-                zf.write(download_dir / file, file)
-        shutil.rmtree(download_dir)
-        
+async def download_images(request: DownloadRequest, background_tasks: BackgroundTasks):
+    """Görselleri ZIP olarak indir (stream=True: akışlı ZIP linki, wait=False: arka planda)"""
+    job = image_downloader.create_job(request.urls)
+    if request.stream:
         return {
             "success": True,
-            "download_id": download_id,
-            "files_count": len(downloaded),
-            "download_url": f"/api/download/file/{download_id}"
+            "job_id": job.job_id,
+            "download_id": job.job_id,
+            "files_count": job.total,
+            "download_url": f"/api/download/images/{job.job_id}/stream"
         }
-    
-    return {"success": False, "message": "İndirilemedi", "errors": errors}
+    if not request.wait:
+        background_tasks.add_task(run_image_download, job)
+        return {
+            "success": True,
+            "job_id": job.job_id,
+            "download_id": job.job_id,
+            "status": job.status,
+            "status_url": f"/api/download/images/{job.job_id}"
+        }
+    await run_image_download(job)
+    return job.result()
+
+
+@api_router.get("/download/images/{job_id}/stream")
+async def stream_image_download(job_id: str):
+    """Görselleri çekerken ZIP olarak akıt (geçici klasör/dosya yok; link tek kullanımlık)"""
+    job = image_downloader.get(job_id)
+    if not job or job.status != 'queued':
+        return {"error": "İş bulunamadı veya zaten indirildi"}
+
+    async def progress_callback(current: BulkDownloadJob):
+        manager.publish(f"image_download:{current.job_id}", current.to_status())
+
+    return StreamingResponse(
+        image_downloader.stream(job, progress_callback),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="images_{job_id}.zip"'}
+    )
+
+
+@api_router.get("/download/images/{job_id}")
+async def get_image_download_status(job_id: str):
+    """Toplu görsel indirme işinin durumu"""
+    job = image_downloader.get(job_id)
+    if not job:
+        return {"error": "İş bulunamadı"}
+    return {**job.to_status(), "errors": job.errors}
 
 
 @api_router.post("/download/youtube")
-async def download_youtube(request: YouTubeDownloadRequest, background_tasks: BackgroundTasks):
-    """YouTube video/ses indir - Sıra sistemi ile"""
+async def download_youtube(request: YouTubeDownloadRequest):
+    """YouTube video/ses indir - Sıra sistemi ile (slot boşalınca dağıtıcı başlatır)"""
     # Sıraya ekle
     download_info = {
         'url': request.url,
@@ -677,13 +971,6 @@ async def download_youtube(request: YouTubeDownloadRequest, background_tasks: Ba
     }
     download_id = await download_queue.add_to_queue(download_info)
     
-    # Eğer hemen başlayabiliyorsa background task olarak başlat
-    if download_queue.progress_data[download_id]['status'] == 'starting':
-        background_tasks.add_task(process_youtube_download, download_id, request.url, request.format)
-    else:
-        # Sırada bekleyenler için de background task ekle (sırası gelince başlar)
-        background_tasks.add_task(wait_and_process_download, download_id, request.url, request.format)
-    
     return {
         "success": True,
         "download_id": download_id,
@@ -693,27 +980,92 @@ async def download_youtube(request: YouTubeDownloadRequest, background_tasks: Ba
     }
 
 
-async def wait_and_process_download(download_id: str, url: str, format_type: str):
-    """Sıra bekleyen indirmeler için"""
-    # Sıranın gelmesini bekle
-    while True:
-        progress = download_queue.get_download_progress(download_id)
-        if not progress:
-            return
-        if progress.get('status') in ['starting', 'downloading']:
-            break
-        if progress.get('status') in ['completed', 'failed']:
-            return
-        await asyncio.sleep(1)
-    
-    # İndirmeyi başlat
-    await process_youtube_download(download_id, url, format_type)
+def apply_download_progress(download_id: str, d: Dict):
+    """yt-dlp ilerleme olayını kuyruğa uygula (event loop'ta, ProgressBridge çağırır)"""
+    try:
+        if d['status'] == 'downloading':
+            percent = 0
+            downloaded_bytes = d.get('downloaded_bytes', 0)
+            total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
+            
+            if total_bytes > 0:
+                percent = (downloaded_bytes / total_bytes) * 100
+            elif '_percent_str' in d:
+                try:
+                    percent_str = d['_percent_str'].replace('%', '').strip()
+                    percent = float(percent_str)
+                except (ValueError, AttributeError):
+                    pass
+            
+            # Speed formatting
+            speed = d.get('_speed_str', d.get('speed', ''))
+            if isinstance(speed, (int, float)) and speed > 0:
+                if speed > 1024*1024:
+                    speed = f"{speed/1024/1024:.1f}MB/s"
+                elif speed > 1024:
+                    speed = f"{speed/1024:.1f}KB/s"
+                else:
+                    speed = f"{speed:.0f}B/s"
+            
+            # Downloaded size formatting
+            downloaded = d.get('_downloaded_bytes_str', '')
+            if not downloaded and downloaded_bytes > 0:
+                if downloaded_bytes > 1024*1024:
+                    downloaded = f"{downloaded_bytes/1024/1024:.1f}MB"
+                else:
+                    downloaded = f"{downloaded_bytes/1024:.1f}KB"
+            
+            # Total size formatting
+            total = d.get('_total_bytes_str', d.get('_total_bytes_estimate_str', ''))
+            if not total and total_bytes > 0:
+                if total_bytes > 1024*1024:
+                    total = f"{total_bytes/1024/1024:.1f}MB"
+                else:
+                    total = f"{total_bytes/1024:.1f}KB"
+            
+            download_queue.update_progress(download_id, {
+                'percent': round(percent, 1),
+                'speed': str(speed) if speed else '',
+                'eta': d.get('_eta_str', d.get('eta', '')),
+                'downloaded': downloaded,
+                'total': total,
+                'status': 'downloading',
+                'filename': d.get('filename', '')
+            })
+            logger.info(f"Download progress {download_id}: {percent:.1f}% - {speed}")
+            
+        elif d['status'] == 'finished':
+            download_queue.update_progress(download_id, {
+                'percent': 99,
+                'status': 'processing',
+                'speed': '',
+                'eta': 'İşleniyor...'
+            })
+    except Exception as e:
+        logger.error(f"Progress hook error: {e}")
+
+
+download_progress = ProgressBridge(
+    apply_download_progress, max_rate=float(os.environ.get("DOWNLOAD_PROGRESS_RATE", "4"))
+)
 
 
 async def process_youtube_download(download_id: str, url: str, format_type: str):
     """YouTube indirme işlemi - Progress tracking ile"""
     await download_queue.start_download(download_id)
-    
+
+    # Aynı URL+format daha önce indirildiyse depodan anında tamamla
+    stored = await asyncio.to_thread(media_store.lookup, url, format_type)
+    if stored:
+        await download_queue.complete_download(download_id, True, {
+            "success": True,
+            "filename": stored.name,
+            "title": os.path.splitext(stored.name)[0],
+            "download_url": f"/api/download/youtube-file/{stored.name}",
+            "cached": True
+        })
+        return
+
     # Başlangıç durumunu ayarla
     download_queue.update_progress(download_id, {
         'percent': 0,
@@ -726,77 +1078,19 @@ async def process_youtube_download(download_id: str, url: str, format_type: str)
         'total': ''
     })
     
-    # Thread-safe progress update
-    def progress_hook(d):
-        """yt-dlp progress callback"""
-        try:
-            if d['status'] == 'downloading':
-                percent = 0
-                downloaded_bytes = d.get('downloaded_bytes', 0)
-                total_bytes = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
-                
-                if total_bytes > 0:
-                    percent = (downloaded_bytes / total_bytes) * 100
-                elif '_percent_str' in d:
-                    try:
-                        percent_str = d['_percent_str'].replace('%', '').strip()
-                        percent = float(percent_str)
-                    except (ValueError, AttributeError):
-                        pass
-                
-                # Speed formatting
-                speed = d.get('_speed_str', d.get('speed', ''))
-                if isinstance(speed, (int, float)) and speed > 0:
-                    if speed > 1024*1024:
-                        speed = f"{speed/1024/1024:.1f}MB/s"
-                    elif speed > 1024:
-                        speed = f"{speed/1024:.1f}KB/s"
-                    else:
-                        speed = f"{speed:.0f}B/s"
-                
-                # Downloaded size formatting
-                downloaded = d.get('_downloaded_bytes_str', '')
-                if not downloaded and downloaded_bytes > 0:
-                    if downloaded_bytes > 1024*1024:
-                        downloaded = f"{downloaded_bytes/1024/1024:.1f}MB"
-                    else:
-                        downloaded = f"{downloaded_bytes/1024:.1f}KB"
-                
-                # Total size formatting
-                total = d.get('_total_bytes_str', d.get('_total_bytes_estimate_str', ''))
-                if not total and total_bytes > 0:
-                    if total_bytes > 1024*1024:
-                        total = f"{total_bytes/1024/1024:.1f}MB"
-                    else:
-                        total = f"{total_bytes/1024:.1f}KB"
-                
-                download_queue.update_progress(download_id, {
-                    'percent': round(percent, 1),
-                    'speed': str(speed) if speed else '',
-                    'eta': d.get('_eta_str', d.get('eta', '')),
-                    'downloaded': downloaded,
-                    'total': total,
-                    'status': 'downloading',
-                    'filename': d.get('filename', '')
-                })
-                logger.info(f"Download progress {download_id}: {percent:.1f}% - {speed}")
-                
-            elif d['status'] == 'finished':
-                download_queue.update_progress(download_id, {
-                    'percent': 99,
-                    'status': 'processing',
-                    'speed': '',
-                    'eta': 'İşleniyor...'
-                })
-        except Exception as e:
-            logger.error(f"Progress hook error: {e}")
+    # Hook executor thread'inde çalışır; olaylar köprüyle event loop'ta, saniyede en fazla birkaç kez uygulanır
+    progress_hook = download_progress.hook(download_id)
     
-    downloader = YouTubeDownloaderWithProgress(str(DOWNLOADS_DIR), progress_hook)
+    # yt-dlp URL+format'a özel geçici klasöre indirir: yarım .part dosyaları devam ettirilebilir,
+    # aynı başlıklı farklı videolar birbirinin üzerine yazmaz
+    staging_dir = media_store.staging_path(hashlib.sha1(f"{format_type}:{url}".encode()).hexdigest())
+    downloader = YouTubeDownloaderWithProgress(str(staging_dir), progress_hook)
     
     try:
         # Video bilgisi al
         info = downloader.get_video_info(url)
         if not info:
+            download_progress.close(download_id)
             await download_queue.complete_download(download_id, False, {"message": "Video bilgisi alınamadı"})
             return
         
@@ -813,14 +1107,20 @@ async def process_youtube_download(download_id: str, url: str, format_type: str)
             filepath = await loop.run_in_executor(None, downloader.download_audio, url)
         else:
             filepath = await loop.run_in_executor(None, downloader.download_video, url)
+        # Geç kalan ilerleme olayı tamamlanma durumunun üzerine yazmasın
+        download_progress.close(download_id)
         
         if filepath and os.path.exists(filepath):
-            filename = os.path.basename(filepath)
+            stored = await asyncio.to_thread(
+                media_store.put_file, filepath, url=url, variant=format_type, name=os.path.basename(filepath)
+            )
+            shutil.rmtree(staging_dir, ignore_errors=True)
             result = {
                 "success": True,
-                "filename": filename,
+                "filename": stored.name,
                 "title": info.get('title', ''),
-                "download_url": f"/api/download/youtube-file/{filename}"
+                "download_url": f"/api/download/youtube-file/{stored.name}",
+                "deduplicated": stored.deduplicated
             }
             await download_queue.complete_download(download_id, True, result)
             return
@@ -829,11 +1129,16 @@ async def process_youtube_download(download_id: str, url: str, format_type: str)
         
     except Exception as e:
         logger.error(f"YouTube download error: {e}")
+        download_progress.close(download_id)
         await download_queue.complete_download(download_id, False, {"message": str(e)})
 
 
+# Kuyruk dağıtıcısı slot alan her indirmeyi bununla çalıştırır
+download_queue.runner = process_youtube_download
+
+
 @api_router.post("/download/video")
-async def download_any_video(request: DirectVideoDownloadRequest, background_tasks: BackgroundTasks):
+async def download_any_video(request: DirectVideoDownloadRequest):
     """Herhangi bir siteden video indir (VK, TikTok, Twitter, vs.) - Sıra sistemi ile"""
     # Sıraya ekle
     download_info = {
@@ -844,12 +1149,6 @@ async def download_any_video(request: DirectVideoDownloadRequest, background_tas
     }
     download_id = await download_queue.add_to_queue(download_info)
     
-    # Background task olarak başlat
-    if download_queue.progress_data[download_id]['status'] == 'starting':
-        background_tasks.add_task(process_youtube_download, download_id, request.url, request.format)
-    else:
-        background_tasks.add_task(wait_and_process_download, download_id, request.url, request.format)
-    
     return {
         "success": True,
         "download_id": download_id,
@@ -895,15 +1194,38 @@ async def get_youtube_info(url: str):
     return {"success": False, "message": "Bilgi alınamadı"}
 
 
+@api_router.get("/media/stats")
+async def get_media_stats():
+    """Medya deposu: nesne/ad sayıları, tekilleştirme kazancı"""
+    return await asyncio.to_thread(media_store.stats)
+
+
+@api_router.delete("/media/{name}")
+async def delete_media(name: str):
+    """İndirilen dosyayı sil; içerik başka adla kullanılmıyorsa depodan da kaldırılır"""
+    if not await asyncio.to_thread(media_store.release, name):
+        return {"success": False, "message": "Dosya bulunamadı"}
+    return {"success": True}
+
+
 # WebSocket
 @api_router.websocket("/ws/progress")
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    """İlerleme yayını: {"action": "subscribe", "topics": ["download:*", "crawl:<job_id>"]}"""
+    subscriber = await manager.connect(websocket)
     try:
         while True:
-            await websocket.receive_text()
+            await manager.handle_message(subscriber, await websocket.receive_text())
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        manager.disconnect(subscriber)
+
+
+@api_router.get("/ws/stats")
+async def get_websocket_stats():
+    """WebSocket istemci, yayın ve birleştirme sayıları"""
+    return manager.stats()
 
 
 # Include router
@@ -921,27 +1243,33 @@ app.add_middleware(
 
 @app.on_event("shutdown")
 async def shutdown():
+    await crawl_scheduler.shutdown()
+    await download_queue.stop()
+    await browser_pool.shutdown()
     client.close()
+    media_store.close()
+    download_queue.close()
+    shutdown_process_pool()
 
 
 @app.on_event("startup")
 async def startup():
+    await ensure_report_indexes(db)
+    # Önceki süreçte yarıda kalan raporlar; işleri zamanlayıcı yeniden sıraya alır.
+    # Dağıtık taramaları crawl_worker süreçleri yürütür, sunucu yeniden başlatması onları etkilemez
+    await db.reports.update_many(
+        {'status': 'running', 'distributed': {'$ne': True}},
+        {'$set': {'status': 'error', 'error': 'interrupted'}}
+    )
+    try:
+        await browser_pool.start()
+    except Exception as e:
+        # Tarayıcı başlatılamazsa ilk tarama tekrar dener; statik (hybrid) sayfalar etkilenmez
+        logger.error(f"Browser pool could not start: {e}")
+    await crawl_scheduler.start()
     await resume_pending_downloads()
 
 
 async def resume_pending_downloads():
     """Kuyrukta bekleyen indirmeleri yeniden başlat, yarım kalanları listede bırak."""
     await download_queue.prime_queue()
-
-    for download_id, info in list(download_queue.active_downloads.items()):
-        url = info.get('url', '')
-        format_type = info.get('format', 'video')
-        asyncio.create_task(process_youtube_download(download_id, url, format_type))
-
-    for item in list(download_queue.queue):
-        download_id = item.get('download_id')
-        if not download_id:
-            continue
-        url = item.get('url', '')
-        format_type = item.get('format', 'video')
-        asyncio.create_task(wait_and_process_download(download_id, url, format_type))
@@ -0,0 +1,261 @@
+"""
+Site Keşfi - robots.txt ve sitemap'ler
+robots.txt'deki Sitemap satırları (yoksa /sitemap.xml) ve sitemap index dosyaları izlenir;
+.gz dahil sitemap'ler indirilirken akış halinde (XMLPullParser) ayrıştırılır. En güncel
+(lastmod) URL'ler frontier'a toplu olarak ve öncelikli eklenir; Crawl-delay tarayıcıya iletilir.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+from lxml import etree
+
+from crawl_frontier import SITEMAP_PRIORITY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SITEMAP_PATHS = ('/sitemap.xml', '/sitemap_index.xml')
+# Protokol sınırı: sitemap başına 50.000 URL / 50 MB (sıkıştırılmamış)
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+MAX_CRAWL_DELAY = 30.0
+CHUNK_SIZE = 64 * 1024
+
+# lastmod yaşı (gün) -> SITEMAP_PRIORITY'ye eklenen değer; küçük = önce taranır
+LASTMOD_AGE_BUCKETS = ((7, 0), (30, 1), (365, 2))
+OLD_OR_UNKNOWN_OFFSET = 3
+
+
+@dataclass(order=True)
+class SitemapUrl:
+    priority: int
+    url: str = field(compare=False)
+    lastmod: Optional[datetime] = field(default=None, compare=False)
+
+
+@dataclass
+class DiscoveryResult:
+    robots_found: bool = False
+    crawl_delay: Optional[float] = None
+    sitemaps: List[str] = field(default_factory=list)  # İşlenen sitemap dosyaları
+    urls: List[SitemapUrl] = field(default_factory=list)  # Öncelik sırasıyla
+    scanned: int = 0  # Sitemap'lerde görülen toplam <loc>
+    errors: List[str] = field(default_factory=list)
+
+
+def parse_lastmod(value: str) -> Optional[datetime]:
+    """W3C datetime (2024-05-01, 2024-05-01T10:00:00+03:00, ...Z)"""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = datetime.strptime(value[:10], '%Y-%m-%d')
+        except ValueError:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def lastmod_priority(lastmod: Optional[datetime], now: Optional[datetime] = None) -> int:
+    """Yakın zamanda değişen sayfalar önce"""
+    if lastmod is None:
+        return SITEMAP_PRIORITY + OLD_OR_UNKNOWN_OFFSET
+    age_days = ((now or datetime.now(timezone.utc)) - lastmod).days
+    for max_age, offset in LASTMOD_AGE_BUCKETS:
+        if age_days <= max_age:
+            return SITEMAP_PRIORITY + offset
+    return SITEMAP_PRIORITY + OLD_OR_UNKNOWN_OFFSET
+
+
+def _localname(tag) -> str:
+    return etree.QName(tag).localname if isinstance(tag, str) else ''
+
+
+def _group_crawl_delay(text: str, user_agent: str = '*') -> Optional[float]:
+    """`user_agent` grubundaki (yoksa `*`) Crawl-delay değeri"""
+    delays: Dict[str, float] = {}
+    agents: List[str] = []
+    in_rules = False
+    for line in text.splitlines():
+        key, _, value = line.split('#', 1)[0].partition(':')
+        key, value = key.strip().lower(), value.strip()
+        if key == 'user-agent':
+            if in_rules:
+                agents, in_rules = [], False
+            agents.append(value.lower())
+        elif key == 'crawl-delay':
+            in_rules = True
+            try:
+                delays.update((agent, float(value)) for agent in agents)
+            except ValueError:
+                continue
+        elif key:
+            in_rules = True
+    return delays.get(user_agent.lower(), delays.get('*'))
+
+
+class SiteDiscovery:
+    """robots.txt + sitemap keşfi
+
+    Bellek sınırlıdır: tüm sitemap'ler taranır ama sadece en öncelikli `max_urls` URL
+    bir yığında tutulur. `accept(url)` False dönen URL'ler (dış alan adı vb.) atlanır.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, base_url: str, max_urls: int = 10000,
+                 max_sitemaps: int = 50, user_agent: str = '*', accept: Optional[Callable[[str], bool]] = None):
+        parsed = urlparse(base_url)
+        self.session = session
+        self.origin = f"{parsed.scheme or 'https'}://{parsed.netloc}"
+        self.max_urls = max(1, max_urls)
+        self.max_sitemaps = max_sitemaps
+        self.user_agent = user_agent
+        self.accept = accept or (lambda url: True)
+        self.robots: Optional[RobotFileParser] = None
+        self.result = DiscoveryResult()
+        self._heap: List[Tuple[int, int, SitemapUrl]] = []  # max-heap (-öncelik) ile en iyi N
+        self._seen: set = set()
+        self._counter = itertools.count()
+        self._now = datetime.now(timezone.utc)
+
+    async def discover(self) -> DiscoveryResult:
+        """robots.txt'i oku, sitemap'leri izle; iptal edilirse (timeout) o ana kadarki sonuç `result`'ta"""
+        started = time.perf_counter()
+        sitemap_urls = await self.fetch_robots()
+        if not sitemap_urls:
+            sitemap_urls = [urljoin(self.origin, path) for path in DEFAULT_SITEMAP_PATHS]
+
+        pending = list(dict.fromkeys(sitemap_urls))
+        visited = set()
+        while pending and len(visited) < self.max_sitemaps:
+            sitemap_url = pending.pop(0)
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+            children = await self.parse_sitemap(sitemap_url)
+            pending.extend(child for child in children if child not in visited)
+
+        self.result.urls = self.best_urls()
+        logger.info(
+            f"Discovery: {len(self.result.urls)} URLs from {len(self.result.sitemaps)} sitemaps "
+            f"({self.result.scanned} scanned) in {time.perf_counter() - started:.2f}s"
+        )
+        return self.result
+
+    def best_urls(self) -> List[SitemapUrl]:
+        """Öncelik, eşitlikte sitemap'teki sıra"""
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: (-entry[0], -entry[1]))]
+
+    async def fetch_robots(self) -> List[str]:
+        """robots.txt'i ayrıştır; Sitemap satırlarını döndür, Crawl-delay'i kaydet"""
+        robots_url = urljoin(self.origin, '/robots.txt')
+        try:
+            async with self.session.get(robots_url, timeout=aiohttp.ClientTimeout(total=15), ssl=False) as response:
+                if response.status != 200:
+                    return []
+                text = await response.text(errors='replace')
+        except Exception as e:
+            self.result.errors.append(f"robots.txt: {e}")
+            return []
+
+        parser = RobotFileParser(robots_url)
+        parser.parse(text.splitlines())
+        self.robots = parser
+        self.result.robots_found = True
+        delay = parser.crawl_delay(self.user_agent)
+        if delay is None:
+            # RobotFileParser, Allow/Disallow satırı olmayan grupları (sadece Crawl-delay) atar
+            delay = _group_crawl_delay(text, self.user_agent)
+        if delay is not None:
+            self.result.crawl_delay = min(float(delay), MAX_CRAWL_DELAY)
+        return [urljoin(self.origin, url.strip()) for url in (parser.site_maps() or [])]
+
+    async def parse_sitemap(self, sitemap_url: str) -> List[str]:
+        """Sitemap'i indirirken ayrıştır; index ise alt sitemap URL'lerini döndür"""
+        children: List[str] = []
+        parser = etree.XMLPullParser(events=('end',), resolve_entities=False, no_network=True, huge_tree=False)
+        decompressor = None
+        received = 0
+        try:
+            async with self.session.get(sitemap_url, timeout=aiohttp.ClientTimeout(total=60), ssl=False) as response:
+                if response.status != 200:
+                    return children
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    if decompressor is None:
+                        # Sunucu Content-Encoding vermeden .gz gönderebilir: gzip imzasına bak
+                        gzipped = chunk[:2] == b'\x1f\x8b'
+                        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else False
+                    data = decompressor.decompress(chunk) if decompressor else chunk
+                    received += len(data)
+                    if received > MAX_SITEMAP_BYTES:
+                        self.result.errors.append(f"{sitemap_url}: larger than {MAX_SITEMAP_BYTES} bytes")
+                        break
+                    parser.feed(data)
+                    self._consume(parser, children)
+            parser.close()
+            self._consume(parser, children)
+        except etree.XMLSyntaxError as e:
+            self._consume(parser, children)
+            self.result.errors.append(f"{sitemap_url}: {e}")
+        except Exception as e:
+            self.result.errors.append(f"{sitemap_url}: {e}")
+            return children
+        self.result.sitemaps.append(sitemap_url)
+        return children
+
+    def _consume(self, parser: etree.XMLPullParser, children: List[str]) -> None:
+        for _, element in parser.read_events():
+            name = _localname(element.tag)
+            if name not in ('url', 'sitemap'):
+                continue
+            loc = lastmod = ''
+            for child in element:
+                child_name = _localname(child.tag)
+                if child_name == 'loc':
+                    loc = (child.text or '').strip()
+                elif child_name == 'lastmod':
+                    lastmod = child.text or ''
+            if loc:
+                if name == 'sitemap':
+                    children.append(urljoin(self.origin, loc))
+                else:
+                    self._add_url(loc, parse_lastmod(lastmod))
+            # Akış halinde ayrıştırma: işlenen elemanı ve önceki kardeşlerini bırak
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    def _add_url(self, url: str, lastmod: Optional[datetime]) -> None:
+        self.result.scanned += 1
+        if url in self._seen or not self.accept(url):
+            return
+        self._seen.add(url)
+        item = SitemapUrl(lastmod_priority(lastmod, self._now), url, lastmod)
+        entry = (-item.priority, -next(self._counter), item)
+        if len(self._heap) < self.max_urls:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            # Yığındaki en düşük öncelikliden daha iyi: onun yerine geç
+            heapq.heapreplace(self._heap, entry)
+
+
+async def discover_site(session: aiohttp.ClientSession, base_url: str, max_urls: int,
+                        accept: Optional[Callable[[str], bool]] = None, timeout: float = 20) -> DiscoveryResult:
+    """Keşfi zaman sınırıyla çalıştır; süre dolarsa o ana kadar bulunanlar döner"""
+    discovery = SiteDiscovery(session, base_url, max_urls=max_urls, accept=accept)
+    try:
+        return await asyncio.wait_for(discovery.discover(), timeout)
+    except asyncio.TimeoutError:
+        discovery.result.errors.append(f"discovery timed out after {timeout}s")
+        discovery.result.urls = discovery.best_urls()
+        return discovery.result
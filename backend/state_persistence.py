@@ -0,0 +1,307 @@
+"""
+İndirme Kuyruğu Durum Kaydı
+Durum (bölüm, kimlik) -> kayıt satırlarından oluşur; bölümler: active (ilerleme), queue,
+incomplete. Değişiklikler her seferinde yazılmaz: değişen anahtarlar kirli işaretlenir ve arka
+plan thread'i en fazla `interval` saniyede bir sadece onları depoya yazar. Yaşam döngüsü
+geçişlerinde (force) beklemeden yazılır; close() son durumu senkron yazar.
+
+Depolar:
+- SqliteStateStore (varsayılan): WAL modunda SQLite, kimlik ve duruma göre indeksli. Güncelleme
+  ve açılış maliyeti toplam indirme geçmişinden bağımsızdır (açılışta sadece bitmemiş satırlar okunur).
+- JsonStateStore: eski tek dosya biçimi; her yazımda dosya atomik olarak yeniden yazılır.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ('active', 'queue', 'incomplete')
+FINISHED_STATUSES = ('completed', 'failed')
+
+StateKey = Tuple[str, str]  # (bölüm, indirme kimliği)
+StateChanges = Dict[StateKey, Optional[Dict]]  # None: satırı sil
+
+
+def _encode(record: Dict) -> str:
+    return json.dumps(record, separators=(',', ':'), default=str)
+
+
+class StateStore(ABC):
+    """Durum deposu arayüzü"""
+
+    @abstractmethod
+    def load(self) -> Dict[str, Dict[str, Dict]]:
+        """Açılış durumu: bölüm -> {kimlik: kayıt}; bitmiş (completed/failed) ilerlemeler hariç"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def apply(self, changes: StateChanges) -> None:
+        """Satırları tek seferde ekle/güncelle/sil"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, section: str, download_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def find(self, status: str, limit: int = 100) -> List[Dict]:
+        """Duruma göre kayıtlar (en yeni önce)"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteStateStore(StateStore):
+    """WAL modunda SQLite: satır başına upsert, status indeksi"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS downloads (
+                section TEXT NOT NULL,
+                id TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT '',
+                position INTEGER NOT NULL DEFAULT 0,
+                data TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (section, id)
+            );
+            CREATE INDEX IF NOT EXISTS downloads_status ON downloads(status, updated_at);
+            CREATE INDEX IF NOT EXISTS downloads_live ON downloads(section)
+                WHERE status NOT IN ('completed', 'failed');
+            CREATE INDEX IF NOT EXISTS downloads_id ON downloads(id);
+        """)
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._db.execute('SELECT 1 FROM downloads LIMIT 1').fetchone() is None
+
+    def load(self) -> Dict[str, Dict[str, Dict]]:
+        state: Dict[str, Dict[str, Dict]] = {section: {} for section in SECTIONS}
+        with self._lock:
+            # Kısmi indeks (downloads_live) sadece aynı literal koşulla kullanılır. Kuyruk sırası
+            # ekleme sırasıdır (rowid): sıra pozisyonu değişince kuyruk satırları yeniden yazılmaz
+            rows = self._db.execute(
+                "SELECT section, id, data FROM downloads INDEXED BY downloads_live "
+                "WHERE status NOT IN ('completed', 'failed') ORDER BY section, rowid"
+            ).fetchall()
+        for section, download_id, data in rows:
+            if section in state:
+                state[section][download_id] = json.loads(data)
+        return state
+
+    def apply(self, changes: StateChanges) -> None:
+        now = time.time()
+        upserts, deletes = [], []
+        for (section, download_id), record in changes.items():
+            if record is None:
+                deletes.append((section, download_id))
+            else:
+                upserts.append((section, download_id, str(record.get('status', '')),
+                                int(record.get('queue_position') or 0), _encode(record), now))
+        with self._lock:
+            self._db.execute('BEGIN')
+            try:
+                self._db.executemany(
+                    'INSERT INTO downloads (section, id, status, position, data, updated_at) VALUES (?, ?, ?, ?, ?, ?) '
+                    'ON CONFLICT(section, id) DO UPDATE SET status = excluded.status, position = excluded.position, '
+                    'data = excluded.data, updated_at = excluded.updated_at', upserts
+                )
+                self._db.executemany('DELETE FROM downloads WHERE section = ? AND id = ?', deletes)
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+
+    def get(self, section: str, download_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._db.execute(
+                'SELECT data FROM downloads WHERE section = ? AND id = ?', (section, download_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find(self, status: str, limit: int = 100) -> List[Dict]:
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT id, data FROM downloads WHERE status = ? ORDER BY updated_at DESC LIMIT ?', (status, limit)
+            ).fetchall()
+        return [{'download_id': download_id, **json.loads(data)} for download_id, data in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class JsonStateStore(StateStore):
+    """Eski biçim: {'active': {...}, 'queue': [...], 'incomplete': {...}} tek JSON dosyası"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Dict]] = {section: {} for section in SECTIONS}
+        try:
+            if self.path.exists():
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                self._state['active'] = dict(data.get('active', {}))
+                self._state['incomplete'] = dict(data.get('incomplete', {}))
+                self._state['queue'] = {
+                    item['download_id']: item for item in data.get('queue', []) if item.get('download_id')
+                }
+        except Exception as e:
+            logger.error(f"Error loading download state from {self.path}: {e}")
+
+    def load(self) -> Dict[str, Dict[str, Dict]]:
+        with self._lock:
+            state = {section: dict(records) for section, records in self._state.items()}
+        state['active'] = {
+            download_id: record for download_id, record in state['active'].items()
+            if record.get('status') not in FINISHED_STATUSES
+        }
+        return state
+
+    def apply(self, changes: StateChanges) -> None:
+        with self._lock:
+            for (section, download_id), record in changes.items():
+                if record is None:
+                    self._state[section].pop(download_id, None)
+                else:
+                    self._state[section][download_id] = record
+            payload = _encode({
+                'active': {k: v for k, v in self._state['active'].items() if v.get('status') != 'completed'},
+                'queue': list(self._state['queue'].values()),  # Ekleme sırası
+                'incomplete': self._state['incomplete'],
+            })
+            fd, temp_path = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=str(self.path.parent))
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+
+    def get(self, section: str, download_id: str) -> Optional[Dict]:
+        with self._lock:
+            return self._state.get(section, {}).get(download_id)
+
+    def find(self, status: str, limit: int = 100) -> List[Dict]:
+        with self._lock:
+            records = [
+                {'download_id': download_id, **record}
+                for records in self._state.values() for download_id, record in records.items()
+                if record.get('status') == status
+            ]
+        return records[-limit:][::-1]
+
+
+def open_state_store(backend: str, sqlite_path: str, json_path: str) -> StateStore:
+    """`backend`: sqlite (varsayılan) veya json. SQLite ilk açılışta eski JSON durumunu içe aktarır"""
+    if backend == 'json':
+        return JsonStateStore(json_path)
+    store = SqliteStateStore(sqlite_path)
+    if store.is_empty() and Path(json_path).exists():
+        legacy = JsonStateStore(json_path)
+        changes: StateChanges = {
+            (section, download_id): record
+            for section, records in legacy._state.items() for download_id, record in records.items()
+        }
+        if changes:
+            store.apply(changes)
+            logger.info(f"Imported {len(changes)} download state records from {json_path}")
+    return store
+
+
+class WriteBehindWriter:
+    """Kirli anahtarları birleştirerek depoya yazar
+
+    `resolve(bölüm, kimlik)` yazım anındaki güncel kaydı döndürür (None: sil). İşaretleme her
+    thread'den (yt-dlp progress hook'u dahil) çağrılabilir.
+    """
+
+    def __init__(self, store: StateStore, resolve: Callable[[str, str], Optional[Dict]], interval: float = 0.5):
+        self.store = store
+        self.resolve = resolve
+        self.interval = max(0.0, interval)
+        self.writes = 0
+        self.requests = 0
+        self._dirty: set = set()
+        self._force = False
+        self._closed = False
+        self._last_write = 0.0
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='state-writer', daemon=True)
+        self._thread.start()
+
+    def save(self, keys: Iterable[StateKey], force: bool = False) -> None:
+        """Anahtarları kirli işaretle; `force` ise aralığı beklemeden yaz (engellemez)"""
+        with self._condition:
+            self.requests += 1
+            self._dirty.update(keys)
+            self._force = self._force or force
+            self._condition.notify()
+
+    def flush(self) -> None:
+        """Bekleyen değişiklikleri şimdi, çağıran thread'de yaz"""
+        with self._condition:
+            keys, self._dirty, self._force = self._dirty, set(), False
+        if keys:
+            self._write(keys)
+
+    def close(self) -> None:
+        """Yazıcı thread'ini durdur, son durumu yaz ve depoyu kapat (kapanışta)"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join(timeout=5)
+        self.flush()
+        self.store.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed:
+                    if self._dirty:
+                        wait = 0.0 if self._force else self._last_write + self.interval - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._condition.wait(wait)
+                    else:
+                        self._condition.wait()
+                if self._closed:
+                    return
+                keys, self._dirty, self._force = self._dirty, set(), False
+            self._write(keys)
+
+    def _write(self, keys: Iterable[StateKey]) -> None:
+        with self._write_lock:
+            self._last_write = time.monotonic()
+            try:
+                changes: StateChanges = {}
+                for section, download_id in keys:
+                    record = self.resolve(section, download_id)
+                    # Kayıt başka thread'de değişebilir: yazılacak kopyayı şimdi al
+                    changes[(section, download_id)] = dict(record) if record is not None else None
+                self.store.apply(changes)
+                self.writes += 1
+            except Exception as e:
+                logger.error(f"Error saving download state: {e}")
+                with self._condition:
+                    self._dirty.update(keys)  # Bir sonraki aralıkta tekrar dene
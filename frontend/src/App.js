@@ -1,10 +1,14 @@
-import { useState, useEffect, useCallback, useRef } from "react";
+import { useState, useEffect, useCallback } from "react";
 import "@/App.css";
 import axios from "axios";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || "http://localhost:8001";
 const API = `${BACKEND_URL}/api`;
 const BULK_VIDEO_REQUEST_DELAY_MS = 750;
+const DOWNLOAD_TERMINAL_STATUSES = ['completed', 'failed', 'removed'];
+const MAX_FINISHED_DOWNLOADS = 50;
+// Arayüz taramaları: hibrit motor, koşullu istek önbelleği ve robots.txt/sitemap keşfi açık
+const CRAWL_START_OPTIONS = { engine: "hybrid", use_cache: true, discover: true, max_per_host: 8 };
 
 // Stat Card
 const StatCard = ({ title, value, icon, color = "blue" }) => {
@@ -305,12 +309,11 @@ const YouTubeCard = ({ video, onDownload, downloadProgress, isDownloading }) =>
 };
 
 // Direct Video Downloader Component with Progress
-const DirectVideoDownloader = ({ queueStatus, onQueueUpdate }) => {
+const DirectVideoDownloader = ({ queueStatus }) => {
   const [url, setUrl] = useState("");
   const [loading, setLoading] = useState(false);
   const [videoInfo, setVideoInfo] = useState(null);
   const [activeDownloads, setActiveDownloads] = useState({});
-  const pollIntervalRef = useRef(null);
 
   const checkVideo = async () => {
     if (!url) return;
@@ -329,53 +332,36 @@ const DirectVideoDownloader = ({ queueStatus, onQueueUpdate }) => {
     setLoading(false);
   };
 
-  // Polling for download progress
+  // Download progress arrives via queueStatus (WebSocket push, polling fallback in App)
   useEffect(() => {
-    const pollProgress = async () => {
-      if (Object.keys(activeDownloads).length === 0) return;
-      
-      try {
-        const res = await axios.get(`${API}/download/queue-status`);
-        if (res.data && res.data.progress) {
-          // Update active downloads with new progress
-          const newActiveDownloads = { ...activeDownloads };
-          let hasChanges = false;
-          
-          for (const [downloadId, info] of Object.entries(activeDownloads)) {
-            const progress = res.data.progress[downloadId];
-            if (progress) {
-              newActiveDownloads[downloadId] = { ...info, progress };
-              hasChanges = true;
-              
-              // Check if completed
-              if (progress.status === 'completed' && progress.result?.download_url) {
-                window.open(`${API}${progress.result.download_url.replace('/api', '')}`, "_blank");
-                delete newActiveDownloads[downloadId];
-              } else if (progress.status === 'failed') {
-                alert(`İndirme başarısız: ${progress.result?.message || 'Bilinmeyen hata'}`);
-                delete newActiveDownloads[downloadId];
-              }
-            }
-          }
-          
-          if (hasChanges) {
-            setActiveDownloads(newActiveDownloads);
-          }
-          
-          if (onQueueUpdate) {
-            onQueueUpdate(res.data);
-          }
-        }
-      } catch (e) {
-        console.error('Progress poll error:', e);
+    if (!queueStatus || Object.keys(activeDownloads).length === 0) return;
+
+    const newActiveDownloads = { ...activeDownloads };
+    let hasChanges = false;
+
+    for (const [downloadId, info] of Object.entries(activeDownloads)) {
+      const progress = queueStatus.progress?.[downloadId] || queueStatus.finished?.[downloadId];
+      if (!progress) continue;
+
+      // Check if completed
+      if (progress.status === 'completed' && progress.result?.download_url) {
+        window.open(`${API}${progress.result.download_url.replace('/api', '')}`, "_blank");
+        delete newActiveDownloads[downloadId];
+        hasChanges = true;
+      } else if (progress.status === 'failed') {
+        alert(`İndirme başarısız: ${progress.result?.message || 'Bilinmeyen hata'}`);
+        delete newActiveDownloads[downloadId];
+        hasChanges = true;
+      } else if (progress !== info.progress) {
+        newActiveDownloads[downloadId] = { ...info, progress };
+        hasChanges = true;
       }
-    };
+    }
 
-    if (Object.keys(activeDownloads).length > 0) {
-      pollIntervalRef.current = setInterval(pollProgress, 1000);
-      return () => clearInterval(pollIntervalRef.current);
+    if (hasChanges) {
+      setActiveDownloads(newActiveDownloads);
     }
-  }, [activeDownloads, onQueueUpdate]);
+  }, [queueStatus, activeDownloads]);
 
   const downloadVideo = async (format) => {
     try {
@@ -694,7 +680,11 @@ function App() {
     setSelectedVideos(new Set());
     
     try {
-      await axios.post(`${API}/crawl/start`, { target_url: targetUrl, max_pages: maxPages });
+      await axios.post(`${API}/crawl/start`, {
+        target_url: targetUrl,
+        max_pages: maxPages,
+        ...CRAWL_START_OPTIONS
+      });
       setCrawlStatus({ ...crawlStatus, status: "starting", message: "Başlatılıyor..." });
     } catch (e) {
       alert("Hata: " + e.message);
@@ -715,10 +705,10 @@ function App() {
     }
     setDownloading(true);
     try {
-      const res = await axios.post(`${API}/download/images`, { urls: Array.from(selectedImages) });
+      // Akışlı ZIP: görseller sunucuda diske yazılmadan indirme sırasında çekilir
+      const res = await axios.post(`${API}/download/images`, { urls: Array.from(selectedImages), stream: true });
       if (res.data.success) {
-        window.open(`${API}/download/file/${res.data.download_id}`, "_blank");
-        alert(`${res.data.files_count} dosya indirildi!`);
+        window.open(`${API}/download/images/${res.data.download_id}/stream`, "_blank");
       } else {
         alert("İndirme başarısız");
       }
@@ -778,7 +768,7 @@ function App() {
   const fetchDownloadQueue = useCallback(async () => {
     try {
       const res = await axios.get(`${API}/download/queue-status`);
-      setDownloadQueue(res.data);
+      setDownloadQueue(prev => ({ ...res.data, finished: prev?.finished || {} }));
       
       // Update video download progress
       if (res.data.progress) {
@@ -897,12 +887,72 @@ function App() {
     return () => clearInterval(interval);
   }, [fetchStatus]);
 
-  // Download queue polling
+  // Apply a pushed download state (topic "downloads" or "download:<id>")
+  const applyDownloadEvent = useCallback((topic, state) => {
+    setDownloadQueue(prev => {
+      if (topic === 'downloads') return { ...(prev || {}), ...state };
+      const id = topic.slice('download:'.length);
+      const progress = { ...(prev?.progress || {}) };
+      const finished = { ...(prev?.finished || {}) };
+      if (DOWNLOAD_TERMINAL_STATUSES.includes(state.status)) {
+        delete progress[id];
+        if (state.status !== 'removed') finished[id] = state;
+        const ids = Object.keys(finished);
+        ids.slice(0, Math.max(0, ids.length - MAX_FINISHED_DOWNLOADS)).forEach(oldId => delete finished[oldId]);
+      } else {
+        progress[id] = state;
+      }
+      return { ...(prev || {}), progress, finished };
+    });
+  }, []);
+
+  // Download progress over WebSocket (subscribed topics only, full state then deltas)
+  const [socketConnected, setSocketConnected] = useState(false);
+  useEffect(() => {
+    let ws = null;
+    let retryTimer = null;
+    let closed = false;
+    const states = {};
+
+    const connect = () => {
+      ws = new WebSocket(`${BACKEND_URL.replace(/^http/, 'ws')}/api/ws/progress`);
+      ws.onopen = () => {
+        setSocketConnected(true);
+        ws.send(JSON.stringify({ action: 'subscribe', topics: ['downloads', 'download:*'] }));
+      };
+      ws.onmessage = (event) => {
+        const msg = JSON.parse(event.data);
+        if (!msg.topic) return;
+        const state = msg.state ? { ...msg.state } : { ...(states[msg.topic] || {}) };
+        for (const [key, value] of Object.entries(msg.delta || {})) {
+          if (value === null) delete state[key];
+          else state[key] = value;
+        }
+        // Terminal states end the topic; the server sends a full state next time
+        if (DOWNLOAD_TERMINAL_STATUSES.includes(state.status)) delete states[msg.topic];
+        else states[msg.topic] = state;
+        applyDownloadEvent(msg.topic, state);
+      };
+      ws.onclose = () => {
+        setSocketConnected(false);
+        if (!closed) retryTimer = setTimeout(connect, 3000);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      if (ws) ws.close();
+    };
+  }, [applyDownloadEvent]);
+
+  // Download queue polling: full resync; only a slow fallback while the socket is connected
   useEffect(() => {
     fetchDownloadQueue();
-    const interval = setInterval(fetchDownloadQueue, 1500);
+    const interval = setInterval(fetchDownloadQueue, socketConnected ? 15000 : 1500);
     return () => clearInterval(interval);
-  }, [fetchDownloadQueue]);
+  }, [fetchDownloadQueue, socketConnected]);
 
   useEffect(() => {
     if (crawlStatus.status === "completed") {
@@ -1044,7 +1094,7 @@ function App() {
               onDeleteIncomplete={deleteIncompleteDownload}
             />
             
-            <DirectVideoDownloader queueStatus={downloadQueue} onQueueUpdate={setDownloadQueue} />
+            <DirectVideoDownloader queueStatus={downloadQueue} />
             <DirectImageDownloader />
             
             <div className="bg-gray-800 rounded-xl p-6 border border-gray-700">
@@ -1117,7 +1167,7 @@ function App() {
             />
             
             {/* Direct Video Downloader */}
-            <DirectVideoDownloader queueStatus={downloadQueue} onQueueUpdate={setDownloadQueue} />
+            <DirectVideoDownloader queueStatus={downloadQueue} />
             
             <div className="bg-yellow-900/30 border border-yellow-700 rounded-lg p-4 mb-4">
               <p className="text-yellow-400 font-semibold">⚠️ Video İndirme</p>
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Backend modülleri düz (flat) import edilir: `from asset_probe import ...`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,72 @@
+import asyncio
+
+from asset_probe import AssetProbeCache
+
+
+class FakeResponse:
+    def __init__(self, status=200, headers=None):
+        self.status = status
+        self.headers = headers or {'content-length': '2048', 'content-type': 'image/png'}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    """İlk HEAD isteği `release` set edilene kadar bekler, sonrakiler hemen döner"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.started = asyncio.Event()
+
+    def head(self, url, **kwargs):
+        self.calls += 1
+        first = self.calls == 1
+        session = self
+
+        class Request:
+            async def __aenter__(self):
+                if first:
+                    session.started.set()
+                    await session.release.wait()
+                return FakeResponse()
+
+            async def __aexit__(self, *exc):
+                return False
+
+        return Request()
+
+
+def test_coalesced_probe_single_request():
+    async def scenario():
+        session = FakeSession()
+        cache = AssetProbeCache(session)
+        session.release.set()
+        results = await cache.probe_many(['https://example.com/a.png'] * 5)
+        assert session.calls == 1
+        assert results['https://example.com/a.png'].size_kb == 2
+
+    asyncio.run(scenario())
+
+
+def test_waiter_survives_owner_cancellation():
+    async def scenario():
+        session = FakeSession()
+        cache = AssetProbeCache(session)
+        url = 'https://example.com/a.png'
+        owner = asyncio.create_task(cache.probe(url))
+        await session.started.wait()
+        waiter = asyncio.create_task(cache.probe(url))
+        await asyncio.sleep(0)
+        owner.cancel()
+        result = await asyncio.wait_for(waiter, timeout=1)
+        assert result.status == 200
+        assert owner.cancelled()
+        assert session.calls == 2  # Bekleyen isteği kendisi yeniden gönderdi
+        assert url not in cache._in_flight
+
+    asyncio.run(scenario())
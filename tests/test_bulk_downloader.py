@@ -0,0 +1,65 @@
+import asyncio
+import io
+import zipfile
+
+from aiohttp import web
+
+from bulk_downloader import CHUNK_SIZE, BulkImageDownloader
+
+BODY = bytes(range(256)) * (16 * CHUNK_SIZE // 256)  # 1 MB: tek okumada tampona sığmaz
+
+
+async def _serve():
+    async def image(request):
+        return web.Response(body=BODY, content_type='image/jpeg')
+
+    app = web.Application()
+    app.router.add_get('/img/{name}', image)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def test_stream_survives_consumer_slower_than_timeout(tmp_path):
+    async def scenario():
+        runner, base = await _serve()
+        try:
+            # timeout=0.3: toplam süre sınırı olsaydı gövdeler okunurken yarıda kesilirdi
+            downloader = BulkImageDownloader(str(tmp_path), concurrency=2, retries=0, timeout=0.3)
+            job = downloader.create_job([f"{base}/img/{n}.jpg" for n in range(3)])
+            archive = io.BytesIO()
+            async for chunk in downloader.stream(job):
+                archive.write(chunk)
+                await asyncio.sleep(0.03)  # Yavaş istemci: toplam ~1.5 sn
+            return job, archive
+        finally:
+            await runner.cleanup()
+
+    job, archive = asyncio.run(scenario())
+    assert job.status == 'completed'
+    assert job.errors == [] and job.failed == 0
+    with zipfile.ZipFile(archive) as zf:
+        assert sorted(zf.namelist()) == ['0.jpg', '1.jpg', '2.jpg']
+        assert all(zf.read(name) == BODY for name in zf.namelist())
+
+
+def test_run_writes_zip_to_disk(tmp_path):
+    async def scenario():
+        runner, base = await _serve()
+        try:
+            downloader = BulkImageDownloader(str(tmp_path), concurrency=2, retries=0)
+            job = downloader.create_job([f"{base}/img/a.jpg", f"{base}/img/a.jpg", f"{base}/missing"])
+            return await downloader.run(job)
+        finally:
+            await runner.cleanup()
+
+    job = asyncio.run(scenario())
+    assert job.status == 'completed'
+    assert job.total == 2 and job.completed == 1 and job.failed == 1
+    assert job.errors == [{'url': job.urls[1], 'error': 'HTTP 404'}]
+    with zipfile.ZipFile(tmp_path / f"{job.job_id}.zip") as zf:
+        assert zf.read('a.jpg') == BODY
+    assert not (tmp_path / f"{job.job_id}.files").exists()
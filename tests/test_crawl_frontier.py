@@ -0,0 +1,83 @@
+import asyncio
+
+from crawl_frontier import SITEMAP_PRIORITY, CrawlFrontier
+
+
+async def _drain(frontier):
+    urls = []
+    while (entry := await frontier.get()) is not None:
+        urls.append(entry.url)
+        frontier.task_done()
+    return urls
+
+
+def test_priority_orders_by_depth_then_path_then_insertion():
+    async def scenario():
+        frontier = CrawlFrontier(path_priorities={'/urunler': -5, '/blog': 5})
+        frontier.add('https://a.test/blog/1', depth=1)  # 1 + 5
+        frontier.add('https://a.test/x', depth=2)  # 2
+        frontier.add('https://a.test/y', depth=2)  # 2, x'ten sonra eklendi
+        frontier.add('https://a.test/urunler/1', depth=3)  # 3 - 5
+        frontier.add('https://a.test/a', depth=1)  # 1
+        frontier.add('https://a.test/sitemap-url', depth=4, priority=SITEMAP_PRIORITY)
+        return await _drain(frontier)
+
+    assert asyncio.run(scenario()) == [
+        'https://a.test/sitemap-url', 'https://a.test/urunler/1', 'https://a.test/a',
+        'https://a.test/x', 'https://a.test/y', 'https://a.test/blog/1',
+    ]
+
+
+def test_add_rejects_seen_and_too_deep_urls():
+    frontier = CrawlFrontier(max_depth=1)
+    assert frontier.add('https://a.test/', 0)
+    assert not frontier.add('https://a.test/', 1)
+    assert not frontier.add('https://a.test/deep', 2)
+    assert len(frontier) == 1 and 'https://a.test/' in frontier
+
+
+def test_get_waits_for_in_flight_work_then_returns_none():
+    async def scenario():
+        frontier = CrawlFrontier()
+        frontier.add('https://a.test/', 0)
+        entry = await frontier.get()
+        assert frontier.in_flight == 1
+
+        # Kuyruk boş ama bir URL hâlâ işleniyor: ikinci worker beklemeli
+        waiting = asyncio.create_task(frontier.get())
+        await asyncio.sleep(0)
+        assert not waiting.done()
+
+        # İşlenen sayfa yeni link üretir: bekleyen worker onu alır
+        frontier.add('https://a.test/child', entry.depth + 1)
+        child = await asyncio.wait_for(waiting, 1)
+        assert child.url == 'https://a.test/child'
+        frontier.task_done()
+
+        last = asyncio.create_task(frontier.get())
+        await asyncio.sleep(0)
+        assert not last.done()
+        frontier.task_done()  # Son iş bitti, yeni URL yok: tarama sonu
+        assert await asyncio.wait_for(last, 1) is None
+        assert frontier.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_close_releases_waiters_and_rejects_new_urls():
+    async def scenario():
+        frontier = CrawlFrontier()
+        frontier.add('https://a.test/', 0)
+        frontier.add('https://a.test/b', 1)
+        await frontier.get()
+        waiters = [asyncio.create_task(frontier.get()) for _ in range(3)]
+        await asyncio.sleep(0)
+        frontier.close()
+        results = await asyncio.wait_for(asyncio.gather(*waiters), 1)
+        # İlk worker kuyruktaki /b'yi alır; kapatınca bekleyenler None alır
+        assert results[0].url == 'https://a.test/b' and results[1:] == [None, None]
+        assert frontier.closed and len(frontier) == 0
+        assert not frontier.add('https://a.test/new', 1)
+        assert await frontier.get() is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,87 @@
+import os
+
+from media_store import MediaStore
+
+
+def _store(tmp_path):
+    return MediaStore(str(tmp_path / 'store'), str(tmp_path / 'names'))
+
+
+def _source(tmp_path, data, name='source.part'):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def _refcount(store, digest):
+    row = store._db.execute('SELECT refcount FROM objects WHERE hash = ?', (digest,)).fetchone()
+    return row[0] if row else None
+
+
+def test_put_file_links_name_and_lookup_finds_url(tmp_path):
+    store = _store(tmp_path)
+    source = _source(tmp_path, b'image-1')
+    stored = store.put_file(source, url='https://a.test/x.jpg', name='x.jpg', content_type='image/jpeg')
+
+    assert not os.path.exists(source)
+    assert stored.name == 'x.jpg' and stored.size == 7 and not stored.deduplicated
+    assert os.path.samefile(tmp_path / 'names' / 'x.jpg', stored.path)
+    assert _refcount(store, stored.hash) == 1
+
+    found = store.lookup('https://a.test/x.jpg')
+    assert (found.hash, found.name, found.content_type) == (stored.hash, 'x.jpg', 'image/jpeg')
+    assert store.lookup('https://a.test/x.jpg', variant='thumb') is None
+    assert store.hits == 1
+
+
+def test_release_keeps_object_until_last_name(tmp_path):
+    store = _store(tmp_path)
+    first = store.put_file(_source(tmp_path, b'same'), url='https://a.test/1.jpg', name='one.jpg')
+    second = store.put_file(_source(tmp_path, b'same'), url='https://b.test/2.jpg', name='two.jpg')
+
+    assert second.deduplicated and second.hash == first.hash and second.path == first.path
+    assert _refcount(store, first.hash) == 2
+    assert store.stats()['objects'] == 1 and store.stats()['names'] == 2
+
+    assert store.release('one.jpg')
+    assert not (tmp_path / 'names' / 'one.jpg').exists()
+    assert os.path.exists(first.path) and _refcount(store, first.hash) == 1
+    assert store.lookup('https://a.test/1.jpg', link=False) is not None
+
+    assert store.release('two.jpg')
+    assert not os.path.exists(first.path) and _refcount(store, first.hash) is None
+    assert store.lookup('https://a.test/1.jpg') is None and store.lookup('https://b.test/2.jpg') is None
+    assert not store.release('two.jpg')
+
+
+def test_link_name_adds_suffix_on_collision(tmp_path):
+    store = _store(tmp_path)
+    first = store.put_file(_source(tmp_path, b'first'), name='photo.jpg')
+    second = store.put_file(_source(tmp_path, b'second'), name='photo.jpg')
+    again = store.put_file(_source(tmp_path, b'first'), name='photo.jpg')
+    # Depo dışından konmuş dosya da çakışma sayılır, üzerine yazılmaz
+    (tmp_path / 'names' / 'other.jpg').write_bytes(b'user file')
+    third = store.put_file(_source(tmp_path, b'third'), name='other.jpg')
+
+    assert (first.name, second.name, again.name, third.name) == ('photo.jpg', 'photo_1.jpg', 'photo.jpg', 'other_1.jpg')
+    assert _refcount(store, first.hash) == 1
+    assert (tmp_path / 'names' / 'other.jpg').read_bytes() == b'user file'
+    assert (tmp_path / 'names' / 'photo_1.jpg').read_bytes() == b'second'
+
+
+def test_lookup_relinks_missing_name_and_forgets_missing_object(tmp_path):
+    store = _store(tmp_path)
+    stored = store.put_file(_source(tmp_path, b'video'), url='https://a.test/v.mp4', name='v.mp4')
+    cached = store.put_file(_source(tmp_path, b'zip-only'), url='https://a.test/z.png', link=False)
+    assert cached.name == '' and _refcount(store, cached.hash) == 0
+    assert store.lookup('https://a.test/z.png', link=False).name == ''
+
+    (tmp_path / 'names' / 'v.mp4').unlink()
+    assert store.lookup('https://a.test/v.mp4').name == 'v.mp4'
+    assert os.path.samefile(tmp_path / 'names' / 'v.mp4', stored.path)
+    assert _refcount(store, stored.hash) == 1
+
+    os.unlink(stored.path)
+    assert store.lookup('https://a.test/v.mp4') is None
+    assert not (tmp_path / 'names' / 'v.mp4').exists()
+    assert store.stats()['objects'] == 1
@@ -0,0 +1,179 @@
+"""MongoFrontier kiralama davranışı: bellek içi motor koleksiyonu taklidiyle (canlı MongoDB gerekmez)"""
+
+import asyncio
+import copy
+
+import mongo_frontier
+from mongo_frontier import CRAWLS_COLLECTION, MongoFrontier
+from pymongo import ReturnDocument
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op == '$lt' and not (value is not None and value < operand):
+                    return False
+                if op == '$in' and value not in operand:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _apply(doc, update):
+    doc.update(update.get('$set', {}))
+    for key, amount in update.get('$inc', {}).items():
+        doc[key] = doc.get(key, 0) + amount
+
+
+class Result:
+    def __init__(self, modified_count=0, upserted_count=0):
+        self.modified_count = modified_count
+        self.upserted_count = upserted_count
+
+
+class FakeCollection:
+    """Frontier'ın kullandığı motor metotlarının bellek içi karşılığı"""
+
+    def __init__(self):
+        self.docs = []
+
+    def _find(self, query, sort=None):
+        docs = [doc for doc in self.docs if _matches(doc, query)]
+        for key, direction in reversed(sort or []):
+            docs.sort(key=lambda doc: doc.get(key), reverse=direction < 0)
+        return docs
+
+    async def find_one(self, query, projection=None):
+        docs = self._find(query)
+        return copy.deepcopy(docs[0]) if docs else None
+
+    async def find_one_and_update(self, query, update, sort=None, return_document=ReturnDocument.BEFORE):
+        docs = self._find(query, sort)
+        if not docs:
+            return None
+        before = copy.deepcopy(docs[0])
+        _apply(docs[0], update)
+        return copy.deepcopy(docs[0]) if return_document == ReturnDocument.AFTER else before
+
+    async def update_one(self, query, update):
+        docs = self._find(query)
+        if docs:
+            _apply(docs[0], update)
+        return Result(modified_count=len(docs[:1]))
+
+    async def update_many(self, query, update):
+        docs = self._find(query)
+        for doc in docs:
+            _apply(doc, update)
+        return Result(modified_count=len(docs))
+
+    async def insert_missing(self, documents, key_fields):
+        """Frontier'ın upsert + $setOnInsert toplu yazımının karşılığı"""
+        inserted = 0
+        for doc in documents:
+            if not self._find({key: doc[key] for key in key_fields}):
+                self.docs.append(copy.deepcopy(doc))
+                inserted += 1
+        return inserted
+
+    def aggregate(self, pipeline):
+        match = pipeline[0]['$match']
+        counts = {}
+        for doc in self._find(match):
+            counts[doc['state']] = counts.get(doc['state'], 0) + 1
+
+        async def rows():
+            for state, n in counts.items():
+                yield {'_id': state, 'n': n}
+        return rows()
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        collection = self[name] = FakeCollection()
+        return collection
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeFrontier(MongoFrontier):
+    """Toplu upsert'i (pymongo işlem nesneleri) taklit koleksiyona yönlendirir"""
+
+    async def _insert_missing(self, documents):
+        return await self.collection.insert_missing(documents, ('crawl_id', 'url'))
+
+
+def _setup(monkeypatch, max_pages=None):
+    clock = Clock()
+    monkeypatch.setattr(mongo_frontier, 'time', clock)
+    db = FakeDB()
+    db[CRAWLS_COLLECTION].docs.append({'_id': 'c1', 'leased': 0})
+    frontier = FakeFrontier(db, 'c1', max_pages=max_pages, visibility_timeout=60, max_attempts=2)
+    return db, frontier, clock
+
+
+def test_expired_lease_is_redelivered(monkeypatch):
+    async def scenario():
+        db, frontier, clock = _setup(monkeypatch)
+        assert await frontier.add_many([('https://a.test/', 0, 0), ('https://a.test/', 0, 0)]) == 1
+
+        first = await frontier.lease('w1')
+        assert first['url'] == 'https://a.test/' and first['lease_owner'] == 'w1'
+        assert await frontier.lease('w2') is None  # Süre dolmadan başkasına verilmez
+        assert not await frontier.is_finished()
+
+        clock.now += 61  # w1 çöktü: görünürlük süresi doldu
+        again = await frontier.lease('w2')
+        assert again['url'] == 'https://a.test/' and again['lease_owner'] == 'w2'
+        assert again['attempts'] == 2
+
+        # Eski sahibin tamamlaması kabul edilmez, yeni sahibinki edilir
+        assert await frontier.complete_many(['https://a.test/'], 'w1') == 0
+        assert await frontier.complete_many(['https://a.test/'], 'w2') == 1
+        assert await frontier.is_finished()
+
+    asyncio.run(scenario())
+
+
+def test_lease_fails_after_max_attempts(monkeypatch):
+    async def scenario():
+        db, frontier, clock = _setup(monkeypatch)
+        await frontier.add_many([('https://a.test/x', 1, 0)])
+        await frontier.lease('w1')
+        clock.now += 61
+        await frontier.lease('w2')
+        clock.now += 61
+        assert await frontier.lease('w3') is None  # 3. deneme max_attempts'ı aşar
+        assert (await frontier.counts())['failed'] == 1
+        assert await frontier.is_finished()
+
+    asyncio.run(scenario())
+
+
+def test_release_requeues_and_budget_limits_finish(monkeypatch):
+    async def scenario():
+        db, frontier, clock = _setup(monkeypatch, max_pages=1)
+        await frontier.add_many([('https://a.test/1', 0, 0), ('https://a.test/2', 1, 1)])
+
+        entry = await frontier.lease('w1')
+        await frontier.release(entry['url'], 'w1', entry['attempts'])
+        assert (await frontier.counts())['pending'] == 2
+        assert db[CRAWLS_COLLECTION].docs[0]['leased'] == 0  # Bütçe geri verildi
+
+        entry = await frontier.lease('w2')
+        assert entry['url'] == 'https://a.test/1'
+        await frontier.complete_many([entry['url']], 'w2')
+        # Bütçe (max_pages=1) bitti: bekleyen URL kalsa da tarama biter
+        assert await frontier.lease('w2') is None
+        assert await frontier.is_finished()
+
+    asyncio.run(scenario())
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+
+from progress_bridge import ProgressBridge
+
+
+class Recorder:
+    """apply() çağrılarını ve çağrıldıkları thread'i kaydeder"""
+
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def __call__(self, download_id, event):
+        self.calls.append((download_id, dict(event)))
+        self.threads.add(threading.get_ident())
+
+
+async def _in_thread(target):
+    thread = threading.Thread(target=target)
+    thread.start()
+    await asyncio.to_thread(thread.join)
+
+
+def test_events_from_worker_thread_are_throttled_and_latest_wins():
+    recorder = Recorder()
+    bridge = ProgressBridge(recorder, max_rate=10)
+
+    async def scenario():
+        hook = bridge.hook('d')
+
+        def download():
+            for done in range(200):
+                hook({'status': 'downloading', 'downloaded_bytes': done, 'info_dict': {'big': 'x' * 1000}})
+                time.sleep(0.0025)
+
+        started = time.monotonic()
+        await _in_thread(download)
+        elapsed = time.monotonic() - started
+        await asyncio.sleep(0.25)  # Bekleyen son teslim
+        return elapsed, threading.get_ident()
+
+    elapsed, loop_thread = asyncio.run(scenario())
+    assert bridge.received == 200
+    # Saniyede en fazla 10 teslim (+ ilk olay ve sondaki bekleyen teslim)
+    assert 2 <= bridge.delivered == len(recorder.calls) <= elapsed * 10 + 2
+    assert recorder.threads == {loop_thread}
+    last = recorder.calls[-1][1]
+    assert last['downloaded_bytes'] == 199 and 'info_dict' not in last
+    assert len(bridge.recent('d')) == 32 and bridge.latest('d')['downloaded_bytes'] == 199
+
+
+def test_finished_and_error_are_delivered_without_waiting():
+    recorder = Recorder()
+    bridge = ProgressBridge(recorder, max_rate=0.5)  # Normal olaylar 2 sn'de bir
+
+    async def scenario():
+        hooks = {download_id: bridge.hook(download_id) for download_id in ('ok', 'bad')}
+        await _in_thread(lambda: [hook({'status': 'downloading', 'downloaded_bytes': 1}) for hook in hooks.values()])
+        await asyncio.sleep(0.05)
+
+        def finish():
+            for download_id, final in (('ok', 'finished'), ('bad', 'error')):
+                hooks[download_id]({'status': 'downloading', 'downloaded_bytes': 2})
+                hooks[download_id]({'status': final})
+
+        await _in_thread(finish)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    # İlk olay hemen, ara olay bekletilir; bitiş durumu beklemeden iletilir ve bekleyeni geçersiz kılar
+    for download_id, final in (('ok', 'finished'), ('bad', 'error')):
+        statuses = [event['status'] for key, event in recorder.calls if key == download_id]
+        assert statuses == ['downloading', final]
+    assert bridge.received == 6 and bridge.delivered == 4
+
+
+def test_close_delivers_pending_event_and_ignores_later_ones():
+    recorder = Recorder()
+    bridge = ProgressBridge(recorder, max_rate=0.5)
+
+    async def scenario():
+        hook = bridge.hook('d')
+        await _in_thread(lambda: hook({'status': 'downloading', 'downloaded_bytes': 0}))
+        await asyncio.sleep(0.05)
+        await _in_thread(lambda: [hook({'status': 'downloading', 'downloaded_bytes': n}) for n in (1, 2)])
+        await asyncio.sleep(0.05)
+        assert [event['downloaded_bytes'] for _, event in recorder.calls] == [0]
+
+        bridge.close('d')
+        assert [event['downloaded_bytes'] for _, event in recorder.calls] == [0, 2]
+
+        # Kapandıktan sonra gelen geç olay (ör. yt-dlp son hook'u) tamamlanmanın üzerine yazmaz
+        await _in_thread(lambda: hook({'status': 'downloading', 'downloaded_bytes': 99}))
+        bridge.publish('d', {'status': 'finished'})
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert len(recorder.calls) == 2 and bridge.delivered == 2
+    assert bridge.latest('d') is None and bridge.recent('d') == []
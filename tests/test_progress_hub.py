@@ -0,0 +1,164 @@
+import asyncio
+import json
+
+import progress_hub
+from progress_hub import ProgressHub
+
+
+class FakeWebSocket:
+    """send_json, `gate` açılana kadar bekler (yavaş istemci)"""
+
+    def __init__(self, blocked: bool = False):
+        self.sent = []
+        self.closed = False
+        self.gate = asyncio.Event()
+        if not blocked:
+            self.gate.set()
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        await self.gate.wait()
+        self.sent.append(message)
+
+    async def close(self):
+        self.closed = True
+
+
+async def _settle(condition=None, timeout=1.0):
+    """Gönderici task'larının çalışmasına izin ver; `condition` verilirse sağlanana kadar bekle"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    await asyncio.sleep(0.01)
+    while condition is not None and not condition() and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+async def _client(hub, *topics, blocked=False):
+    websocket = FakeWebSocket(blocked)
+    subscriber = await hub.connect(websocket)
+    if topics:
+        await hub.handle_message(subscriber, json.dumps({'action': 'subscribe', 'topics': list(topics)}))
+    return subscriber, websocket
+
+
+def test_slow_client_gets_latest_state_per_topic_without_blocking_others():
+    async def scenario():
+        hub = ProgressHub()
+        slow, slow_ws = await _client(hub, 'download:a', 'download:b', blocked=True)
+        fast, fast_ws = await _client(hub, 'download:a', 'download:b')
+
+        hub.publish('download:b', {'status': 'downloading', 'progress': 1})
+        for progress in range(1, 11):
+            hub.publish('download:a', {'status': 'downloading', 'progress': progress})
+            await asyncio.sleep(0.01)
+        fast_count = len(fast_ws.sent)
+        stalled = (len(slow_ws.sent), set(slow.pending))
+
+        slow_ws.gate.set()  # Takılı gönderim (download:b) biter, kuyrukta a'nın sadece son durumu vardır
+        await _settle(lambda: not slow.pending)
+        for subscriber in (slow, fast):
+            hub.disconnect(subscriber)
+        return fast_count, stalled, slow_ws.sent, slow.coalesced, hub.stats()
+
+    fast_count, stalled, slow_sent, coalesced, stats = asyncio.run(scenario())
+    assert fast_count == 11
+    assert stalled == (0, {'download:a'})
+    assert slow_sent == [
+        {'topic': 'download:b', 'state': {'status': 'downloading', 'progress': 1}},
+        {'topic': 'download:a', 'state': {'status': 'downloading', 'progress': 10}},
+    ]
+    assert coalesced == 9 and stats['published'] == 11
+
+
+def test_state_then_delta_and_reset_after_terminal_status():
+    async def scenario():
+        hub = ProgressHub()
+        subscriber, websocket = await _client(hub, 'download:x')
+        for state in (
+            {'status': 'downloading', 'progress': 1, 'speed': '1 MB/s'},
+            {'status': 'downloading', 'progress': 2},
+            {'status': 'downloading', 'progress': 2},  # Değişiklik yok: mesaj gönderilmez
+            {'status': 'completed', 'progress': 100},
+            {'status': 'queued'},  # Yeniden indirme: delta tabanı sıfırlandı
+        ):
+            hub.publish('download:x', state)
+            await _settle()
+        hub.disconnect(subscriber)
+        return websocket.sent
+
+    assert asyncio.run(scenario()) == [
+        {'topic': 'download:x', 'state': {'status': 'downloading', 'progress': 1, 'speed': '1 MB/s'}},
+        {'topic': 'download:x', 'delta': {'progress': 2, 'speed': None}},
+        {'topic': 'download:x', 'delta': {'status': 'completed', 'progress': 100}},
+        {'topic': 'download:x', 'state': {'status': 'queued'}},
+    ]
+
+
+def test_legacy_clients_receive_raw_crawl_and_image_states():
+    async def scenario():
+        hub = ProgressHub()
+        subscriber, websocket = await _client(hub)
+        hub.publish('crawl:1', {'type': 'crawl', 'status': 'running'})
+        hub.publish('download:2', {'status': 'downloading'})
+        hub.publish('image_download:3', {'type': 'image_download', 'status': 'running'})
+        await _settle(lambda: len(websocket.sent) == 2)
+        legacy = list(websocket.sent)
+
+        # İlk subscribe mesajıyla yeni biçime geçilir; eski konulara abonelik kalkar
+        await hub.handle_message(subscriber, json.dumps({'action': 'subscribe', 'topics': ['download:2']}))
+        hub.publish('crawl:1', {'type': 'crawl', 'status': 'running', 'pages': 5})
+        await _settle(lambda: len(websocket.sent) == 3)
+        hub.disconnect(subscriber)
+        return legacy, websocket.sent[2:], subscriber.topics
+
+    legacy, after, topics = asyncio.run(scenario())
+    assert legacy == [{'type': 'crawl', 'status': 'running'}, {'type': 'image_download', 'status': 'running'}]
+    assert after == [{'topic': 'download:2', 'state': {'status': 'downloading'}}]
+    assert topics == {'download:2'}
+
+
+def test_prefix_subscription_sends_retained_snapshot():
+    async def scenario():
+        hub = ProgressHub()
+        hub.publish('download:a', {'status': 'downloading', 'progress': 5})
+        hub.publish('download:b', {'status': 'completed'})
+        hub.publish('crawl:c', {'status': 'completed', 'pages': 3})
+        hub.publish('downloads', {'active': 1})
+
+        subscriber, websocket = await _client(hub, 'download:*', 'crawl:c')
+        await _settle(lambda: len(websocket.sent) == 2)
+        snapshot = list(websocket.sent)
+
+        hub.publish('download:new', {'status': 'queued'})
+        await _settle(lambda: len(websocket.sent) == 3)
+        await hub.handle_message(subscriber, json.dumps({'action': 'unsubscribe', 'topics': ['download:*']}))
+        hub.publish('download:a', {'status': 'downloading', 'progress': 6})
+        await _settle()
+        hub.disconnect(subscriber)
+        return snapshot, websocket.sent[2:]
+
+    snapshot, later = asyncio.run(scenario())
+    # Önek aboneliğinde bitmiş konular atlanır; tam konu aboneliği son durumu her zaman alır
+    assert snapshot == [
+        {'topic': 'download:a', 'state': {'status': 'downloading', 'progress': 5}},
+        {'topic': 'crawl:c', 'state': {'status': 'completed', 'pages': 3}},
+    ]
+    assert later == [{'topic': 'download:new', 'state': {'status': 'queued'}}]
+
+
+def test_stuck_client_is_disconnected_after_send_timeout(monkeypatch):
+    monkeypatch.setattr(progress_hub, 'SEND_TIMEOUT', 0.05)
+
+    async def scenario():
+        hub = ProgressHub()
+        stuck, stuck_ws = await _client(hub, 'download:*', blocked=True)
+        other, other_ws = await _client(hub, 'download:*')
+        hub.publish('download:a', {'status': 'downloading'})
+        await _settle(lambda: stuck_ws.closed)
+        hub.publish('download:a', {'status': 'completed'})
+        await _settle(lambda: len(other_ws.sent) == 2)
+        hub.disconnect(other)
+        return stuck_ws.closed, stuck in hub.subscribers, len(other_ws.sent)
+
+    assert asyncio.run(scenario()) == (True, False, 2)
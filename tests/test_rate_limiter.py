@@ -0,0 +1,129 @@
+import asyncio
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from rate_limiter import MAX_RETRY_AFTER, RateLimiter, parse_retry_after
+
+URL = 'https://a.test/page'
+
+
+async def _burst(limiter, count, status=200, latency=0.05):
+    """`count` isteği aynı anda açık tut, hepsini `status` ile kapat"""
+    async with AsyncExitStack() as stack:
+        slots = [await stack.enter_async_context(limiter.slot(URL)) for _ in range(count)]
+        for slot in slots:
+            slot.record(status)
+            slot.latency = latency  # Ölçülen gecikme yerine sabit değer: gecikme sinyali tetiklenmez
+
+
+def test_parse_retry_after_seconds_and_http_date():
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after('100000') == MAX_RETRY_AFTER
+    assert parse_retry_after('yarın') is None
+    when = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(when) <= 30
+
+
+def test_429_with_retry_after_blocks_host_and_halves_window():
+    async def scenario():
+        limiter = RateLimiter(initial_concurrency=4, max_concurrency=8, initial_rate=1000, max_rate=1000)
+        async with limiter.slot(URL) as slot:
+            slot.record(429, {'Retry-After': '1'})
+        state = limiter._hosts['a.test']
+        assert slot.retry_after == 1.0
+        assert limiter.should_retry(slot, 0) and not limiter.should_retry(slot, limiter.max_retries)
+        assert state.window == 2.0 and state.throttled == 1
+
+        started = time.monotonic()
+        async with limiter.slot(URL) as slot:
+            slot.record(200)
+        # Başka host etkilenmez
+        other_started = time.monotonic()
+        async with limiter.slot('https://b.test/') as other:
+            other.record(200)
+        return time.monotonic() - started, time.monotonic() - other_started
+
+    waited, other_waited = asyncio.run(scenario())
+    assert waited >= 0.9
+    assert other_waited < 0.5
+
+
+def test_window_recovers_additively_after_throttle():
+    async def scenario():
+        limiter = RateLimiter(initial_concurrency=4, max_concurrency=8, initial_rate=1000, max_rate=1000)
+        await _burst(limiter, 1, status=429)  # Retry-After'sız 429: 1 sn bekleme, pencere 4 -> 2
+        state = limiter._hosts['a.test']
+        state.blocked_until = 0.0
+        windows = [state.window]
+        for _ in range(3):
+            await _burst(limiter, int(state.window))
+            windows.append(state.window)
+        return windows
+
+    windows = asyncio.run(scenario())
+    assert windows[0] == 2.0
+    # Pencere dolusu başarılı yanıtta +1/pencere: 2 -> 2.5 -> 2.9 -> 3.24
+    assert windows == sorted(windows) and windows[-1] > 3.0
+    assert windows[1] - windows[0] < 1.0
+
+
+def test_slow_start_grows_window_by_one_until_cap():
+    async def scenario():
+        limiter = RateLimiter(initial_concurrency=2, max_concurrency=3, initial_rate=1000, max_rate=1000)
+        await _burst(limiter, 2)
+        state = limiter._hosts['a.test']
+        first = state.window
+        await _burst(limiter, 3)
+        await _burst(limiter, 3)
+        return first, state.window
+
+    assert asyncio.run(scenario()) == (3.0, 3.0)
+
+
+def test_per_host_cap_limits_concurrent_requests():
+    async def scenario():
+        limiter = RateLimiter(initial_concurrency=8, max_concurrency=8, initial_rate=1000, max_rate=1000)
+        limiter.set_host_limits('a.test', max_concurrency=2, owner='crawl')
+        active = peak = 0
+
+        async def request():
+            nonlocal active, peak
+            async with limiter.slot(URL) as slot:
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.02)
+                active -= 1
+                slot.record(200)
+                slot.latency = 0.02
+
+        await asyncio.gather(*(request() for _ in range(8)))
+        return peak, limiter._hosts['a.test'].window
+
+    peak, window = asyncio.run(scenario())
+    assert peak == 2
+    assert window <= 2
+
+
+def test_host_limits_are_scoped_to_owner():
+    async def scenario():
+        limiter = RateLimiter(initial_concurrency=4, max_concurrency=8)
+        limiter.set_host_limits('a.test', max_concurrency=3, owner='first')
+        limiter.set_host_limits('a.test', max_concurrency=6, crawl_delay=2.0, owner='second')
+        async with limiter.slot(URL) as slot:
+            slot.record(200)
+        state = limiter._hosts['a.test']
+        merged = (state.max_concurrency, limiter.crawl_delay(URL), limiter.crawl_delay(URL, owner='first'))
+
+        limiter.clear_host_limits('second')
+        after_second = (state.max_concurrency, state.crawl_delay, state.max_rate)
+        limiter.clear_host_limits('first')
+        return merged, after_second, state.max_concurrency, limiter._host_limits
+
+    merged, after_second, final_cap, remaining = asyncio.run(scenario())
+    # Crawl-delay varken eşzamanlılık 1; sahiplerin en kısıtlayıcı değerleri geçerli
+    assert merged == (1, 2.0, None)
+    assert after_second == (3, None, 100.0)
+    assert final_cap == 8
+    assert remaining == {}
@@ -0,0 +1,90 @@
+import asyncio
+from types import SimpleNamespace
+
+from report_store import finished_report_header, find_report_header, load_previous_crawl
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            if '$nin' in condition and value in condition['$nin']:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        async def rows():
+            for doc in self.docs:
+                yield doc
+        return rows()
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = []
+
+    async def find_one(self, query, projection=None, sort=None):
+        docs = [doc for doc in self.docs if _matches(doc, query)]
+        for key, direction in reversed(sort or []):
+            docs.sort(key=lambda doc: doc.get(key), reverse=direction < 0)
+        return dict(docs[0]) if docs else None
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                doc.update(update['$set'])
+
+    def find(self, query, projection=None):
+        return FakeCursor([doc for doc in self.docs if _matches(doc, query)])
+
+
+class FakeDB(dict):
+    def __missing__(self, name):
+        collection = self[name] = FakeCollection()
+        return collection
+
+    def __getattr__(self, name):
+        return self[name]
+
+
+def _crawl_report(total_urls):
+    return SimpleNamespace(end_time='2026-01-01T00:00:00', total_urls=total_urls, counts={'pages': total_urls},
+                           breakdown={}, delta={}, discovery={})
+
+
+def test_stopped_crawl_is_not_incremental_baseline():
+    async def scenario():
+        db = FakeDB()
+        for report_id, created_at in (('full', '2026-01-01'), ('partial', '2026-01-02')):
+            db.reports.docs.append({'_id': report_id, 'domain': 'a.test', 'status': 'running',
+                                    'created_at': created_at})
+        await db.reports.update_one({'_id': 'full'}, {'$set': finished_report_header(_crawl_report(100))})
+        await db.reports.update_one({'_id': 'partial'},
+                                    {'$set': finished_report_header(_crawl_report(3), stopped=True)})
+        db.report_pages.docs.append({'report_id': 'full', 'url': 'https://a.test/', 'content_hash': 'h'})
+
+        latest = await find_report_header(db, domain='a.test')
+        assert latest['id'] == 'partial' and latest['status'] == 'stopped'
+
+        previous = await load_previous_crawl(db, 'a.test')
+        assert previous.report_id == 'full'
+        assert previous.page_hashes == {'https://a.test/': 'h'}
+
+    asyncio.run(scenario())
+
+
+def test_only_stopped_crawls_means_no_baseline():
+    async def scenario():
+        db = FakeDB()
+        db.reports.docs.append({'_id': 'partial', 'domain': 'a.test', 'created_at': '2026-01-02',
+                                **finished_report_header(_crawl_report(3), stopped=True)})
+        assert await load_previous_crawl(db, 'a.test') is None
+
+    asyncio.run(scenario())
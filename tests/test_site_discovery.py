@@ -0,0 +1,134 @@
+import asyncio
+import gzip
+from datetime import datetime, timedelta, timezone
+
+from crawl_frontier import SITEMAP_PRIORITY
+from site_discovery import SiteDiscovery, _group_crawl_delay, discover_site, parse_lastmod
+
+ORIGIN = 'https://a.test'
+
+
+class FakeContent:
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def iter_chunked(self, size):
+        # Küçük parçalar: ayrıştırıcının akış halinde beslenmesini sınar
+        for start in range(0, len(self.body), 7):
+            yield self.body[start:start + 7]
+
+
+class FakeResponse:
+    def __init__(self, status, body: bytes):
+        self.status = status
+        self.content = FakeContent(body)
+        self._body = body
+
+    async def text(self, errors='strict'):
+        return self._body.decode('utf-8', errors)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, files):
+        self.files = files
+        self.requested = []
+
+    def get(self, url, **kwargs):
+        self.requested.append(url)
+        body = self.files.get(url)
+        return FakeResponse(404, b'') if body is None else FakeResponse(200, body)
+
+
+def _days_ago(days):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).strftime('%Y-%m-%d')
+
+
+def _urlset(*entries):
+    urls = ''.join(
+        f"<url><loc>{loc}</loc>{f'<lastmod>{lastmod}</lastmod>' if lastmod else ''}</url>"
+        for loc, lastmod in entries
+    )
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'.encode()
+
+
+def test_group_crawl_delay_without_rules():
+    robots = "User-agent: *\nCrawl-delay: 2\n\nUser-agent: demart\nUser-agent: other\nCrawl-delay: 0.5 # yorum\n"
+    assert _group_crawl_delay(robots) == 2.0
+    assert _group_crawl_delay(robots, 'Demart') == 0.5
+    assert _group_crawl_delay("User-agent: *\nCrawl-delay: soon\n") is None
+
+
+def test_parse_lastmod_formats():
+    assert parse_lastmod('2024-05-01') == datetime(2024, 5, 1, tzinfo=timezone.utc)
+    assert parse_lastmod('2024-05-01T10:00:00Z').hour == 10
+    assert parse_lastmod('2024-05-01T10:00:00+03:00').utcoffset() == timedelta(hours=3)
+    assert parse_lastmod('dün') is None and parse_lastmod('') is None
+
+
+def test_robots_index_and_gzip_sitemaps():
+    index = (
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        '<sitemap><loc>/products.xml.gz</loc></sitemap>'
+        '<sitemap><loc>https://a.test/blog.xml</loc></sitemap>'
+        '</sitemapindex>'
+    ).encode()
+    files = {
+        f'{ORIGIN}/robots.txt': b"User-agent: *\nCrawl-delay: 90\n\nSitemap: https://a.test/index.xml\n",
+        f'{ORIGIN}/index.xml': index,
+        # Content-Encoding olmadan gzip: imzadan tanınmalı
+        f'{ORIGIN}/products.xml.gz': gzip.compress(_urlset(
+            (f'{ORIGIN}/p/1', _days_ago(400)), (f'{ORIGIN}/p/2', _days_ago(1)), ('https://other.test/x', None),
+        )),
+        f'{ORIGIN}/blog.xml': _urlset((f'{ORIGIN}/blog/1', _days_ago(20)), (f'{ORIGIN}/p/2', None)),
+    }
+
+    async def scenario():
+        session = FakeSession(files)
+        discovery = SiteDiscovery(session, ORIGIN, accept=lambda url: url.startswith(ORIGIN))
+        result = await discovery.discover()
+        assert result.robots_found
+        assert result.crawl_delay == 30.0  # MAX_CRAWL_DELAY ile sınırlı
+        assert result.sitemaps == [f'{ORIGIN}/index.xml', f'{ORIGIN}/products.xml.gz', f'{ORIGIN}/blog.xml']
+        assert result.scanned == 5
+        assert [(item.url, item.priority) for item in result.urls] == [
+            (f'{ORIGIN}/p/2', SITEMAP_PRIORITY),
+            (f'{ORIGIN}/blog/1', SITEMAP_PRIORITY + 1),
+            (f'{ORIGIN}/p/1', SITEMAP_PRIORITY + 3),
+        ]
+        assert f'{ORIGIN}/sitemap.xml' not in session.requested  # robots.txt'de sitemap vardı
+
+    asyncio.run(scenario())
+
+
+def test_keeps_best_n_urls_and_falls_back_to_default_sitemap():
+    entries = [(f'{ORIGIN}/old/{n}', _days_ago(500)) for n in range(50)]
+    entries.insert(25, (f'{ORIGIN}/fresh', _days_ago(2)))
+    entries.append((f'{ORIGIN}/month', _days_ago(10)))
+    files = {f'{ORIGIN}/sitemap.xml': _urlset(*entries)}
+
+    async def scenario():
+        result = await discover_site(FakeSession(files), ORIGIN + '/start', max_urls=3)
+        assert not result.robots_found and result.crawl_delay is None
+        assert result.scanned == 52
+        # En yeni iki URL, sonra eski URL'lerden sitemap'te ilk görülen
+        assert [item.url for item in result.urls] == [f'{ORIGIN}/fresh', f'{ORIGIN}/month', f'{ORIGIN}/old/0']
+
+    asyncio.run(scenario())
+
+
+def test_malformed_sitemap_keeps_parsed_urls():
+    body = _urlset((f'{ORIGIN}/a', None), (f'{ORIGIN}/b', None)).replace(b'</loc></url></urlset>', b'</url>')
+    files = {f'{ORIGIN}/sitemap.xml': body}
+
+    async def scenario():
+        result = await SiteDiscovery(FakeSession(files), ORIGIN).discover()
+        assert [item.url for item in result.urls] == [f'{ORIGIN}/a']
+        assert result.errors
+
+    asyncio.run(scenario())
@@ -0,0 +1,196 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from state_persistence import JsonStateStore, SqliteStateStore, StateStore, WriteBehindWriter, open_state_store
+
+
+class FakeStore(StateStore):
+    """apply() çağrılarını kaydeden depo; `fail` kadar ilk yazım hata verir"""
+
+    def __init__(self, fail: int = 0):
+        self.applied = []
+        self.fail = fail
+        self.closed = False
+        self._changed = threading.Condition()
+
+    def load(self):
+        return {}
+
+    def apply(self, changes):
+        with self._changed:
+            if self.fail:
+                self.fail -= 1
+                raise OSError('disk full')
+            self.applied.append(changes)
+            self._changed.notify_all()
+
+    def get(self, section, download_id):
+        return None
+
+    def find(self, status, limit=100):
+        return []
+
+    def close(self):
+        self.closed = True
+
+    def wait_for(self, count, timeout=2.0):
+        with self._changed:
+            return self._changed.wait_for(lambda: len(self.applied) >= count, timeout)
+
+
+def _writer(store, records, interval):
+    return WriteBehindWriter(store, lambda section, download_id: records.get((section, download_id)), interval)
+
+
+def test_saves_within_interval_are_coalesced_into_one_write():
+    store, records = FakeStore(), {}
+    writer = _writer(store, records, interval=0.3)
+    try:
+        records[('active', 'a')] = {'status': 'downloading', 'progress': 0}
+        writer.save([('active', 'a')])  # İlk yazım beklemez
+        assert store.wait_for(1)
+        for progress in range(1, 51):
+            records[('active', 'a')] = {'status': 'downloading', 'progress': progress}
+            writer.save([('active', 'a'), ('queue', 'b')])
+        assert store.wait_for(2)
+        time.sleep(0.4)
+    finally:
+        writer.close()
+
+    assert writer.requests == 51 and writer.writes == 2
+    # Yazım anındaki son kayıt yazılır; kaydı olmayan anahtar silinir
+    assert store.applied[1] == {('active', 'a'): {'status': 'downloading', 'progress': 50}, ('queue', 'b'): None}
+
+
+def test_force_writes_without_waiting_for_interval():
+    store, records = FakeStore(), {('active', 'a'): {'status': 'downloading'}}
+    writer = _writer(store, records, interval=30)
+    try:
+        writer.save([('active', 'a')])
+        assert store.wait_for(1)
+        writer.save([('active', 'b')])
+        assert not store.wait_for(2, timeout=0.2)
+        records[('active', 'a')] = {'status': 'completed'}
+        writer.save([('active', 'a')], force=True)
+        assert store.wait_for(2, timeout=1.0)
+    finally:
+        writer.close()
+
+    assert store.applied[1] == {('active', 'a'): {'status': 'completed'}, ('active', 'b'): None}
+
+
+def test_failed_write_marks_keys_dirty_again():
+    store, records = FakeStore(fail=1), {('queue', 'a'): {'status': 'queued'}}
+    writer = _writer(store, records, interval=0.05)
+    try:
+        writer.save([('queue', 'a')])
+        assert store.wait_for(1)
+    finally:
+        writer.close()
+
+    assert store.fail == 0
+    assert store.applied == [{('queue', 'a'): {'status': 'queued'}}]
+    assert writer.writes == 1
+
+
+def test_close_flushes_pending_changes_and_closes_store():
+    store, records = FakeStore(), {('active', 'a'): {'status': 'downloading'}}
+    writer = _writer(store, records, interval=30)
+    writer.save([('active', 'a')])
+    assert store.wait_for(1)
+    records[('incomplete', 'a')] = {'status': 'paused'}
+    writer.save([('active', 'a'), ('incomplete', 'a')])
+    writer.close()
+
+    assert not writer._thread.is_alive()
+    assert store.closed
+    assert store.applied[-1] == {('active', 'a'): {'status': 'downloading'}, ('incomplete', 'a'): {'status': 'paused'}}
+
+
+CHANGES = {
+    ('active', 'a'): {'status': 'downloading', 'progress': 40},
+    ('active', 'done'): {'status': 'completed'},
+    ('active', 'broken'): {'status': 'failed'},
+    # Kuyruk kayıtları kimliği taşır (JSON biçimi kuyruğu liste olarak yazar)
+    ('queue', 'q2'): {'download_id': 'q2', 'status': 'queued', 'queue_position': 1},
+    ('queue', 'q1'): {'download_id': 'q1', 'status': 'queued', 'queue_position': 2},
+    ('incomplete', 'i'): {'status': 'paused'},
+}
+
+
+def test_state_store_requires_all_methods():
+    with pytest.raises(TypeError):
+        StateStore()
+
+
+def test_sqlite_store_round_trip_skips_finished_and_keeps_queue_order(tmp_path):
+    path = str(tmp_path / 'state.sqlite3')
+    store = SqliteStateStore(path)
+    store.apply(CHANGES)
+    # Sıra pozisyonu değişse de kuyruk ekleme (rowid) sırasıyla okunur; None satırı siler
+    store.apply({('queue', 'q2'): {**CHANGES[('queue', 'q2')], 'queue_position': 9}, ('incomplete', 'i'): None})
+    store.close()
+
+    store = SqliteStateStore(path)
+    try:
+        state = store.load()
+        assert state['active'] == {'a': {'status': 'downloading', 'progress': 40}}
+        assert list(state['queue']) == ['q2', 'q1']
+        assert state['queue']['q2']['queue_position'] == 9
+        assert state['incomplete'] == {}
+        assert store.get('active', 'done') == {'status': 'completed'}
+        assert store.find('failed') == [{'download_id': 'broken', 'status': 'failed'}]
+        assert not store.is_empty()
+    finally:
+        store.close()
+
+
+def test_json_store_round_trip_and_atomic_rewrite(tmp_path, monkeypatch):
+    path = tmp_path / 'state.json'
+    store = JsonStateStore(str(path))
+    store.apply(CHANGES)
+
+    reopened = JsonStateStore(str(path)).load()
+    assert reopened['active'] == {'a': {'status': 'downloading', 'progress': 40}}
+    assert list(reopened['queue']) == ['q2', 'q1']
+    assert reopened['incomplete'] == {'i': {'status': 'paused'}}
+    before = path.read_text()
+
+    def fail_replace(source, target):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', fail_replace)
+    with pytest.raises(OSError):
+        store.apply({('active', 'a'): {'status': 'downloading', 'progress': 90}})
+    # Yarım yazım eski dosyayı bozmaz, geçici dosya kalmaz
+    assert path.read_text() == before
+    assert os.listdir(tmp_path) == ['state.json']
+
+
+def test_open_state_store_imports_legacy_json_once(tmp_path):
+    json_path, sqlite_path = tmp_path / 'state.json', str(tmp_path / 'state.sqlite3')
+    json_path.write_text(json.dumps({
+        'active': {'a': {'status': 'downloading'}, 'old': {'status': 'completed'}},
+        'queue': [{'download_id': 'q2', 'status': 'queued'}, {'download_id': 'q1', 'status': 'queued'}, {}],
+        'incomplete': {'i': {'status': 'paused'}},
+    }))
+    store = open_state_store('sqlite', sqlite_path, str(json_path))
+    state = store.load()
+    store.close()
+    assert isinstance(store, SqliteStateStore)
+    assert state['active'] == {'a': {'status': 'downloading'}}
+    assert list(state['queue']) == ['q2', 'q1']
+    assert state['incomplete'] == {'i': {'status': 'paused'}}
+
+    # Depo dolu: JSON tekrar içe aktarılmaz
+    json_path.write_text(json.dumps({'active': {'new': {'status': 'downloading'}}}))
+    store = open_state_store('sqlite', sqlite_path, str(json_path))
+    try:
+        assert 'new' not in store.load()['active']
+    finally:
+        store.close()
+    assert isinstance(open_state_store('json', sqlite_path, str(json_path)), JsonStateStore)